@@ -3,3 +3,6 @@ from django.apps import AppConfig
 class CertificatesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'certificates'
+
+    def ready(self):
+        from . import signals
@@ -0,0 +1,155 @@
+"""
+Certificate Management System - Merkle Compaction
+Drops revoked slots from the certificate Merkle tree and anchors the dense root once
+"""
+
+import csv
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from merkle.compaction import compact_tree
+
+from certificates import proof_cache
+from certificates.merkle_registry import MerkleRegistry
+from certificates.models import BlockchainTransaction, Certificate, MerkleState
+
+
+class Command(BaseCommand):
+    help = "Compact the certificate Merkle tree (run off-peak, e.g. from cron)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--min-dead', type=float, default=0.0,
+                            help="Only compact when at least this share of slots is revoked (0-1)")
+        parser.add_argument('--remap-out', default='',
+                            help="Write the old → new leaf index remap to this CSV file")
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Report what compaction would do without changing anything")
+
+    def handle(self, *args, **options):
+        if getattr(settings, 'MERKLE_SETTINGS', {}).get('FOREST', False):
+            raise CommandError("MERKLE_FOREST keeps one tree per issuer; this command needs the single tree")
+
+        registry = MerkleRegistry()
+        registry.shared_name = ''
+
+        with transaction.atomic():
+            # block issuance (slot allocation) and hold every slot while
+            # leaf indices move; nothing slow happens under these locks
+            state = MerkleState.locked()
+            list(Certificate.objects.select_for_update().filter(
+                leaf_index__isnull=False
+            ).values_list('id', flat=True))
+
+            tree = registry.get_tree()
+            if tree is None:
+                self.stdout.write("Nothing anchored yet")
+                return
+
+            compacted, remap = compact_tree(tree)
+            total = len(tree.levels[0])
+            dead = total - len(remap)
+            self.stdout.write(f"🌳 {total} slots, {dead} revoked, {len(remap)} live")
+
+            if dead == 0 or dead / total < options['min_dead']:
+                self.stdout.write("   below the compaction threshold, nothing to do")
+                return
+            if compacted is None:
+                raise CommandError("Every slot is revoked; there is no tree to anchor")
+
+            self.stdout.write(
+                f"   depth {len(tree.levels) - 1} → {len(compacted.levels) - 1}, "
+                f"root {compacted.get_root()[:16]}…"
+            )
+            if options['dry_run']:
+                return
+
+            self.move_leaves(remap, total)
+            state.next_leaf_index = len(remap)
+            state.compactions += 1
+            state.save(update_fields=['next_leaf_index', 'compactions'])
+
+            # recorded with the remap, so the compaction is on file (and
+            # older anchors are refused for consistency proofs) whatever
+            # happens to the anchoring below
+            record = BlockchainTransaction.objects.create(
+                certificate=None,
+                transaction_type='compact',
+                tx_hash=f"pending_compact_{state.compactions}_{timezone.now():%Y%m%d%H%M%S}",
+                network="sepolia",
+                contract_address="",
+                merkle_root=compacted.get_root(),
+                leaf_count=len(remap),
+                status="pending",
+            )
+
+        # the remap is committed; anchor the compacted root once, outside
+        # the locks (a later issuance or revocation anchors again anyway)
+        if options['remap_out']:
+            self.write_remap(options['remap_out'], remap)
+        self.anchor(record)
+
+    def move_leaves(self, remap, total):
+        """
+        Give live certificates their new slots and revoked ones none.
+        leaf_index is unique, so live rows are first shifted past every
+        old slot; the final indices then never collide mid-update.
+        """
+        live = Certificate.objects.filter(leaf_index__isnull=False)
+        valid_slots = set(live.filter(status='valid').values_list('leaf_index', flat=True))
+        if valid_slots != remap.keys():
+            raise CommandError("Merkle tree and database disagree; aborting compaction")
+
+        live.exclude(status='valid').update(leaf_index=None)
+        live.update(leaf_index=F('leaf_index') + total)
+
+        moved = [
+            Certificate(id=pk, leaf_index=remap[leaf_index - total])
+            for pk, leaf_index in live.values_list('id', 'leaf_index')
+        ]
+        Certificate.objects.bulk_update(moved, ['leaf_index'], batch_size=1000)
+        # bulk updates send no signals
+        MerkleState.bump()
+
+    def anchor(self, record):
+        from blockchain.send_root import send_root
+
+        try:
+            result = send_root("0x" + record.merkle_root)
+        except Exception as e:
+            record.status = "failed"
+            record.error_message = str(e)
+            record.save(update_fields=['status', 'error_message'])
+            raise CommandError(f"Slots were compacted but anchoring the root failed: {e}")
+
+        # the root is on-chain from here on: log the tx before touching the
+        # database, so it is never lost if recording it fails
+        self.stdout.write(f"   root {record.merkle_root} sent | tx: {result['tx_hash']}")
+        try:
+            record.tx_hash = result["tx_hash"]
+            record.block_number = result.get("block_number")
+            record.network = result.get("network", "sepolia")
+            record.contract_address = result.get("contract_address", os.getenv("CONTRACT_ADDRESS"))
+            record.gas_used = result["gas_used"]
+            record.status = "confirmed"
+            record.confirmed_at = timezone.now()
+            record.save()
+        except Exception as e:
+            raise CommandError(
+                f"Compacted root {record.merkle_root} was anchored in tx {result['tx_hash']} "
+                f"but recording it failed: {e}"
+            )
+
+        proof_cache.set_anchor(record.merkle_root)
+        self.stdout.write(f"✅ Compacted root anchored | tx: {result['tx_hash']}")
+
+    def write_remap(self, path, remap):
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['old_leaf_index', 'new_leaf_index'])
+            writer.writerows(sorted(remap.items()))
+        self.stdout.write(f"   remap written to {path}")
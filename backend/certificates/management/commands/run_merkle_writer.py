@@ -0,0 +1,123 @@
+"""
+Certificate Management System - Shared Merkle Writer
+Keeps the certificate Merkle tree in shared memory for every worker on the host
+"""
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from merkle.merkle_tree import REVOKED_LEAF
+from merkle.shared import SharedMerkleWriter
+
+from certificates.merkle_registry import MerkleRegistry
+from certificates.models import Certificate
+
+
+class Command(BaseCommand):
+    help = "Maintain the shared-memory Merkle tree read by the web workers"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=0.5,
+                            help="Seconds between database polls")
+        parser.add_argument('--capacity', type=int, default=None,
+                            help="Initial leaf capacity (rounded up to a power of two)")
+
+    def handle(self, *args, **options):
+        if getattr(settings, 'MERKLE_SETTINGS', {}).get('FOREST', False):
+            raise CommandError("MERKLE_FOREST keeps one tree per issuer; this command needs the single tree")
+        name = getattr(settings, 'MERKLE_SETTINGS', {}).get('SHARED_TREE', '')
+        if not name:
+            raise CommandError("Set MERKLE_SETTINGS['SHARED_TREE'] (MERKLE_SHARED_TREE) first")
+
+        # the local registry does the cold build (and uses the on-disk store)
+        self.registry = MerkleRegistry()
+        self.registry.shared_name = ''
+        self.writer = None
+        self.capacity = options['capacity']
+
+        self.stdout.write(f"🌳 Writing shared Merkle tree '{name}'")
+        try:
+            while True:
+                self.sync(name)
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if self.writer is not None:
+                self.writer.close()
+
+    # ---------------- SYNC ----------------
+    def sync(self, name):
+        fingerprint = self.registry._db_fingerprint()
+        if fingerprint[0] is None or fingerprint == self.fingerprint():
+            return
+
+        if self.writer is None or not self.apply_changes(fingerprint):
+            self.rebuild(name, fingerprint)
+
+    def fingerprint(self):
+        if self.writer is None:
+            return None
+        return tuple(self.writer.meta().get('fingerprint', ()))
+
+    def rebuild(self, name, fingerprint):
+        self.registry._reload(fingerprint)
+        tree = self.registry.tree
+        meta = {'fingerprint': list(fingerprint)}
+
+        if self.writer is None:
+            self.writer = SharedMerkleWriter(name, tree, capacity=self.capacity, meta=meta)
+        else:
+            self.writer.replace(tree, meta=meta)
+
+        self.revoked = {
+            index for index, leaf in enumerate(self.registry.iter_leaves())
+            if leaf == REVOKED_LEAF
+        }
+        self.stdout.write(f"   rebuilt: {len(tree.levels[0])} leaves, root {tree.get_root()[:16]}…")
+
+    def apply_changes(self, fingerprint):
+        """
+        Append new slots and revoke newly revoked ones in place.
+        Returns False when the change can't be expressed that way
+        (deleted or re-validated certificates, or a compaction that
+        moved every slot), forcing a rebuild.
+        """
+        count = len(self.writer.tree.levels[0])
+        written = self.fingerprint()
+        if len(written) != len(fingerprint) or written[2] != fingerprint[2]:
+            return False
+        if fingerprint[0] < count - 1:
+            return False
+
+        new_leaves = []
+        rows = Certificate.objects.filter(
+            leaf_index__gte=count
+        ).order_by('leaf_index').values_list('leaf_index', 'ipfs_cid', 'status')
+        for leaf_index, cid, status in rows.iterator():
+            while count + len(new_leaves) < leaf_index:
+                self.revoked.add(count + len(new_leaves))
+                new_leaves.append(REVOKED_LEAF)
+            if status != 'valid':
+                self.revoked.add(leaf_index)
+            new_leaves.append(cid if status == 'valid' else REVOKED_LEAF)
+
+        revoked_now = set(Certificate.objects.filter(
+            leaf_index__lt=count
+        ).exclude(status='valid').values_list('leaf_index', flat=True))
+        newly_revoked = revoked_now - self.revoked
+        self.revoked |= newly_revoked
+
+        total = count + len(new_leaves)
+        if total - len(self.revoked) != fingerprint[1]:
+            return False
+
+        revoked_hash = self.writer.tree.leaf_hash(REVOKED_LEAF)
+        if newly_revoked:
+            self.writer.update_leaves({index: revoked_hash for index in newly_revoked})
+        if new_leaves:
+            self.writer.append_many(new_leaves)
+        self.writer.set_meta({'fingerprint': list(fingerprint)})
+        return True
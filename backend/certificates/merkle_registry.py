@@ -0,0 +1,752 @@
+"""
+Certificate Management System - Merkle Registry
+Long-lived Merkle tree shared by the issuance, revocation and verification views
+"""
+
+import threading
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, Q
+
+from merkle.forest import MerkleForest, top_tree
+from merkle.hybrid import HybridMerkleTree
+from merkle.merkle_tree import MerkleTree, OperationMetrics, REVOKED_LEAF
+from merkle.shared import SharedTimeoutError, SharedTreeReader
+from merkle.streaming import stream_root
+
+from . import proof_cache
+from .models import BlockchainTransaction, Certificate, MerkleState
+
+# How long a request waits for the shared-tree writer to catch up with the DB
+SHARED_SYNC_TIMEOUT = 2.0
+
+
+class MerkleRegistry:
+    """
+    Process-wide Merkle tree over every anchored certificate.
+
+    Leaf i is the CID of the certificate with leaf_index i, or the revoked
+    sentinel if that certificate was revoked. Slots never move, so issuing
+    appends one leaf and revoking overwrites one leaf, both in O(log n),
+    and proofs for untouched certificates keep their shape.
+
+    The tree keeps a CID → position map, so finding a certificate's leaf
+    is O(1) instead of scanning every CID.
+
+    A cheap aggregate query detects changes made by other processes,
+    in which case the tree catches up in place (new slots appended,
+    revoked slots overwritten) and is only rebuilt after a compaction or
+    a change that isn't an issuance or a revocation.
+
+    With MERKLE_SETTINGS['STORE_PATH'] set, a reload first maps the
+    on-disk tree and catches it up from the fingerprint it was written
+    for. Full rebuilds rewrite that file, and so do in-place updates, at
+    most every STORE_SAVE_INTERVAL seconds. Restarts and idle workers
+    therefore neither rebuild nor hold the tree in RAM.
+
+    With MERKLE_SETTINGS['SHARED_TREE'] set, workers instead read the tree
+    the `run_merkle_writer` process keeps in shared memory: one copy for
+    the whole host, no rebuilds in request handlers. If the writer is not
+    running or falls behind the database, the local tree is used.
+
+    With MERKLE_SETTINGS['TOP_LEVELS'] set, a rebuilt local tree keeps only
+    its leaves and that many top levels in RAM (see merkle.hybrid).
+
+    Every certificate write bumps MerkleState.generation, so a request
+    first reads that one row and only runs the aggregate when it moved:
+    repeat verifications against an unchanged tree cost O(1) queries.
+    """
+
+    forest = False
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        merkle_settings = getattr(settings, 'MERKLE_SETTINGS', {})
+        self.engine = merkle_settings.get('ENGINE', 'hex')
+        self.hash_name = merkle_settings.get('HASH', 'sha256')
+        self.sorted_pairs = merkle_settings.get('SORTED_PAIRS', False)
+        self.build_workers = merkle_settings.get('BUILD_WORKERS', 1)
+        self.top_levels = merkle_settings.get('TOP_LEVELS', 0)
+        self.store_path = merkle_settings.get('STORE_PATH', '')
+        self.store_save_interval = merkle_settings.get('STORE_SAVE_INTERVAL', 60)
+        # fingerprint the store file was last written (or read) for
+        self.store_fingerprint = None
+        self.store_saved_at = 0.0
+        self.shared_name = merkle_settings.get('SHARED_TREE', '')
+        self.shared = None
+        # writer fingerprint that last timed out (see _shared_tree)
+        self.shared_stale = None
+        # (epoch, generation) a writer died at, mid-update (see _shared_alive)
+        self.shared_stuck = None
+        # one metrics object across reloads, scraped by the /metrics view
+        self.metrics = OperationMetrics()
+        self.tree = None
+        self.fingerprint = None
+        # tree handed out for `generation` (the local or the shared one)
+        self.current = None
+        self.generation = None
+        # root last anchored on-chain, as read with the generation
+        self.anchor = ''
+
+    @staticmethod
+    def _db_generation():
+        return MerkleState.objects.filter(pk=1).values_list('generation', flat=True).first()
+
+    @staticmethod
+    def _db_state():
+        # (generation, anchored root) in one row read
+        state = MerkleState.objects.filter(pk=1).values_list('generation', 'anchored_root').first()
+        return state or (None, '')
+
+    def _remember(self, generation, tree):
+        # `tree` reflects the database as of `generation`
+        self.generation = generation
+        self.current = tree
+        return tree
+
+    def _db_fingerprint(self):
+        # (last slot, valid count) alone repeats after a compaction plus as
+        # many issuances and revocations as it dropped, so the compaction
+        # count is part of it too
+        stats = Certificate.objects.filter(leaf_index__isnull=False).aggregate(
+            last_index=Max('leaf_index'),
+            valid=Count('id', filter=Q(status='valid')),
+        )
+        compactions = MerkleState.objects.filter(pk=1).values_list('compactions', flat=True).first()
+        return (stats['last_index'], stats['valid'], compactions or 0)
+
+    @staticmethod
+    def iter_leaves():
+        """
+        Stream leaf values in slot order straight from the database:
+        the CID for valid certificates, the revoked sentinel otherwise
+        (including slots whose certificate no longer exists).
+        """
+        rows = Certificate.objects.filter(
+            leaf_index__isnull=False
+        ).order_by('leaf_index').values_list('leaf_index', 'ipfs_cid', 'status')
+
+        next_index = 0
+        for leaf_index, cid, status in rows.iterator():
+            while next_index < leaf_index:
+                yield REVOKED_LEAF
+                next_index += 1
+            yield cid if status == 'valid' else REVOKED_LEAF
+            next_index += 1
+
+    def stream_root(self):
+        """
+        Root of the database state computed in O(log n) memory, without
+        touching the in-memory tree (e.g. nightly check against the chain).
+        Returns None when nothing has been anchored yet.
+        """
+        try:
+            return stream_root(
+                self.iter_leaves(), engine=self.engine,
+                hash_name=self.hash_name, sorted_pairs=self.sorted_pairs,
+            )
+        except ValueError:
+            return None
+
+    def _shared_tree(self, fingerprint):
+        """The writer's shared tree once it reflects `fingerprint`, else None."""
+        if not self.shared_name or fingerprint[0] is None:
+            return None
+
+        if self.shared is None:
+            try:
+                self.shared = SharedTreeReader(self.shared_name, timeout=SHARED_SYNC_TIMEOUT)
+            except (OSError, ValueError):
+                return None
+
+        if not self._shared_alive():
+            return None
+
+        # Wait for a lagging writer at most once per writer state: after a
+        # timeout, requests fall back to the local tree straight away until
+        # the writer publishes something new, instead of each one sleeping
+        # under the registry lock.
+        try:
+            written = tuple(self.shared.meta().get('fingerprint', ()))
+            if written != fingerprint and written == self.shared_stale:
+                return None
+
+            deadline = time.monotonic() + SHARED_SYNC_TIMEOUT
+            while written != fingerprint:
+                if time.monotonic() >= deadline:
+                    print("⚠️ Shared Merkle tree is behind the database, using a local tree")
+                    self.shared_stale = written
+                    return None
+                time.sleep(0.05)
+                written = tuple(self.shared.meta().get('fingerprint', ()))
+        except SharedTimeoutError:
+            self._shared_died()
+            return None
+
+        self.shared_stale = None
+        return self.shared
+
+    def _shared_alive(self):
+        """
+        False while the writer is stuck mid-update: it was killed with the
+        generation odd, so every shared read would time out. Only the first
+        request after that pays the SHARED_SYNC_TIMEOUT wait; later ones
+        see the same (epoch, generation) and go straight to the local tree
+        until a restarted writer publishes a new segment.
+        """
+        try:
+            if self.shared_stuck is not None and self.shared.position() == self.shared_stuck:
+                return False
+            self.shared.read(lambda tree: None)
+        except SharedTimeoutError:
+            self._shared_died()
+            return False
+        except (OSError, ValueError):
+            return False
+        self.shared_stuck = None
+        return True
+
+    def _shared_died(self):
+        print("⚠️ Shared Merkle writer stopped mid-update, using a local tree")
+        self.shared_stuck = self.shared.position()
+
+    def _open_store(self):
+        try:
+            tree = MerkleTree.open(self.store_path)
+        except (OSError, ValueError):
+            return None
+
+        if (tree.engine, tree.hash_name, tree.sorted_pairs) != (self.engine, self.hash_name, self.sorted_pairs):
+            return None
+        tree.metrics = self.metrics
+        return tree
+
+    def _load_store(self, fingerprint):
+        """
+        Map the on-disk tree and catch it up to `fingerprint`, so a store
+        written a few issuances or revocations ago costs those changes
+        instead of a rebuild. False if there is no usable store.
+        """
+        tree = self._open_store()
+        if tree is None:
+            return False
+
+        stored = tuple(tree.meta.get('fingerprint', ()))
+        if len(stored) != len(fingerprint):
+            return False
+
+        self.tree = tree
+        self.fingerprint = self.store_fingerprint = stored
+        if stored != fingerprint and not self._catch_up(fingerprint):
+            return False
+        self._save_store()
+        return True
+
+    def _save_store(self, force=False):
+        """
+        Rewrite the on-disk store if it lags the tree. In-place updates
+        only do so every STORE_SAVE_INTERVAL seconds (the write is O(n)),
+        which bounds what a restart has to catch up on.
+        """
+        if not self.store_path or self.tree is None or self.fingerprint == self.store_fingerprint:
+            return
+
+        now = time.monotonic()
+        if not force and now - self.store_saved_at < self.store_save_interval:
+            return
+
+        self.store_saved_at = now
+        try:
+            self.tree.save(self.store_path, meta={'fingerprint': list(self.fingerprint)})
+        except OSError as e:
+            print(f"⚠️ Could not write Merkle store: {e}")
+            return
+        self.store_fingerprint = self.fingerprint
+
+    def _reload(self, fingerprint):
+        if self.store_path and self._load_store(fingerprint):
+            return
+
+        self.fingerprint = fingerprint
+        leaves = list(self.iter_leaves())
+        if not leaves:
+            self.tree = None
+        elif self.top_levels:
+            self.tree = HybridMerkleTree(
+                leaves, engine=self.engine, index_leaves=True, hash_name=self.hash_name,
+                sorted_pairs=self.sorted_pairs, top_levels=self.top_levels, metrics=self.metrics,
+            )
+        else:
+            self.tree = MerkleTree(
+                leaves, engine=self.engine, index_leaves=True,
+                workers=self.build_workers, hash_name=self.hash_name, sorted_pairs=self.sorted_pairs,
+                metrics=self.metrics,
+            )
+
+        self._save_store(force=True)
+
+    def _catch_up(self, fingerprint):
+        """
+        Bring the local tree from self.fingerprint to `fingerprint` in
+        place, like run_merkle_writer: append the slots past its end, then
+        overwrite the slots revoked since with the sentinel. Returns False
+        when the change can't be expressed that way (a compaction moved
+        every slot, certificates were deleted or re-validated), so the
+        caller reloads.
+        """
+        tree = self.tree
+        if tree is None or self.fingerprint is None or fingerprint[0] is None:
+            return False
+        if fingerprint[2] != self.fingerprint[2]:
+            return False
+
+        count = len(tree.levels[0])
+        if fingerprint[0] < count - 1:
+            return False
+
+        new_leaves = []
+        rows = Certificate.objects.filter(
+            leaf_index__gte=count, leaf_index__lte=fingerprint[0]
+        ).order_by('leaf_index').values_list('leaf_index', 'ipfs_cid', 'status')
+        for leaf_index, cid, status in rows.iterator():
+            new_leaves.extend([REVOKED_LEAF] * (leaf_index - count - len(new_leaves)))
+            new_leaves.append(cid if status == 'valid' else REVOKED_LEAF)
+        if count + len(new_leaves) != fingerprint[0] + 1:
+            return False
+
+        revoked_hash = tree.leaf_hash(REVOKED_LEAF)
+        newly_revoked = {
+            index for index in Certificate.objects.filter(
+                leaf_index__lt=count
+            ).exclude(status='valid').values_list('leaf_index', flat=True)
+            if tree.get_leaf(index) != revoked_hash
+        }
+
+        valid = self.fingerprint[1] - len(newly_revoked) + sum(leaf != REVOKED_LEAF for leaf in new_leaves)
+        if valid != fingerprint[1]:
+            return False
+
+        if newly_revoked:
+            tree.update_leaves({index: revoked_hash for index in newly_revoked})
+        if new_leaves:
+            tree.append_many(new_leaves)
+        self.fingerprint = fingerprint
+        return True
+
+    def _refresh(self, fingerprint):
+        # another worker changed the database: catch up, rebuild only if we must
+        if self._catch_up(fingerprint):
+            self._save_store()
+        else:
+            self._reload(fingerprint)
+
+    def get_tree(self):
+        """Return the current tree (None when nothing has been anchored yet)."""
+        with self.lock:
+            generation, self.anchor = self._db_state()
+            if generation is not None and generation == self.generation:
+                if self.current is None or self.current is not self.shared or self._shared_alive():
+                    return self.current
+            return self._remember(generation, self._sync())
+
+    def _sync(self):
+        fingerprint = self._db_fingerprint()
+        shared = self._shared_tree(fingerprint)
+        if shared is not None:
+            return shared
+
+        if self.tree is None or fingerprint != self.fingerprint:
+            self._refresh(fingerprint)
+        return self.tree
+
+    def anchor_state(self, tree):
+        """(root, leaf_count) of a tree returned by the registry, read together."""
+        state = lambda t: (t.get_root(), len(t.levels[0]))
+        return tree.read(state) if tree is self.shared else state(tree)
+
+    def _assign_leaf_index(self, certificate):
+        # the locked state row serialises allocation across workers
+        with transaction.atomic():
+            state = MerkleState.locked()
+            certificate.leaf_index = state.next_leaf_index
+            certificate.save(update_fields=['leaf_index'])
+            state.next_leaf_index += 1
+            state.save(update_fields=['next_leaf_index'])
+
+    def append(self, certificate):
+        """
+        Give a freshly issued certificate (with its CID saved) the next
+        leaf slot and append it to the tree.
+        """
+        with self.lock:
+            self._assign_leaf_index(certificate)
+            generation = self._db_generation()
+            fingerprint = self._db_fingerprint()
+            shared = self._shared_tree(fingerprint)
+            if shared is not None:
+                return self._remember(generation, shared)
+
+            in_sync = (
+                self.tree is not None
+                and certificate.leaf_index == len(self.tree.levels[0])
+                and fingerprint == (certificate.leaf_index, self.fingerprint[1] + 1, self.fingerprint[2])
+            )
+
+            if in_sync:
+                self.tree.append_leaf(certificate.ipfs_cid)
+                self.fingerprint = fingerprint
+                self._save_store()
+            else:
+                self._refresh(fingerprint)
+
+            return self._remember(generation, self.tree)
+
+    def revoke(self, certificate):
+        """
+        Overwrite a revoked certificate's slot with the revoked sentinel
+        through the delta path (certificate.status must already be saved).
+        """
+        with self.lock:
+            generation = self._db_generation()
+            fingerprint = self._db_fingerprint()
+            shared = self._shared_tree(fingerprint)
+            if shared is not None:
+                return self._remember(generation, shared)
+
+            index = certificate.leaf_index
+            in_sync = (
+                self.tree is not None
+                and index is not None
+                and self.tree.index_of(certificate.ipfs_cid) == index
+                and fingerprint == (self.fingerprint[0], self.fingerprint[1] - 1, self.fingerprint[2])
+            )
+
+            if in_sync:
+                self.tree.delta_revoke(index)
+                self.fingerprint = fingerprint
+                self._save_store()
+            elif self.tree is None or fingerprint != self.fingerprint:
+                self._refresh(fingerprint)
+
+            return self._remember(generation, self.tree)
+
+    def proof_for(self, cid, leaf_index=None):
+        """
+        Return (leaf_hash, proof, root) for a certificate CID,
+        or None if the CID is not a live leaf of the current tree.
+        Proofs are cached per (anchored root, root, CID) until either changes.
+        leaf_index saves a lookup when the shared tree is in use.
+        """
+        with self.lock:
+            tree = self.get_tree()
+            if tree is None or cid is None:
+                return None
+
+            root = tree.get_root()
+            cached = proof_cache.get_proof(self.anchor, root, cid)
+            if cached is not None:
+                return cached
+
+            if tree is self.shared:
+                if leaf_index is None:
+                    leaf_index = Certificate.objects.filter(
+                        ipfs_cid=cid
+                    ).values_list('leaf_index', flat=True).first()
+                if leaf_index is None:
+                    return None
+
+                proof_data = tree.proof_at(leaf_index, cid)
+                if proof_data is not None:
+                    proof_cache.set_proof(self.anchor, proof_data[2], cid, proof_data)
+                return proof_data
+
+            index = tree.index_of(cid)
+            if index is None:
+                return None
+
+            proof_data = (tree.get_leaf(index), tree.get_proof(index), root)
+            proof_cache.set_proof(self.anchor, root, cid, proof_data)
+            return proof_data
+
+    def multiproof_for(self, certificates):
+        """
+        Return (leaf_hashes, multiproof, root) covering every certificate
+        that is a live leaf of the current tree, or None if none of them is.
+        """
+        with self.lock:
+            tree = self.get_tree()
+            if tree is None:
+                return None
+
+            if tree is self.shared:
+                return tree.multiproof_at({
+                    certificate.leaf_index: certificate.ipfs_cid
+                    for certificate in certificates
+                    if certificate.ipfs_cid is not None
+                    and certificate.leaf_index is not None
+                })
+
+            indices = {
+                certificate.leaf_index for certificate in certificates
+                if certificate.ipfs_cid is not None
+                and certificate.leaf_index is not None
+                and tree.index_of(certificate.ipfs_cid) == certificate.leaf_index
+            }
+            if not indices:
+                return None
+
+            multiproof = tree.get_multiproof(indices)
+            leaf_hashes = [tree.get_leaf(index) for index in multiproof['indices']]
+            return leaf_hashes, multiproof, tree.get_root()
+
+    def consistency_proof(self, old_root, new_root):
+        """
+        Consistency proof from a previously anchored old_root to new_root,
+        which must be the current root. Certificates revoked since the old
+        root was anchored are listed as in-place changes. Returns None if
+        old_root was never anchored, was anchored before the last
+        compaction (slots moved since), or new_root is not current.
+        """
+        with self.lock:
+            tree = self.get_tree()
+            if tree is None:
+                return None
+
+            anchor = BlockchainTransaction.objects.filter(
+                merkle_root=old_root, status='confirmed', leaf_count__isnull=False
+            ).order_by('created_at').last()
+            if anchor is None:
+                return None
+
+            # slots moved even if anchoring the compacted root failed
+            compacted = BlockchainTransaction.objects.filter(
+                transaction_type='compact', created_at__gt=anchor.created_at
+            ).exists()
+            if compacted:
+                return None
+
+            revoked = list(Certificate.objects.filter(
+                leaf_index__lt=anchor.leaf_count,
+                revocation__revoked_at__gt=anchor.created_at,
+            ).values_list('leaf_index', 'ipfs_cid'))
+
+            def build(t):
+                if t.get_root() != new_root or anchor.leaf_count > len(t.levels[0]):
+                    return None
+                changes = {index: t.leaf_hash(cid) for index, cid in revoked}
+                return t.get_consistency_proof(anchor.leaf_count, changes)
+
+            return tree.read(build) if tree is self.shared else build(tree)
+
+
+class ForestRegistry(MerkleRegistry):
+    """
+    Registry over a per-issuer MerkleForest (MERKLE_SETTINGS['FOREST']).
+
+    Shard `issuer_id` holds that issuer's slotted certificates in
+    leaf_index order, so a certificate's shard position is its rank
+    there; leaf_index stays the global issuance slot. The anchored root
+    is the forest root, still one 32-byte node, and proofs are ordinary
+    flat proofs to it (shard part, then top part).
+
+    Sync is per issuer: one grouped query gives each issuer's
+    (last leaf_index, valid, slots), and only shards whose fingerprint
+    moved are rebuilt, so a change made elsewhere for one issuer costs a
+    rebuild of that issuer's certificates, not of every leaf.
+
+    The shared-memory tree, the on-disk store, TOP_LEVELS, compaction
+    and consistency proofs work on one flat tree and are not used here.
+    """
+
+    forest = True
+
+    def __init__(self):
+        super().__init__()
+        self.shared_name = ''
+        self.store_path = ''
+        self.fingerprint = {}
+
+    def _db_fingerprint(self):
+        stats = Certificate.objects.filter(leaf_index__isnull=False).values('issuer_id').annotate(
+            last_index=Max('leaf_index'),
+            valid=Count('id', filter=Q(status='valid')),
+            slots=Count('id'),
+        ).order_by()
+        return {row['issuer_id']: (row['last_index'], row['valid'], row['slots']) for row in stats}
+
+    @staticmethod
+    def iter_shard_leaves(issuer_id):
+        """One issuer's leaf values in slot order (gaps are skipped, not padded)."""
+        rows = Certificate.objects.filter(
+            issuer_id=issuer_id, leaf_index__isnull=False
+        ).order_by('leaf_index').values_list('ipfs_cid', 'status')
+
+        for cid, status in rows.iterator():
+            yield cid if status == 'valid' else REVOKED_LEAF
+
+    @staticmethod
+    def load_shards():
+        """Every issuer's leaf values, from one ordered query (cold build)."""
+        shards = {}
+        rows = Certificate.objects.filter(
+            leaf_index__isnull=False
+        ).order_by('leaf_index').values_list('issuer_id', 'ipfs_cid', 'status')
+
+        for issuer_id, cid, status in rows.iterator():
+            shards.setdefault(issuer_id, []).append(cid if status == 'valid' else REVOKED_LEAF)
+        return shards
+
+    def stream_root(self):
+        roots = []
+        for issuer_id in sorted(self._db_fingerprint()):
+            try:
+                roots.append(stream_root(
+                    self.iter_shard_leaves(issuer_id), engine=self.engine,
+                    hash_name=self.hash_name, sorted_pairs=self.sorted_pairs,
+                ))
+            except ValueError:
+                continue
+
+        if not roots:
+            return None
+        return top_tree(roots, self.engine, self.hash_name, self.sorted_pairs).get_root()
+
+    def _reload(self, fingerprint):
+        if self.tree is None:
+            self.tree = MerkleForest(
+                self.load_shards(), engine=self.engine, hash_name=self.hash_name,
+                sorted_pairs=self.sorted_pairs, metrics=self.metrics,
+            )
+        else:
+            for issuer_id in fingerprint.keys() | self.fingerprint.keys():
+                if fingerprint.get(issuer_id) != self.fingerprint.get(issuer_id):
+                    self.tree.set_shard(issuer_id, self.iter_shard_leaves(issuer_id))
+        self.fingerprint = fingerprint
+
+    def _current(self):
+        # an empty forest has no root to anchor or prove against
+        if self.tree is None or self.tree.get_root() is None:
+            return None
+        return self.tree
+
+    def _sync(self):
+        fingerprint = self._db_fingerprint()
+        if self.tree is None or fingerprint != self.fingerprint:
+            self._reload(fingerprint)
+        return self._current()
+
+    def anchor_state(self, tree):
+        with tree.top_lock:
+            return tree.get_root(), tree.leaf_count()
+
+    def append(self, certificate):
+        with self.lock:
+            self._assign_leaf_index(certificate)
+            generation = self._db_generation()
+            fingerprint = self._db_fingerprint()
+
+            issuer_id = certificate.issuer_id
+            _, valid, slots = self.fingerprint.get(issuer_id, (None, 0, 0))
+            expected = dict(self.fingerprint)
+            expected[issuer_id] = (certificate.leaf_index, valid + 1, slots + 1)
+
+            if self.tree is not None and fingerprint == expected:
+                self.tree.append_leaf(issuer_id, certificate.ipfs_cid)
+                self.fingerprint = fingerprint
+            else:
+                self._reload(fingerprint)
+
+            return self._remember(generation, self._current())
+
+    def revoke(self, certificate):
+        with self.lock:
+            generation = self._db_generation()
+            fingerprint = self._db_fingerprint()
+
+            issuer_id = certificate.issuer_id
+            previous = self.fingerprint.get(issuer_id)
+            index = None
+            expected = None
+            if self.tree is not None and previous is not None:
+                index = self.tree.index_of(issuer_id, certificate.ipfs_cid)
+                expected = dict(self.fingerprint)
+                expected[issuer_id] = (previous[0], previous[1] - 1, previous[2])
+
+            if index is not None and fingerprint == expected:
+                self.tree.revoke(issuer_id, index)
+                self.fingerprint = fingerprint
+            elif self.tree is None or fingerprint != self.fingerprint:
+                self._reload(fingerprint)
+
+            return self._remember(generation, self._current())
+
+    def proof_for(self, cid, leaf_index=None):
+        """
+        Return (leaf_hash, proof, root) for a certificate CID, or None if
+        it is not a live leaf of the current forest. leaf_index (unique)
+        makes the issuer lookup an index hit.
+        """
+        with self.lock:
+            forest = self.get_tree()
+            if forest is None or cid is None:
+                return None
+
+            root = forest.get_root()
+            cached = proof_cache.get_proof(self.anchor, root, cid)
+            if cached is not None:
+                return cached
+
+            if leaf_index is not None:
+                rows = Certificate.objects.filter(leaf_index=leaf_index)
+            else:
+                rows = Certificate.objects.filter(ipfs_cid=cid)
+            issuer_id = rows.values_list('issuer_id', flat=True).first()
+            index = forest.index_of(issuer_id, cid)
+            if index is None:
+                return None
+
+            proof, root = forest.proof_and_root(issuer_id, index)
+            proof_data = (forest.get_leaf(issuer_id, index), proof, root)
+            proof_cache.set_proof(self.anchor, root, cid, proof_data)
+            return proof_data
+
+    def multiproof_for(self, certificates):
+        """
+        Return (leaf_hashes, {"indices", "proofs"}, root) for every
+        certificate that is a live leaf of the forest, or None if none is:
+        one flat proof per certificate, for verify_forest_multiproof().
+        """
+        with self.lock:
+            forest = self.get_tree()
+            if forest is None:
+                return None
+
+            entries = []
+            for certificate in certificates:
+                if certificate.ipfs_cid is None or certificate.leaf_index is None:
+                    continue
+                index = forest.index_of(certificate.issuer_id, certificate.ipfs_cid)
+                if index is not None:
+                    entries.append((certificate.leaf_index, certificate.issuer_id, index))
+            if not entries:
+                return None
+
+            entries.sort()
+            multiproof = {
+                'indices': [leaf_index for leaf_index, _, _ in entries],
+                'proofs': [forest.get_proof(issuer_id, index) for _, issuer_id, index in entries],
+            }
+            leaf_hashes = [forest.get_leaf(issuer_id, index) for _, issuer_id, index in entries]
+            return leaf_hashes, multiproof, forest.get_root()
+
+    def consistency_proof(self, old_root, new_root):
+        """Not available for a forest: adding an issuer re-slots the top tree."""
+        return None
+
+
+if getattr(settings, 'MERKLE_SETTINGS', {}).get('FOREST', False):
+    merkle_registry = ForestRegistry()
+else:
+    merkle_registry = MerkleRegistry()
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.3 on 2026-10-18 09:00
+
+from django.db import migrations, models
+
+
+def assign_leaf_indexes(apps, schema_editor):
+    """Give every anchored certificate a slot, oldest first."""
+    Certificate = apps.get_model('certificates', 'Certificate')
+    anchored = Certificate.objects.exclude(ipfs_cid__isnull=True).order_by('issued_date', 'id')
+    for index, certificate in enumerate(anchored.iterator()):
+        certificate.leaf_index = index
+        certificate.save(update_fields=['leaf_index'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('certificates', '0002_certificate_ipfs_cid'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='certificate',
+            name='leaf_index',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, unique=True),
+        ),
+        migrations.RunPython(assign_leaf_indexes, migrations.RunPython.noop),
+    ]
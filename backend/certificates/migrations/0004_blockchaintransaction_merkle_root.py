@@ -0,0 +1,23 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('certificates', '0003_certificate_leaf_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blockchaintransaction',
+            name='merkle_root',
+            field=models.CharField(blank=True, db_index=True, max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name='blockchaintransaction',
+            name='leaf_count',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
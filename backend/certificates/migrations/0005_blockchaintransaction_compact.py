@@ -0,0 +1,24 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('certificates', '0004_blockchaintransaction_merkle_root'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='blockchaintransaction',
+            name='certificate',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='blockchain_transactions', to='certificates.certificate'),
+        ),
+        migrations.AlterField(
+            model_name='blockchaintransaction',
+            name='transaction_type',
+            field=models.CharField(choices=[('issue', 'Certificate Issue'), ('revoke', 'Certificate Revocation'), ('verify', 'Verification'), ('compact', 'Merkle Compaction')], max_length=20),
+        ),
+    ]
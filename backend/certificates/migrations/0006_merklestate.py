@@ -0,0 +1,33 @@
+# Generated by Django 5.2.3 on 2026-10-18 14:00
+
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def create_state(apps, schema_editor):
+    """Start slot allocation after the highest slot already handed out."""
+    Certificate = apps.get_model('certificates', 'Certificate')
+    MerkleState = apps.get_model('certificates', 'MerkleState')
+    last_index = Certificate.objects.aggregate(last=Max('leaf_index'))['last']
+    MerkleState.objects.create(pk=1, next_leaf_index=0 if last_index is None else last_index + 1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('certificates', '0005_blockchaintransaction_compact'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MerkleState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('next_leaf_index', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'merkle_state',
+            },
+        ),
+        migrations.RunPython(create_state, migrations.RunPython.noop),
+    ]
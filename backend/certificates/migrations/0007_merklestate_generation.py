@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-18 14:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('certificates', '0006_merklestate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='merklestate',
+            name='generation',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+    ]
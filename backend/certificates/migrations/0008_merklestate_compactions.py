@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-18 15:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('certificates', '0007_merklestate_generation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='merklestate',
+            name='compactions',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
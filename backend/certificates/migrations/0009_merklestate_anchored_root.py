@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-18 18:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('certificates', '0008_merklestate_compactions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='merklestate',
+            name='anchored_root',
+            field=models.CharField(blank=True, default='', max_length=66),
+        ),
+    ]
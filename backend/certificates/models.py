@@ -55,6 +55,11 @@ class Certificate(models.Model):
     certificate_id = models.CharField(max_length=100, unique=True, editable=False)
     ipfs_cid = models.CharField(max_length=255, blank=True, null=True)
     
+    # Position of this certificate's leaf in the Merkle tree.
+    # Assigned once at issuance and never reused; a revoked certificate
+    # keeps its slot, which then holds the revoked sentinel leaf.
+    leaf_index = models.PositiveIntegerField(unique=True, blank=True, null=True, editable=False)
+    
     # Certificate details
     title = models.CharField(max_length=255)
     holder_name = models.CharField(max_length=255)
@@ -292,6 +297,7 @@ class BlockchainTransaction(models.Model):
         ('issue', 'Certificate Issue'),
         ('revoke', 'Certificate Revocation'),
         ('verify', 'Verification'),
+        ('compact', 'Merkle Compaction'),
     ]
     
     STATUS_CHOICES = [
@@ -300,10 +306,13 @@ class BlockchainTransaction(models.Model):
         ('failed', 'Failed'),
     ]
     
+    # null for tree-wide transactions (compaction)
     certificate = models.ForeignKey(
         Certificate,
         on_delete=models.CASCADE,
-        related_name='blockchain_transactions'
+        related_name='blockchain_transactions',
+        null=True,
+        blank=True
     )
     
     # Transaction details
@@ -317,6 +326,10 @@ class BlockchainTransaction(models.Model):
     gas_used = models.BigIntegerField(null=True, blank=True)
     gas_price = models.BigIntegerField(null=True, blank=True)
     
+    # Merkle state anchored by this transaction (for consistency proofs)
+    merkle_root = models.CharField(max_length=64, blank=True, null=True, db_index=True)
+    leaf_count = models.PositiveIntegerField(null=True, blank=True)
+    
     # Status
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     error_message = models.TextField(blank=True, null=True)
@@ -335,3 +348,44 @@ class BlockchainTransaction(models.Model):
     
     def __str__(self):
         return f"{self.transaction_type} - {self.tx_hash[:10]}..."
+
+
+class MerkleState(models.Model):
+    """
+    Single row (pk=1) of Merkle bookkeeping shared by every worker.
+    Issuance locks it to hand out leaf slots, so concurrent workers
+    never pick the same leaf_index. generation moves on every
+    certificate write, so workers can tell in one row read whether
+    their tree may be stale; compactions counts slot remaps.
+    anchored_root is the root last confirmed on-chain, read with the
+    generation so every worker keys its cached proofs on it.
+    """
+    
+    next_leaf_index = models.PositiveIntegerField(default=0)
+    generation = models.PositiveBigIntegerField(default=0)
+    compactions = models.PositiveIntegerField(default=0)
+    anchored_root = models.CharField(max_length=66, blank=True, default='')
+    
+    class Meta:
+        db_table = 'merkle_state'
+    
+    def __str__(self):
+        return f"Merkle state (next slot {self.next_leaf_index})"
+    
+    @classmethod
+    def locked(cls):
+        """The state row, locked until the surrounding transaction ends"""
+        state, _ = cls.objects.select_for_update().get_or_create(pk=1)
+        return state
+    
+    @classmethod
+    def bump(cls):
+        """Mark the certificate set as changed"""
+        if not cls.objects.filter(pk=1).update(generation=models.F('generation') + 1):
+            cls.objects.get_or_create(pk=1)
+    
+    @classmethod
+    def set_anchor(cls, root):
+        """Record the root most recently confirmed on-chain"""
+        if not cls.objects.filter(pk=1).update(anchored_root=root):
+            cls.objects.update_or_create(pk=1, defaults={'anchored_root': root})
@@ -0,0 +1,38 @@
+"""
+Certificate Management System - Proof Cache
+Merkle proofs cached per root through Django's cache framework
+"""
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .models import MerkleState
+
+
+def _cache():
+    alias = getattr(settings, 'MERKLE_SETTINGS', {}).get('PROOF_CACHE', 'default')
+    return caches[alias]
+
+
+def _key(anchor, root, cid):
+    # anchor is the root last confirmed on-chain (MerkleState.anchored_root,
+    # which the registry reads with the generation row), so anchoring a new
+    # root starts a fresh cache generation in every worker. The local root
+    # is part of the key too, so an entry never outlives the tree it came
+    # from; older proofs become unreachable at once and age out through the
+    # backend's TTL / LRU cull.
+    return f"merkle_proof:{anchor}:{root}:{cid}"
+
+
+def get_proof(anchor, root, cid):
+    """Return the cached (leaf_hash, proof, root) for cid under root, or None."""
+    return _cache().get(_key(anchor, root, cid))
+
+
+def set_proof(anchor, root, cid, proof_data):
+    _cache().set(_key(anchor, root, cid), proof_data)
+
+
+def set_anchor(root):
+    """Invalidate every cached proof once `root` has been anchored on-chain."""
+    MerkleState.set_anchor(root)
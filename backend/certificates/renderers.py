@@ -0,0 +1,39 @@
+"""
+Certificate Management System - Renderers
+Binary responses for clients that ask for Accept: application/octet-stream
+"""
+
+from rest_framework.renderers import BaseRenderer
+
+from merkle.merkle_tree import prometheus_text
+
+
+class OctetStreamRenderer(BaseRenderer):
+    """Pass bytes through untouched (e.g. a compact Merkle proof)."""
+
+    media_type = 'application/octet-stream'
+    format = 'bin'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, (bytes, bytearray)):
+            return bytes(data)
+        # errors and other non-binary payloads still go out as JSON text
+        from rest_framework.renderers import JSONRenderer
+        return JSONRenderer().render(data, renderer_context=renderer_context)
+
+
+class PrometheusRenderer(BaseRenderer):
+    """Merkle metrics snapshot in the Prometheus text exposition format."""
+
+    media_type = 'text/plain'
+    format = 'prometheus'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if not isinstance(data, dict) or 'phases' not in data:
+            from rest_framework.renderers import JSONRenderer
+            return JSONRenderer().render(data, renderer_context=renderer_context)
+
+        return prometheus_text(data).encode('utf-8')
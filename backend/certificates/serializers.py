@@ -74,9 +74,11 @@ class CertificateSerializer(serializers.ModelSerializer):
             'hash_value', 'status', 'is_valid',
             'issued_date', 'expiry_date', 'modified_date',
             # Blockchain fields
-            'blockchain_tx_hash', 'blockchain_network', 'smart_contract_address'
+            'blockchain_tx_hash', 'blockchain_network', 'smart_contract_address',
+            'leaf_index'
         ]
-        read_only_fields = ['id', 'certificate_id', 'hash_value', 'issued_date', 'modified_date']
+        read_only_fields = ['id', 'certificate_id', 'hash_value', 'issued_date', 'modified_date',
+                            'leaf_index']
     
     def get_file_url(self, obj):
         request = self.context.get('request')
@@ -132,8 +134,8 @@ class BlockchainTransactionSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'certificate', 'certificate_id', 'transaction_type',
             'tx_hash', 'block_number', 'network', 'contract_address',
-            'gas_used', 'gas_price', 'status', 'error_message',
-            'created_at', 'confirmed_at'
+            'gas_used', 'gas_price', 'merkle_root', 'leaf_count',
+            'status', 'error_message', 'created_at', 'confirmed_at'
         ]
         read_only_fields = ['id', 'created_at', 'confirmed_at']
 
@@ -182,6 +184,18 @@ class VerifyRequestSerializer(serializers.Serializer):
     """Certificate verification request"""
     
     certificate_id = serializers.CharField()
+    # 'compact' returns the proof as base64url (see merkle.proof_codec)
+    proof_format = serializers.ChoiceField(choices=['json', 'compact'], default='json')
+
+
+class BatchVerifyRequestSerializer(serializers.Serializer):
+    """Bulk certificate verification request"""
+    
+    certificate_ids = serializers.ListField(
+        child=serializers.CharField(),
+        allow_empty=False,
+        max_length=1000
+    )
 
 
 class VerifyResponseSerializer(serializers.Serializer):
@@ -217,6 +231,17 @@ class RevocationRecordSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'revoked_at']
 
 
+class ConsistencyProofRequestSerializer(serializers.Serializer):
+    """Consistency proof request between two anchored Merkle roots"""
+    
+    old_root = serializers.RegexField(r'^(0x)?[0-9a-fA-F]{64}$')
+    new_root = serializers.RegexField(r'^(0x)?[0-9a-fA-F]{64}$')
+
+    def validate(self, data):
+        # roots are stored as lowercase hex without 0x
+        return {key: value.lower().removeprefix('0x') for key, value in data.items()}
+
+
 class RevokeRequestSerializer(serializers.Serializer):
     """Certificate revocation request"""
     
@@ -259,8 +284,8 @@ class BlockchainTransactionSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'certificate', 'certificate_id', 'transaction_type',
             'tx_hash', 'block_number', 'network', 'contract_address',
-            'gas_used', 'gas_price', 'status', 'error_message',
-            'created_at', 'confirmed_at'
+            'gas_used', 'gas_price', 'merkle_root', 'leaf_count',
+            'status', 'error_message', 'created_at', 'confirmed_at'
         ]
         read_only_fields = ['id', 'created_at', 'confirmed_at']
 
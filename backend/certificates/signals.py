@@ -0,0 +1,16 @@
+"""
+Certificate Management System - Signals
+Bump the Merkle generation whenever a certificate row changes
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Certificate, MerkleState
+
+
+@receiver(post_save, sender=Certificate)
+@receiver(post_delete, sender=Certificate)
+def bump_merkle_generation(sender, **kwargs):
+    # queryset .update() / bulk_update() skip signals: callers bump themselves
+    MerkleState.bump()
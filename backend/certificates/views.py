@@ -13,6 +13,7 @@ from django.utils import timezone
 from rest_framework_simplejwt.tokens import RefreshToken
 
 from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework.renderers import JSONRenderer, BrowsableAPIRenderer
 
 
 
@@ -27,10 +28,12 @@ from .serializers import (
     UserSerializer, UserRegistrationSerializer, UserLoginSerializer,
     CertificateSerializer, CertificateCreateSerializer, CertificateListSerializer,
     VerificationLogSerializer, VerifyRequestSerializer, VerifyResponseSerializer,
+    BatchVerifyRequestSerializer, ConsistencyProofRequestSerializer,
     RevocationRecordSerializer, RevokeRequestSerializer,
     AuditLogSerializer, BlockchainTransactionSerializer
 )
 from .permissions import IsIssuer, IsVerifier, IsOwnerOrReadOnly
+from .renderers import OctetStreamRenderer, PrometheusRenderer
 
 User = get_user_model()
 
@@ -395,8 +398,9 @@ class CertificateViewSet(viewsets.ModelViewSet):
 
     def perform_create(self, serializer):
         from ipfs.ipfs_service import upload_json_to_ipfs
-        from merkle.merkle_tree import MerkleTree
         from blockchain.send_root import send_root
+        from . import proof_cache
+        from .merkle_registry import merkle_registry
         import os
 
         # 1️⃣ Save certificate with issuer
@@ -421,18 +425,17 @@ class CertificateViewSet(viewsets.ModelViewSet):
             print(f"⚠️ IPFS upload failed: {e}")
             cid = None
 
-        # 4️⃣ Build Merkle Tree from all valid certificates
-        valid_certs = Certificate.objects.filter(
-            status='valid'
-        ).exclude(ipfs_cid__isnull=True)
-        leaves = [cert.ipfs_cid for cert in valid_certs]
+        # 4️⃣ Append to the long-lived Merkle tree (O(log n), no rebuild)
+        if cid:
+            tree = merkle_registry.append(certificate)
+        else:
+            tree = merkle_registry.get_tree()
 
-        if not leaves:
+        if tree is None:
             print("⚠️ No valid certificates to build Merkle tree")
             return
 
-        tree     = MerkleTree(leaves)
-        new_root = tree.get_root()
+        new_root, leaf_count = merkle_registry.anchor_state(tree)
 
         # 5️⃣ Send new root to Sepolia blockchain
         try:
@@ -447,9 +450,12 @@ class CertificateViewSet(viewsets.ModelViewSet):
                 network=result.get("network", "sepolia"),
                 contract_address=result.get("contract_address", os.getenv("CONTRACT_ADDRESS")),
                 gas_used=result["gas_used"],
+                merkle_root=new_root,
+                leaf_count=leaf_count,
                 status="confirmed",
                 confirmed_at=timezone.now()
             )
+            proof_cache.set_anchor(new_root)
 
             # 7️⃣ Audit log
             AuditLog.objects.create(
@@ -609,21 +615,29 @@ class VerifyCertificateView(APIView):
       1. DB hash integrity
       2. Revocation status
       3. On-chain Merkle root comparison
+
+    Accept: application/octet-stream returns only the proof in the compact
+    binary format (merkle.proof_codec), with the verdict, leaf and root in
+    X- headers; proof_format='compact' puts it in the JSON as base64url.
     """
 
     permission_classes = [permissions.AllowAny]
+    renderer_classes = [JSONRenderer, BrowsableAPIRenderer, OctetStreamRenderer]
 
     def post(self, request):
         # from merkle.merkle_tree import MerkleTree, verify_proof
         # from blockchain.blockchain_service import get_merkle_root, is_connected
-        from merkle.merkle_tree import MerkleTree, verify_proof
+        from merkle.merkle_tree import verify_proof
+        from merkle.proof_codec import encode_proof, encode_proof_b64
         from blockchain.blockchain_service import get_merkle_root, is_connected
+        from .merkle_registry import merkle_registry
         
         serializer = VerifyRequestSerializer(data=request.data)
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
         certificate_id = serializer.validated_data['certificate_id']
+        proof_format   = serializer.validated_data['proof_format']
 
         try:
             certificate = Certificate.objects.get(certificate_id=certificate_id)
@@ -632,23 +646,21 @@ class VerifyCertificateView(APIView):
             hash_match = certificate.verify_integrity()
             is_revoked = certificate.status == 'revoked'
 
-            # ── Step 2: Rebuild Merkle tree from all valid certs ──────────────
-            valid_certs = Certificate.objects.filter(
-                status='valid'
-            ).exclude(ipfs_cid__isnull=True)
-            leaves = [cert.ipfs_cid for cert in valid_certs]
+            # ── Step 2: Proof from the shared Merkle tree ─────────────────────
+            proof_data = merkle_registry.proof_for(certificate.ipfs_cid, certificate.leaf_index)
+            engine     = merkle_registry.engine
+            hash_name  = merkle_registry.hash_name
+            sorted_pairs = merkle_registry.sorted_pairs
 
             merkle_valid    = False
             proof           = []
+            leaf_hash       = None
+            local_root      = None
             blockchain_root = None
             blockchain_ok   = False
 
-            if certificate.ipfs_cid in leaves:
-                tree      = MerkleTree(leaves)
-                index     = leaves.index(certificate.ipfs_cid)
-                proof     = tree.get_proof(index)
-                leaf_hash = tree.leaves[index]
-                local_root = tree.get_root()
+            if proof_data is not None:
+                leaf_hash, proof, local_root = proof_data
 
                 # ── Step 3: Get on-chain root (with graceful failure) ─────────
                 try:
@@ -659,12 +671,20 @@ class VerifyCertificateView(APIView):
                     blockchain_ok   = True
 
                     # ── Step 4: Verify Merkle proof against on-chain root ─────
-                    merkle_valid = verify_proof(leaf_hash, proof, blockchain_root)
+                    merkle_valid = verify_proof(
+                        leaf_hash, proof, blockchain_root,
+                        engine=engine, hash_name=hash_name, sorted_pairs=sorted_pairs,
+                        metrics=merkle_registry.metrics,
+                    )
 
                 except Exception as e:
                     print(f"⚠️ Blockchain verification failed: {e}")
                     # Fallback: compare against locally rebuilt root
-                    merkle_valid  = verify_proof(leaf_hash, proof, local_root)
+                    merkle_valid  = verify_proof(
+                        leaf_hash, proof, local_root,
+                        engine=engine, hash_name=hash_name, sorted_pairs=sorted_pairs,
+                        metrics=merkle_registry.metrics,
+                    )
                     blockchain_ok = False
 
             # ── Final decision ────────────────────────────────────────────────
@@ -695,7 +715,17 @@ class VerifyCertificateView(APIView):
                     ip_address=self.get_client_ip(request)
                 )
 
-            return Response({
+            # ── Compact proof for mobile / QR verifiers ───────────────────────
+            if request.accepted_renderer.format == 'bin':
+                response = Response(encode_proof(proof))
+                response['X-Certificate-Valid'] = 'true' if is_valid else 'false'
+                if leaf_hash is not None:
+                    response['X-Merkle-Leaf'] = leaf_hash
+                if blockchain_root or local_root:
+                    response['X-Merkle-Root'] = blockchain_root or local_root
+                return response
+
+            response_data = {
                 'valid':                is_valid,
                 'certificate':          CertificateSerializer(certificate, context={'request': request}).data,
                 'hash_match':           hash_match,
@@ -705,7 +735,11 @@ class VerifyCertificateView(APIView):
                 'blockchain_root':      blockchain_root,
                 'merkle_proof':         proof,
                 'verified_at':          verification.verified_at,
-            })
+            }
+            if proof_format == 'compact':
+                del response_data['merkle_proof']
+                response_data['merkle_proof_compact'] = encode_proof_b64(proof)
+            return Response(response_data)
 
         except Certificate.DoesNotExist:
             VerificationLog.objects.create(
@@ -727,6 +761,186 @@ class VerifyCertificateView(APIView):
             return x_forwarded_for.split(',')[0]
         return request.META.get('REMOTE_ADDR')
 
+class BatchVerifyCertificateView(APIView):
+    """
+    Bulk certificate verification endpoint.
+    Same checks as VerifyCertificateView, but all certificates share one
+    Merkle multiproof, so common sibling hashes are sent and hashed once.
+    """
+
+    permission_classes = [permissions.AllowAny]
+
+    def post(self, request):
+        from merkle.forest import verify_forest_multiproof
+        from merkle.merkle_tree import verify_multiproof
+        from blockchain.blockchain_service import get_merkle_root, is_connected
+        from .merkle_registry import merkle_registry
+
+        serializer = BatchVerifyRequestSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        certificate_ids = serializer.validated_data['certificate_ids']
+        certificates = {
+            certificate.certificate_id: certificate
+            for certificate in Certificate.objects.filter(certificate_id__in=certificate_ids)
+        }
+
+        # ── Step 1: One multiproof for every certificate still valid ──────────
+        live = [c for c in certificates.values() if c.status == 'valid']
+        proof_data = merkle_registry.multiproof_for(live)
+        engine     = merkle_registry.engine
+        hash_name  = merkle_registry.hash_name
+        sorted_pairs = merkle_registry.sorted_pairs
+        # a forest sends one flat proof per certificate instead
+        verify_batch = verify_forest_multiproof if merkle_registry.forest else verify_multiproof
+
+        merkle_valid    = False
+        multiproof      = None
+        leaf_hashes     = []
+        blockchain_root = None
+        blockchain_ok   = False
+
+        if proof_data is not None:
+            leaf_hashes, multiproof, local_root = proof_data
+
+            # ── Step 2: Verify against on-chain root (with graceful failure) ──
+            try:
+                if not is_connected():
+                    raise ConnectionError("Not connected to Sepolia")
+
+                blockchain_root = get_merkle_root()  # hex, no 0x
+                blockchain_ok   = True
+                merkle_valid    = verify_batch(
+                    leaf_hashes, multiproof, blockchain_root,
+                    engine=engine, hash_name=hash_name, sorted_pairs=sorted_pairs,
+                    metrics=merkle_registry.metrics,
+                )
+
+            except Exception as e:
+                print(f"⚠️ Blockchain verification failed: {e}")
+                merkle_valid  = verify_batch(
+                    leaf_hashes, multiproof, local_root,
+                    engine=engine, hash_name=hash_name, sorted_pairs=sorted_pairs,
+                    metrics=merkle_registry.metrics,
+                )
+                blockchain_ok = False
+
+        proven = set(multiproof['indices']) if multiproof else set()
+
+        # ── Step 3: Per-certificate decision + logs ───────────────────────────
+        results = []
+        logs    = []
+        verifier = request.user if request.user.is_authenticated else None
+        ip_address = self.get_client_ip(request)
+
+        for certificate_id in certificate_ids:
+            certificate = certificates.get(certificate_id)
+
+            if certificate is None:
+                results.append({
+                    'certificate_id': certificate_id,
+                    'valid':          False,
+                    'message':        'Certificate not found',
+                })
+                logs.append(VerificationLog(
+                    certificate=None,
+                    verifier=verifier,
+                    certificate_id_checked=certificate_id,
+                    result='not_found',
+                    hash_match=False,
+                    ip_address=ip_address
+                ))
+                continue
+
+            hash_match = certificate.verify_integrity()
+            is_revoked = certificate.status == 'revoked'
+            blockchain_verified = merkle_valid and certificate.leaf_index in proven
+            is_valid = hash_match and not is_revoked and blockchain_verified
+
+            results.append({
+                'certificate_id':      certificate_id,
+                'leaf_index':          certificate.leaf_index,
+                'valid':               is_valid,
+                'hash_match':          hash_match,
+                'is_revoked':          is_revoked,
+                'blockchain_verified': blockchain_verified,
+            })
+            logs.append(VerificationLog(
+                certificate=certificate,
+                verifier=verifier,
+                certificate_id_checked=certificate_id,
+                result='valid' if is_valid else ('revoked' if is_revoked else 'invalid'),
+                hash_match=hash_match,
+                blockchain_verified=blockchain_verified,
+                ip_address=ip_address,
+                user_agent=request.META.get('HTTP_USER_AGENT', '')
+            ))
+
+        VerificationLog.objects.bulk_create(logs)
+
+        return Response({
+            'results':              results,
+            'blockchain_verified':  merkle_valid,
+            'blockchain_connected': blockchain_ok,
+            'blockchain_root':      blockchain_root,
+            'leaf_hashes':          leaf_hashes,
+            'merkle_multiproof':    multiproof,
+            'verified_at':          timezone.now(),
+        })
+
+    def get_client_ip(self, request):
+        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
+        if x_forwarded_for:
+            return x_forwarded_for.split(',')[0]
+        return request.META.get('REMOTE_ADDR')
+
+class ConsistencyProofView(APIView):
+    """
+    Audit endpoint: proves that new_root (the current root) extends an
+    earlier anchored old_root, in O(log n) hashes instead of every leaf.
+    Certificates revoked in between are listed as in-place changes.
+    """
+
+    permission_classes = [permissions.AllowAny]
+
+    def post(self, request):
+        from merkle.consistency import verify_consistency
+        from .merkle_registry import merkle_registry
+
+        serializer = ConsistencyProofRequestSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        if merkle_registry.forest:
+            return Response({
+                'error': 'Consistency proofs are not available with MERKLE_FOREST',
+            }, status=status.HTTP_501_NOT_IMPLEMENTED)
+
+        old_root = serializer.validated_data['old_root']
+        new_root = serializer.validated_data['new_root']
+
+        proof = merkle_registry.consistency_proof(old_root, new_root)
+        if proof is None:
+            return Response({
+                'error': 'old_root was never anchored or new_root is not the current root',
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        consistent = verify_consistency(
+            old_root, new_root, proof,
+            engine=merkle_registry.engine,
+            hash_name=merkle_registry.hash_name,
+            sorted_pairs=merkle_registry.sorted_pairs,
+        )
+
+        return Response({
+            'old_root':          old_root,
+            'new_root':          new_root,
+            'consistent':        consistent,
+            'revoked_indices':   [index for index, _, _ in proof['changes']],
+            'consistency_proof': proof,
+        })
+
 # ============================================================================
 # REVOCATION VIEWS (Module 6)
 # ============================================================================
@@ -749,8 +963,9 @@ class RevokeCertificateView(APIView):
     permission_classes = [permissions.IsAuthenticated, IsIssuer]
 
     def post(self, request):
-        from merkle.merkle_tree import MerkleTree
         from blockchain.send_root import send_root
+        from . import proof_cache
+        from .merkle_registry import merkle_registry
 
         serializer = RevokeRequestSerializer(data=request.data)
         if not serializer.is_valid():
@@ -778,7 +993,8 @@ class RevokeCertificateView(APIView):
 
             # ── 1. Update DB status ───────────────────────────────────────────
             certificate.status = 'revoked'
-            certificate.save()
+            # status only: a compaction may have moved leaf_index meanwhile
+            certificate.save(update_fields=['status', 'modified_date'])
 
             # ── 2. Create RevocationRecord ────────────────────────────────────
             revocation = RevocationRecord.objects.create(
@@ -787,17 +1003,13 @@ class RevokeCertificateView(APIView):
                 reason=reason
             )
 
-            # ── 3. Rebuild Merkle tree WITHOUT this certificate ───────────────
-            valid_certs = Certificate.objects.filter(
-                status='valid'
-            ).exclude(ipfs_cid__isnull=True)
-            leaves = [cert.ipfs_cid for cert in valid_certs]
+            # ── 3. Overwrite its leaf with the revoked sentinel (delta) ───────
+            tree = merkle_registry.revoke(certificate)
 
             blockchain_result = None
-            if leaves:
+            if tree is not None:
                 try:
-                    tree     = MerkleTree(leaves)
-                    new_root = tree.get_root()
+                    new_root, leaf_count = merkle_registry.anchor_state(tree)
 
                     # ── 4. Push updated root to blockchain ────────────────────
                     blockchain_result = send_root("0x" + new_root)
@@ -811,9 +1023,12 @@ class RevokeCertificateView(APIView):
                         network=blockchain_result.get("network", "sepolia"),
                         contract_address=blockchain_result.get("contract_address"),
                         gas_used=blockchain_result["gas_used"],
+                        merkle_root=new_root,
+                        leaf_count=leaf_count,
                         status="confirmed",
                         confirmed_at=timezone.now()
                     )
+                    proof_cache.set_anchor(new_root)
                     print(f"✅ Revocation root updated | tx: {blockchain_result['tx_hash']}")
 
                 except Exception as e:
@@ -972,3 +1187,19 @@ class DashboardStatsView(APIView):
             }
         
         return Response(stats)
+
+
+class MerkleMetricsView(APIView):
+    """
+    Merkle instrumentation snapshot of this worker process: per-phase
+    call counts, time, hash operations and latency histograms. JSON by
+    default, Prometheus text with ?format=prometheus or Accept: text/plain.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+    renderer_classes = [JSONRenderer, BrowsableAPIRenderer, PrometheusRenderer]
+
+    def get(self, request):
+        from .merkle_registry import merkle_registry
+
+        return Response(merkle_registry.metrics.snapshot())
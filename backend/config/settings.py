@@ -207,6 +207,51 @@ BLOCKCHAIN_SETTINGS = {
     'GAS_LIMIT': int(os.environ.get('GAS_LIMIT', '300000')),
 }
 
+# ============================================================================
+# MERKLE TREE SETTINGS
+# ============================================================================
+
+MERKLE_SETTINGS = {
+    # 'hex' matches the roots already anchored on-chain, 'binary' is faster
+    'ENGINE': os.environ.get('MERKLE_ENGINE', 'hex'),
+    # 'sha256' (anchored roots), 'blake2b', or 'keccak256' (contract parity);
+    # a '-ds' suffix (e.g. 'sha256-ds') prefixes leaves 0x00 and nodes 0x01
+    'HASH': os.environ.get('MERKLE_HASH', 'sha256'),
+    # Hash each node pair smaller-first: proofs become a flat sibling list
+    'SORTED_PAIRS': os.environ.get('MERKLE_SORTED_PAIRS', 'False') == 'True',
+    # Processes used for full (cold-start) tree builds; 1 = serial
+    'BUILD_WORKERS': int(os.environ.get('MERKLE_BUILD_WORKERS', '1')),
+    # Levels kept in RAM below the root; lower ones are recomputed from the
+    # leaves per proof (0 = keep every level, fastest proofs)
+    'TOP_LEVELS': int(os.environ.get('MERKLE_TOP_LEVELS', '0')),
+    # One subtree per issuer under a root of roots (per-issuer rebuilds);
+    # changes the anchored root, and turns off the single-tree options
+    'FOREST': os.environ.get('MERKLE_FOREST', 'False') == 'True',
+    # Memory-mapped tree file shared by workers across restarts ('' = off)
+    'STORE_PATH': os.environ.get('MERKLE_STORE_PATH', ''),
+    # Seconds between store rewrites after in-place issuances/revocations
+    'STORE_SAVE_INTERVAL': int(os.environ.get('MERKLE_STORE_SAVE_INTERVAL', '60')),
+    # Shared-memory segment kept by `manage.py run_merkle_writer` ('' = off)
+    'SHARED_TREE': os.environ.get('MERKLE_SHARED_TREE', ''),
+    # Cache alias (see CACHES) holding proofs keyed by (anchored root, root, CID)
+    'PROOF_CACHE': 'merkle_proofs',
+}
+
+# Use a shared backend (e.g. Redis) here so all workers reuse the same proofs
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'merkle_proofs': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'merkle-proofs',
+        'TIMEOUT': int(os.environ.get('MERKLE_PROOF_CACHE_TTL', '3600')),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.environ.get('MERKLE_PROOF_CACHE_SIZE', '10000')),
+        },
+    },
+}
+
 # ============================================================================
 # SECURITY SETTINGS
 # ============================================================================
@@ -26,6 +26,8 @@ from certificates.views import (
     # Verification
     VerificationViewSet,
     VerifyCertificateView,
+    BatchVerifyCertificateView,
+    ConsistencyProofView,
     
     # Revocation
     RevocationViewSet,
@@ -40,6 +42,9 @@ from certificates.views import (
     
     # Dashboard
     DashboardStatsView,
+    
+    # Metrics
+    MerkleMetricsView,
 )
 
 # Router for ViewSets
@@ -61,6 +66,10 @@ urlpatterns = [
     
     # Verification endpoint (public)
     path('verify/', VerifyCertificateView.as_view(), name='verify-certificate'),
+    path('verify/batch/', BatchVerifyCertificateView.as_view(), name='verify-certificate-batch'),
+    
+    # Merkle audit endpoint (public)
+    path('merkle/consistency/', ConsistencyProofView.as_view(), name='merkle-consistency'),
     
     # Revocation endpoint
     path('revoke/', RevokeCertificateView.as_view(), name='revoke-certificate'),
@@ -71,6 +80,9 @@ urlpatterns = [
     # Dashboard
     path('dashboard/stats/', DashboardStatsView.as_view(), name='dashboard-stats'),
     
+    # Merkle instrumentation (JSON or ?format=prometheus)
+    path('metrics/', MerkleMetricsView.as_view(), name='merkle-metrics'),
+    
     # Include router URLs
     path('', include(router.urls)),
 ]
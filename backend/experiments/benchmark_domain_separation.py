@@ -0,0 +1,111 @@
+"""
+benchmark_domain_separation.py
+==============================
+Cost of domain-separated hashing (sha256-ds) against the current scheme.
+
+Node hashing is timed four ways on the same pairs:
+  hex        : sha256 over the 128-char hex text (engine="hex", anchored roots)
+  binary     : sha256 over the 64 raw bytes (engine="binary")
+  ds-concat  : sha256(0x01 + pair), the prefix glued on per call
+  ds-seeded  : get_hash("sha256-ds"), a pre-seeded object .copy()-ed per call
+
+followed by full tree builds with sha256 / sha256-ds on both engines,
+checking that a proof from each tree verifies.
+
+Run from project root:
+    python backend/experiments/benchmark_domain_separation.py
+
+SIZES TESTED:
+─────────────
+  pairs hashed : 1,000,000
+  tree leaves  : 100,000   1,000,000
+"""
+
+import csv
+import hashlib
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from backend.merkle.hashes import NODE_PREFIX, get_hash
+from backend.merkle.merkle_tree import MerkleTree, verify_proof
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CONFIG
+# ══════════════════════════════════════════════════════════════════════════════
+
+PAIRS    = 1_000_000
+SIZES    = [100_000, 1_000_000]
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def make_leaves(n):
+    return [f"CN=Bench CA {i:08d}|ISSUER=ZeroID|FP={i:016x}" for i in range(n)]
+
+
+def pair_throughput(hash_pair, pair, count):
+    t0 = time.perf_counter()
+    for _ in range(count):
+        hash_pair(pair)
+    elapsed = time.perf_counter() - t0
+    return count / elapsed
+
+
+def node_schemes():
+    raw = bytes(range(64))
+    seeded = get_hash("sha256-ds")
+    return [
+        ("hex",       lambda pair: hashlib.sha256(pair.encode()).hexdigest(), raw.hex()),
+        ("binary",    lambda pair: hashlib.sha256(pair).digest(), raw),
+        ("ds-concat", lambda pair: hashlib.sha256(NODE_PREFIX + pair).digest(), raw),
+        ("ds-seeded", lambda pair: seeded(pair).digest(), raw),
+    ]
+
+
+def timed_build(leaves, engine, hash_name):
+    t0 = time.perf_counter()
+    tree = MerkleTree(leaves, engine=engine, hash_name=hash_name)
+    return tree, (time.perf_counter() - t0) * 1000
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# MAIN
+# ══════════════════════════════════════════════════════════════════════════════
+
+if __name__ == "__main__":
+    out_path = os.path.join(BASE_DIR, "results_domain_separation.csv")
+    print(f"\n{'='*60}")
+    print("DOMAIN SEPARATION: sha256 vs sha256-ds")
+    print(f"{'='*60}")
+
+    with open(out_path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["kind", "scheme", "engine", "n", "pairs_per_sec", "build_ms", "proof_ok"])
+
+        print("\n  Node hashing")
+        for scheme, hash_pair, pair in node_schemes():
+            rate = pair_throughput(hash_pair, pair, PAIRS)
+            writer.writerow(["pairs", scheme, "", PAIRS, round(rate), "", ""])
+            print(f"    {scheme:<10}: {rate:>12,.0f} pairs/s")
+
+        for n in SIZES:
+            leaves = make_leaves(n)
+            print(f"\n  Tree build, n = {n:,}")
+
+            for engine in ("hex", "binary"):
+                for hash_name in ("sha256", "sha256-ds"):
+                    tree, build_ms = timed_build(leaves, engine, hash_name)
+                    index = n // 3
+                    proof_ok = verify_proof(
+                        tree.get_leaf(index), tree.get_proof(index), tree.get_root(),
+                        engine=engine, hash_name=hash_name,
+                    )
+
+                    writer.writerow(["build", hash_name, engine, n, "", round(build_ms, 3), proof_ok])
+                    print(f"    {engine:<6} {hash_name:<9}: build {build_ms:>10.1f} ms  proof ok: {proof_ok}")
+
+                    del tree
+
+    print(f"\n  Saved → {out_path}")
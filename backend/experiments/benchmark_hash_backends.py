@@ -0,0 +1,101 @@
+"""
+benchmark_hash_backends.py
+==========================
+Throughput of the Merkle hash backends (sha256, blake2b, keccak256).
+
+For each backend the script measures raw node hashing (64-byte pairs,
+what every internal node costs) and a full binary-engine tree build,
+and checks that a proof from that tree verifies.
+
+Run from project root:
+    python backend/experiments/benchmark_hash_backends.py
+
+SIZES TESTED:
+─────────────
+  pairs hashed : 1,000,000
+  tree leaves  : 100,000   1,000,000
+
+NOTE: keccak256 needs eth-hash (installed with web3) or pycryptodome;
+it is skipped when neither is available.
+"""
+
+import csv
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from backend.merkle.hashes import HASHES, get_hash
+from backend.merkle.merkle_tree import MerkleTree, verify_proof
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CONFIG
+# ══════════════════════════════════════════════════════════════════════════════
+
+PAIRS    = 1_000_000
+SIZES    = [100_000, 1_000_000]
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def make_leaves(n):
+    return [f"CN=Bench CA {i:08d}|ISSUER=ZeroID|FP={i:016x}" for i in range(n)]
+
+
+def pair_throughput(new, count):
+    pair = bytes(range(64))
+    t0 = time.perf_counter()
+    for _ in range(count):
+        new(pair).digest()
+    elapsed = time.perf_counter() - t0
+    return count / elapsed
+
+
+def timed_build(leaves, hash_name):
+    t0 = time.perf_counter()
+    tree = MerkleTree(leaves, engine="binary", hash_name=hash_name)
+    return tree, (time.perf_counter() - t0) * 1000
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# MAIN
+# ══════════════════════════════════════════════════════════════════════════════
+
+if __name__ == "__main__":
+    out_path = os.path.join(BASE_DIR, "results_hash_backends.csv")
+    print(f"\n{'='*60}")
+    print(f"HASH BACKENDS: {', '.join(HASHES)}")
+    print(f"{'='*60}")
+
+    with open(out_path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow([
+            "hash", "pairs_per_sec", "n", "build_ms", "proof_ok",
+        ])
+
+        for hash_name in HASHES:
+            try:
+                new = get_hash(hash_name)
+            except ValueError as e:
+                print(f"\n  {hash_name}: skipped ({e})")
+                continue
+
+            rate = pair_throughput(new, PAIRS)
+            print(f"\n  {hash_name:<9}: {rate:>12,.0f} pairs/s")
+
+            for n in SIZES:
+                tree, build_ms = timed_build(make_leaves(n), hash_name)
+                index = n // 3
+                proof_ok = verify_proof(
+                    tree.get_leaf(index), tree.get_proof(index), tree.get_root(),
+                    engine="binary", hash_name=hash_name,
+                )
+
+                writer.writerow([
+                    hash_name, round(rate), n, round(build_ms, 3), proof_ok,
+                ])
+                print(f"    n = {n:>9,}: build {build_ms:>10.1f} ms  proof ok: {proof_ok}")
+
+                del tree
+
+    print(f"\n  Saved → {out_path}")
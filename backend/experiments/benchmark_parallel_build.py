@@ -0,0 +1,89 @@
+"""
+benchmark_parallel_build.py
+===========================
+Serial vs process-pool MerkleTree construction at registry scale.
+
+For each n the script builds the same tree with workers=1 and
+workers=WORKERS, checks that both roots are byte-identical, and
+records wall-clock build time.
+
+Run from project root:
+    python backend/experiments/benchmark_parallel_build.py [workers]
+
+SIZES TESTED:
+─────────────
+  n = 100,000   1,000,000   10,000,000
+  engines: hex (anchored scheme) and binary
+
+NOTE: the 1e7 hex tree needs several GB of RAM (Python str per node).
+"""
+
+import csv
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from backend.merkle.merkle_tree import MerkleTree
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CONFIG
+# ══════════════════════════════════════════════════════════════════════════════
+
+SIZES    = [100_000, 1_000_000, 10_000_000]
+ENGINES  = ["hex", "binary"]
+WORKERS  = int(sys.argv[1]) if len(sys.argv) > 1 else (os.cpu_count() or 1)
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def make_leaves(n):
+    return [f"CN=Bench CA {i:08d}|ISSUER=ZeroID|FP={i:016x}" for i in range(n)]
+
+
+def timed_build(leaves, engine, workers):
+    t0 = time.perf_counter()
+    tree = MerkleTree(leaves, engine=engine, workers=workers)
+    return tree, (time.perf_counter() - t0) * 1000
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# MAIN
+# ══════════════════════════════════════════════════════════════════════════════
+
+if __name__ == "__main__":
+    out_path = os.path.join(BASE_DIR, "results_parallel_build.csv")
+    print(f"\n{'='*60}")
+    print(f"PARALLEL BUILD: serial vs {WORKERS} workers")
+    print(f"Sizes tested: {SIZES}")
+    print(f"{'='*60}")
+
+    with open(out_path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow([
+            "n", "engine", "workers",
+            "serial_ms", "parallel_ms", "speedup", "roots_match",
+        ])
+
+        for n in SIZES:
+            leaves = make_leaves(n)
+            print(f"\n  n = {n:,}")
+
+            for engine in ENGINES:
+                serial, serial_ms     = timed_build(leaves, engine, 1)
+                parallel, parallel_ms = timed_build(leaves, engine, WORKERS)
+                roots_match = serial.get_root() == parallel.get_root()
+                speedup     = serial_ms / parallel_ms if parallel_ms else 0.0
+
+                writer.writerow([
+                    n, engine, WORKERS,
+                    round(serial_ms, 3), round(parallel_ms, 3),
+                    round(speedup, 3), roots_match,
+                ])
+                print(f"    {engine:<6}: serial {serial_ms:>10.1f} ms  "
+                      f"parallel {parallel_ms:>10.1f} ms  "
+                      f"x{speedup:.2f}  roots match: {roots_match}")
+
+                del serial, parallel
+
+    print(f"\n  Saved → {out_path}")
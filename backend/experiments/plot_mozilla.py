@@ -13,7 +13,7 @@ Produces 7 color PNG files (220 DPI, suitable for IEEE conference paper):
   fig_A_proof_size.png      — Proof size vs n (vs CRL baseline)
   fig_B_gas_savings.png     — Gas savings % vs batch size k
   fig_B_bw_savings.png      — Bandwidth savings % vs batch size k
-  fig_B_batch_hash_ops.png  — Batch hash ops vs k + O(k log n) theory line
+  fig_B_batch_hash_ops.png  — Batch hash ops vs k + per-leaf k·log n line
   fig_B_batch_time.png      — Batch processing time vs k
 """
 
@@ -221,14 +221,14 @@ ax.plot(b["batch_size"], b["batch_hash_ops"],
         label="Measured Batch Hash Ops",
         color=C["teal"], marker='s', markersize=7, linewidth=2.2)
 ax.plot(b["batch_size"], b["batch_size"] * log_n_fixed,
-        label=f"Theoretical O(k·log n),  log₂(10k) = {log_n_fixed}",
+        label=f"Per-leaf updates k·log n,  log₂(10k) = {log_n_fixed}",
         color=C["theory"], linestyle=':', linewidth=1.6, marker='')
 annotate(ax, b["batch_size"], b["batch_hash_ops"], fmt="{:.0f}", color=C["teal"])
 
 ax.set_xlabel("Batch Size k")
 ax.set_ylabel("Hash Computations")
 ax.set_title("Batch Hash Operations vs Batch Size\n"
-             "(Measured vs theoretical O(k·log n), n = 10,000)")
+             "(Shared-ancestor batch vs per-leaf k·log n, n = 10,000)")
 ax.legend(framealpha=0.9)
 style_ax(ax)
 save("fig_B_batch_hash_ops.png")
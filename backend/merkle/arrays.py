@@ -0,0 +1,117 @@
+"""
+NumPy view of a Merkle tree: one (n, 32) uint8 array per level.
+
+A hex-engine level is a list of 64-char str objects (about 113 bytes per
+node); as an array every node is its 32 raw bytes. Binary, mapped and
+shared levels already hold raw digests, so their arrays are zero-copy
+views of the same buffer and must be dropped before the tree grows.
+
+bulk_proof_arrays() extracts the proofs for many leaves at once: each
+level is one fancy-indexing step over all indices (sibling = idx ^ 1,
+parent = idx >> 1) instead of a Python loop per proof.
+
+NumPy is optional; HAVE_NUMPY tells whether this module can be used.
+"""
+
+from .merkle_tree import DIGEST_SIZE, DigestLevel
+
+try:
+    import numpy as np
+    HAVE_NUMPY = True
+except ImportError:
+    np = None
+    HAVE_NUMPY = False
+
+
+def _require_numpy():
+    if not HAVE_NUMPY:
+        raise ImportError("NumPy Merkle levels need numpy (pip install numpy)")
+
+
+# ---------------- LEVEL ARRAYS ----------------
+def level_array(level):
+    """(n, 32) uint8 array of one tree level."""
+    _require_numpy()
+
+    if isinstance(level, list):
+        raw = bytes.fromhex("".join(level))
+        return np.frombuffer(raw, dtype=np.uint8).reshape(-1, DIGEST_SIZE)
+
+    if isinstance(level, DigestLevel):
+        return np.frombuffer(level.buf, dtype=np.uint8).reshape(-1, DIGEST_SIZE)
+
+    # MappedLevel / SharedLevel: view their slice of the underlying buffer
+    buf = level.mm if hasattr(level, "mm") else level.buf
+    return np.frombuffer(
+        buf, dtype=np.uint8, count=len(level) * DIGEST_SIZE, offset=level.offset
+    ).reshape(-1, DIGEST_SIZE)
+
+
+def tree_arrays(tree):
+    """Every level of `tree` as an (n, 32) uint8 array, leaves first."""
+    return [level_array(level) for level in tree.levels]
+
+
+def levels_from_arrays(arrays, engine="hex"):
+    """Inverse of tree_arrays(): levels for MerkleTree.from_levels()."""
+    _require_numpy()
+    if engine == "binary":
+        return [DigestLevel(np.ascontiguousarray(array, dtype=np.uint8).tobytes()) for array in arrays]
+
+    levels = []
+    for array in arrays:
+        text = np.ascontiguousarray(array, dtype=np.uint8).tobytes().hex()
+        step = 2 * DIGEST_SIZE
+        levels.append([text[i:i + step] for i in range(0, len(text), step)])
+    return levels
+
+
+# ---------------- BULK PROOFS ----------------
+def bulk_proof_arrays(arrays, indices):
+    """
+    (siblings, is_left) for all `indices` at once: siblings is a
+    (k, depth, 32) uint8 array and is_left a (k, depth) bool array, in
+    the same leaf-to-root order as MerkleTree.get_proof().
+    """
+    _require_numpy()
+
+    index = np.asarray(indices, dtype=np.int64)
+    leaf_count = len(arrays[0])
+    if index.size and (index.min() < 0 or index.max() >= leaf_count):
+        raise IndexError("Leaf index out of range")
+
+    depth = len(arrays) - 1
+    siblings = np.empty((index.size, depth, DIGEST_SIZE), dtype=np.uint8)
+    is_left = np.empty((index.size, depth), dtype=bool)
+
+    for level in range(depth):
+        nodes = arrays[level]
+        sibling_index = index ^ 1
+        is_left[:, level] = sibling_index < index
+        # the last node of an odd level is paired with itself
+        sibling_index = np.where(sibling_index < len(nodes), sibling_index, index)
+        siblings[:, level] = nodes[sibling_index]
+        index = index >> 1
+
+    return siblings, is_left
+
+
+def bulk_proofs(tree, indices):
+    """tree.get_proof(i) for every i in `indices`, in one vectorized pass."""
+    arrays = tree_arrays(tree)
+    siblings, is_left = bulk_proof_arrays(arrays, indices)
+    del arrays  # release the buffer views before anything can resize them
+
+    count, depth = is_left.shape
+    step = 2 * DIGEST_SIZE
+    text = siblings.tobytes().hex()
+    hashes = [text[i:i + step] for i in range(0, len(text), step)]
+
+    if tree.sorted_pairs:
+        return [hashes[i * depth:(i + 1) * depth] for i in range(count)]
+
+    sides = is_left.tolist()
+    return [
+        list(zip(hashes[i * depth:(i + 1) * depth], sides[i]))
+        for i in range(count)
+    ]
@@ -39,7 +39,7 @@
 #         # return self.tree.get_root()
 
 
-from .merkle_tree import MerkleTree, sha256
+from .merkle_tree import MerkleTree, REVOKED_LEAF
 
 
 class BatchRevocation:
@@ -56,14 +56,13 @@ class BatchRevocation:
         if not self.revocation_queue:
             return self.tree.get_root(), None
 
-        revoked_hash = sha256("REVOKED")
-        unique_indexes = sorted(set(self.revocation_queue))
+        revoked_hash = self.tree.leaf_hash(REVOKED_LEAF)
+        updates = {index: revoked_hash for index in set(self.revocation_queue)}
 
-        # start measurement once
+        # start measurement once; shared ancestors are hashed only once
         self.tree.metrics.start()
 
-        for index in unique_indexes:
-            self.tree.update_leaf(index, revoked_hash)
+        self.tree.update_leaves(updates)
 
         self.tree.metrics.stop()
 
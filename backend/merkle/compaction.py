@@ -0,0 +1,32 @@
+"""
+Compaction: drop revoked slots and pack the live leaves into a dense tree.
+
+Revocation overwrites a leaf in place, so a long-lived tree keeps one slot
+per credential ever issued and its depth follows that total, not the live
+set. compact_tree() walks the leaf level once, keeps every leaf that is
+not the revoked sentinel (reusing its hash, nothing is rehashed), and
+builds a new tree over them in the same order. The returned remap sends
+each kept old index to its new index; dropped slots are absent from it.
+"""
+
+from .merkle_tree import MerkleTree, REVOKED_LEAF
+
+
+def compact_tree(tree):
+    """(new_tree, remap) for `tree` without its revoked slots."""
+    revoked = tree._hash_leaf(REVOKED_LEAF)
+    live = tree._new_level()
+    remap = {}
+
+    for old_index, node in enumerate(tree.levels[0]):
+        if node == revoked:
+            continue
+        remap[old_index] = len(live)
+        live.append(node)
+
+    if not remap:
+        return None, remap
+
+    compacted = MerkleTree.from_levels([live], tree.engine, tree.hash_name, tree.sorted_pairs)
+    compacted.build_tree()
+    return compacted, remap
@@ -0,0 +1,189 @@
+"""
+Consistency proofs between two roots of the same tree (CT-style).
+
+The first old_size leaves of the new tree split into complete subtrees
+("peaks"), one per set bit of old_size. They are nodes of both trees, so
+the old root can be recomputed from them (closing the right edge with
+the duplicate-last-node rule), and the new root from the last peak's path
+upwards: every left sibling on it is an earlier peak, and only the right
+siblings have to be sent. That is O(log n) hashes instead of every leaf.
+
+Leaves that changed in place since the old root (revocations) are listed
+with their old and new hash, plus the siblings that connect them to their
+peak. The verifier rebuilds those peaks both ways, so an old root only
+verifies if nothing else inside the old range changed, and it only accepts
+changes to the revoked sentinel: a live leaf swapped for anything else
+fails the audit.
+"""
+
+from .hashes import get_leaf_hash
+from .merkle_tree import REVOKED_LEAF, node_hashers, sorted_pair
+
+
+def peak_ranges(size):
+    """[(height, first_leaf)] of the complete subtrees covering `size` leaves."""
+    peaks = []
+    start = 0
+    for height in range(size.bit_length() - 1, -1, -1):
+        if size >> height & 1:
+            peaks.append((height, start))
+            start += 1 << height
+    return peaks
+
+
+def _subtree_siblings(tree, height, start, indices):
+    # multiproof siblings inside one complete subtree, level by level, left to right
+    siblings = []
+    known = sorted(indices)
+    for level in range(height):
+        known_set = set(known)
+        parents = []
+        for index in known:
+            sibling_index = index ^ 1
+            if sibling_index not in known_set:
+                siblings.append(tree._to_hex(tree.levels[level][sibling_index]))
+            if not parents or parents[-1] != index // 2:
+                parents.append(index // 2)
+        known = parents
+    return siblings
+
+
+def consistency_proof(tree, old_size, changes=None):
+    """
+    Proof that `tree` extends its state at old_size leaves.
+    changes maps leaf index (< old_size) to its old leaf hash for slots
+    overwritten since then; their current hash is taken from the tree.
+    """
+    new_size = len(tree.levels[0])
+    if not 1 <= old_size <= new_size:
+        raise ValueError("old_size must be between 1 and the current leaf count")
+
+    changes = changes or {}
+    if any(not 0 <= index < old_size for index in changes):
+        raise ValueError("Changed leaves must lie inside the old tree")
+
+    peaks = []
+    change_siblings = []
+    for height, start in peak_ranges(old_size):
+        peaks.append(tree._to_hex(tree.levels[height][start >> height]))
+        inside = [index for index in changes if start <= index < start + (1 << height)]
+        if inside:
+            change_siblings.extend(_subtree_siblings(tree, height, start, inside))
+
+    # right siblings on the last peak's path to the new root
+    right = []
+    height, start = peak_ranges(old_size)[-1]
+    index = start >> height
+    for level in range(height, len(tree.levels) - 1):
+        nodes = tree.levels[level]
+        if index % 2 == 0 and index + 1 < len(nodes):
+            right.append(tree._to_hex(nodes[index + 1]))
+        index //= 2
+
+    return {
+        "old_size": old_size,
+        "new_size": new_size,
+        "peaks": peaks,
+        "changes": [
+            [index, old_hash, tree.get_leaf(index)]
+            for index, old_hash in sorted(changes.items())
+        ],
+        "change_siblings": change_siblings,
+        "right": right,
+    }
+
+
+def verify_consistency(old_root, new_root, proof, engine="hex", hash_name="sha256", sorted_pairs=False):
+    _, hash_pair = node_hashers(engine, hash_name)
+    decode = bytes.fromhex if engine == "binary" else (lambda value: value)
+    encode = (lambda node: node.hex()) if engine == "binary" else (lambda node: node)
+    join = sorted_pair if sorted_pairs else (lambda left, right: left + right)
+
+    old_size, new_size = proof["old_size"], proof["new_size"]
+    if not 1 <= old_size <= new_size:
+        return False
+
+    ranges = peak_ranges(old_size)
+    if len(proof["peaks"]) != len(ranges):
+        return False
+
+    new_peaks = [decode(peak) for peak in proof["peaks"]]
+    old_peaks = list(new_peaks)
+    changes = proof["changes"]
+    siblings = iter(proof["change_siblings"])
+
+    # the only in-place change allowed is a revocation, once per slot
+    revoked = get_leaf_hash(hash_name)(REVOKED_LEAF.encode()).hexdigest()
+    changed = [index for index, _, _ in changes]
+    if len(set(changed)) != len(changed) or any(not 0 <= index < old_size for index in changed):
+        return False
+    if any(new.lower() != revoked or old.lower() == revoked for _, old, new in changes):
+        return False
+
+    try:
+        # ---- peaks with in-place changes: rebuild them old and new ----
+        for position, (height, start) in enumerate(ranges):
+            inside = [c for c in changes if start <= c[0] < start + (1 << height)]
+            if not inside:
+                continue
+
+            old_nodes = {index: decode(old) for index, old, _ in inside}
+            new_nodes = {index: decode(new) for index, _, new in inside}
+            for _ in range(height):
+                old_parents, new_parents = {}, {}
+                for index in sorted(old_nodes):
+                    parent = index // 2
+                    if parent in old_parents:
+                        continue
+                    sibling_index = index ^ 1
+                    if sibling_index in old_nodes:
+                        old_sibling, new_sibling = old_nodes[sibling_index], new_nodes[sibling_index]
+                    else:
+                        old_sibling = new_sibling = decode(next(siblings))
+
+                    if index % 2 == 0:
+                        old_parents[parent] = hash_pair(join(old_nodes[index], old_sibling))
+                        new_parents[parent] = hash_pair(join(new_nodes[index], new_sibling))
+                    else:
+                        old_parents[parent] = hash_pair(join(old_sibling, old_nodes[index]))
+                        new_parents[parent] = hash_pair(join(new_sibling, new_nodes[index]))
+                old_nodes, new_nodes = old_parents, new_parents
+
+            (old_peak,) = old_nodes.values()
+            (new_peak,) = new_nodes.values()
+            if new_peak != new_peaks[position]:
+                return False
+            old_peaks[position] = old_peak
+
+        if next(siblings, None) is not None:
+            return False
+
+        # ---- old root: close the right edge like MerkleTree ----
+        node_height, node = ranges[-1][0], old_peaks[-1]
+        for (height, _), peak in zip(reversed(ranges[:-1]), reversed(old_peaks[:-1])):
+            while node_height < height:
+                node_height, node = node_height + 1, hash_pair(join(node, node))
+            node_height, node = node_height + 1, hash_pair(join(peak, node))
+        if encode(node) != old_root:
+            return False
+
+        # ---- new root: climb from the last peak ----
+        left_peaks = {height: peak for (height, _), peak in zip(ranges, new_peaks)}
+        height, start = ranges[-1]
+        node, index, width = new_peaks[-1], start >> height, -(-new_size >> height)
+        right = iter(proof["right"])
+        while width > 1:
+            if index % 2:
+                node = hash_pair(join(left_peaks[height], node))
+            elif index + 1 < width:
+                node = hash_pair(join(node, decode(next(right))))
+            else:
+                node = hash_pair(join(node, node))
+            index, width, height = index // 2, (width + 1) // 2, height + 1
+
+        if next(right, None) is not None:
+            return False
+    except (StopIteration, KeyError, ValueError):
+        return False
+
+    return encode(node) == new_root
@@ -0,0 +1,194 @@
+"""
+Sharded Merkle forest: one tree per shard (e.g. per issuer) under a
+small top tree whose leaves are the shard roots.
+
+Shard roots enter the top tree as they are, in sorted shard-key order,
+and are combined like any other pair of nodes. The path from a leaf to
+the forest root is therefore the shard proof followed by the top-tree
+proof, one get_proof()-style list that verify_proof(..., forest_root),
+proof_codec and ZeroIDMerkle.verifyProofAt accept unchanged; the anchored
+value is still a single 32-byte root.
+
+Updating one shard rehashes that shard and the shard's path in the top
+tree (O(log shard + log shards)); a shard rebuild only hashes that
+shard's leaves. Each shard has its own lock and only the top-tree step
+is serialised, so different shards can be updated concurrently.
+Adding or removing a shard re-slots the top tree, which changes the
+top-tree part of every proof.
+"""
+
+import threading
+
+from .merkle_tree import DigestLevel, MerkleTree, OperationMetrics, REVOKED_LEAF, verify_many
+
+
+def top_tree(shard_roots, engine="hex", hash_name="sha256", sorted_pairs=False, metrics=None):
+    """Top tree over hex shard roots, given in sorted shard-key order."""
+    level = DigestLevel() if engine == "binary" else []
+    for root in shard_roots:
+        level.append(bytes.fromhex(root) if engine == "binary" else root)
+
+    top = MerkleTree.from_levels([level], engine, hash_name, sorted_pairs, metrics)
+    top.build_tree()
+    return top
+
+
+class MerkleForest:
+    """
+    shards is {key: iterable of raw leaf values}; keys must sort (issuer
+    ids, names). Empty shards are skipped. Every shard tree keeps a
+    leaf position index, so index_of() is O(1).
+    """
+
+    def __init__(self, shards, engine="hex", hash_name="sha256", sorted_pairs=False, metrics=None):
+        self.engine = engine
+        self.hash_name = hash_name
+        self.sorted_pairs = sorted_pairs
+        self.metrics = metrics if metrics is not None else OperationMetrics()
+
+        self.trees = {}
+        self.locks = {}
+        self.top_lock = threading.RLock()
+        for key, leaves in shards.items():
+            tree = self._new_tree(leaves)
+            if tree is not None:
+                self.trees[key] = tree
+                self.locks[key] = threading.RLock()
+
+        self.top = None
+        self._rebuild_top()
+
+    def _new_tree(self, leaves):
+        leaves = list(leaves)
+        if not leaves:
+            return None
+        return MerkleTree(
+            leaves, engine=self.engine, index_leaves=True, hash_name=self.hash_name,
+            sorted_pairs=self.sorted_pairs, metrics=self.metrics,
+        )
+
+    def _lock(self, key):
+        with self.top_lock:
+            return self.locks.setdefault(key, threading.RLock())
+
+    # ---------- TOP TREE ----------
+    def _rebuild_top(self):
+        with self.top_lock:
+            self.keys = sorted(self.trees)
+            self.slots = {key: slot for slot, key in enumerate(self.keys)}
+            if not self.keys:
+                self.top = None
+                return
+
+            self.top = top_tree(
+                [self.trees[key].get_root() for key in self.keys],
+                self.engine, self.hash_name, self.sorted_pairs, self.metrics,
+            )
+
+    def _shard_changed(self, key):
+        # caller holds the shard lock; the trees dict only changes under top_lock
+        with self.top_lock:
+            tree = self.trees.get(key)
+            if tree is not None and key in self.slots:
+                self.top.update_leaf(self.slots[key], tree.get_root())
+            else:
+                self._rebuild_top()
+
+    # ---------- READ ----------
+    def get_root(self):
+        """Forest root (hex), or None while every shard is empty."""
+        with self.top_lock:
+            return self.top.get_root() if self.top is not None else None
+
+    def shard(self, key):
+        return self.trees.get(key)
+
+    def shard_root(self, key):
+        tree = self.trees.get(key)
+        return tree.get_root() if tree is not None else None
+
+    def leaf_count(self):
+        with self.top_lock:
+            return sum(len(tree.levels[0]) for tree in self.trees.values())
+
+    def index_of(self, key, leaf):
+        """Position of a raw leaf value inside shard `key`, or None."""
+        tree = self.trees.get(key)
+        return tree.index_of(leaf) if tree is not None else None
+
+    def get_leaf(self, key, index):
+        return self.trees[key].get_leaf(index)
+
+    # ---------- PROOFS ----------
+    def get_proof(self, key, index):
+        """
+        Proof from leaf `index` of shard `key` to the forest root: the
+        shard part (len(shard.levels) - 1 entries) then the top part.
+        """
+        with self._lock(key):
+            with self.top_lock:
+                return self.trees[key].get_proof(index) + self.top.get_proof(self.slots[key])
+
+    def proof_and_root(self, key, index):
+        """(proof, root) read together, so concurrent updates can't split them."""
+        with self._lock(key):
+            with self.top_lock:
+                return self.get_proof(key, index), self.top.get_root()
+
+    # ---------- UPDATES ----------
+    def append_many(self, key, leaves):
+        """Append raw leaf values to shard `key` (created if new); returns the first index."""
+        with self._lock(key):
+            tree = self.trees.get(key)
+            if tree is None:
+                tree = self._new_tree(leaves)
+                if tree is None:
+                    return 0
+                with self.top_lock:
+                    self.trees[key] = tree
+                start = 0
+            else:
+                start = tree.append_many(leaves)
+            self._shard_changed(key)
+            return start
+
+    def append_leaf(self, key, leaf):
+        return self.append_many(key, [leaf])
+
+    def update_leaves(self, key, updates):
+        """Apply {index: new_hash} to shard `key` in one batch pass."""
+        with self._lock(key):
+            self.trees[key].update_leaves(updates)
+            self._shard_changed(key)
+
+    def revoke(self, key, index):
+        self.update_leaves(key, {index: self.trees[key].leaf_hash(REVOKED_LEAF)})
+
+    def set_shard(self, key, leaves):
+        """Rebuild shard `key` from raw leaf values; an empty shard is removed."""
+        with self._lock(key):
+            tree = self._new_tree(leaves)
+            with self.top_lock:
+                if tree is None:
+                    self.trees.pop(key, None)
+                else:
+                    self.trees[key] = tree
+                self._shard_changed(key)
+
+
+# ---------------- BATCH VERIFICATION ----------------
+def verify_forest_multiproof(leaf_hashes, multiproof, root, engine="hex", metrics=None,
+                             hash_name="sha256", sorted_pairs=False):
+    """
+    verify_multiproof() counterpart for a forest: multiproof is
+    {"indices": [...], "proofs": [...]} with one get_proof() result per
+    leaf. Proofs are checked together with verify_many(), so the top-tree
+    nodes they share are hashed once.
+    """
+    proofs = multiproof.get("proofs", [])
+    if not proofs or len(proofs) != len(leaf_hashes):
+        return False
+    return all(verify_many(
+        list(zip(leaf_hashes, proofs)), root,
+        engine=engine, metrics=metrics, hash_name=hash_name, sorted_pairs=sorted_pairs,
+    ))
@@ -0,0 +1,119 @@
+"""
+Hash backends for Merkle trees.
+
+Each backend is a hashlib-style constructor: new(data) returns an object
+with .digest() and .hexdigest(), all 32-byte digests, so either engine
+can use any of them unchanged.
+
+  sha256    : hashlib, the original scheme and the anchored roots
+  blake2b   : hashlib, blake2b with a 32-byte digest (fastest in CPython)
+  keccak256 : Ethereum's keccak256, the hash ZeroIDMerkle.sol uses; needs
+              eth-hash (installed with web3) or pycryptodome
+
+Each name with a "-ds" suffix is the domain-separated variant: leaves
+hash 0x00 + value and internal nodes 0x01 + pair (as in RFC 6962), so a
+node can never be passed off as a leaf or the other way round. The
+prefix is absorbed once into a seed object that every hash .copy()s,
+so it costs no extra bytes per call. Leaves come from get_leaf_hash(),
+nodes from get_hash().
+"""
+
+import hashlib
+from functools import partial
+
+
+DOMAIN_SUFFIX = "-ds"
+BASE_HASHES = ("sha256", "blake2b", "keccak256")
+HASHES = BASE_HASHES + tuple(name + DOMAIN_SUFFIX for name in BASE_HASHES)
+
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+
+# stored in the reserved header byte of merkle.store / merkle.shared files
+HASH_CODES = {
+    "sha256": 0, "blake2b": 1, "keccak256": 2,
+    "sha256-ds": 3, "blake2b-ds": 4, "keccak256-ds": 5,
+}
+# set in that byte when the tree uses sorted-pair hashing
+SORTED_PAIRS_FLAG = 0x80
+
+
+class _EthKeccak:
+    # eth-hash only has keccak(data) -> bytes; wrap it like hashlib
+    __slots__ = ("data",)
+
+    keccak = None
+
+    def __init__(self, data=b""):
+        self.data = bytes(data)
+
+    def update(self, data):
+        self.data += bytes(data)
+
+    def copy(self):
+        return _EthKeccak(self.data)
+
+    def digest(self):
+        return self.keccak(self.data)
+
+    def hexdigest(self):
+        return self.keccak(self.data).hex()
+
+
+def _keccak256():
+    try:
+        from eth_hash.auto import keccak
+        _EthKeccak.keccak = staticmethod(keccak)
+        return _EthKeccak
+    except ImportError:
+        pass
+
+    try:
+        from Crypto.Hash import keccak
+    except ImportError:
+        raise ValueError("keccak256 needs eth-hash (pip install web3) or pycryptodome")
+    return lambda data=b"": keccak.new(data=bytes(data), digest_bits=256)
+
+
+_BACKENDS = {
+    "sha256": lambda: hashlib.sha256,
+    "blake2b": lambda: partial(hashlib.blake2b, digest_size=32),
+    "keccak256": _keccak256,
+}
+_loaded = {}
+
+
+def _seeded(new, prefix):
+    # constructor for new(prefix + data) that copies a pre-seeded object
+    seed = new(prefix)
+    if not hasattr(seed, "copy"):
+        return lambda data=b"": new(prefix + bytes(data))
+
+    def seeded(data=b""):
+        hasher = seed.copy()
+        hasher.update(data)
+        return hasher
+    return seeded
+
+
+def _load(name, prefix):
+    key = (name, prefix)
+    if key not in _loaded:
+        if name not in HASHES:
+            raise ValueError(f"Unknown Merkle hash: {name}")
+        if name.endswith(DOMAIN_SUFFIX):
+            base = _load(name[:-len(DOMAIN_SUFFIX)], None)
+            _loaded[key] = _seeded(base, prefix)
+        else:
+            _loaded[key] = _BACKENDS[name]()
+    return _loaded[key]
+
+
+def get_hash(name="sha256"):
+    """hashlib-style constructor for internal nodes (pairs) of a backend name."""
+    return _load(name, NODE_PREFIX if name.endswith(DOMAIN_SUFFIX) else None)
+
+
+def get_leaf_hash(name="sha256"):
+    """hashlib-style constructor for leaves; the same as get_hash() unless domain-separated."""
+    return _load(name, LEAF_PREFIX if name.endswith(DOMAIN_SUFFIX) else None)
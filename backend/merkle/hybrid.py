@@ -0,0 +1,162 @@
+"""
+Merkle tree that keeps only its leaves and top levels in memory.
+
+Every level between the leaves and the cutoff is replaced by a
+SubtreeLevel, which recomputes a node from the leaves when it is read:
+node (h, i) is the root of leaves [i * 2^h, (i + 1) * 2^h). A proof
+reads one sibling per level, and those subtrees are disjoint, so it
+costs about 2^cutoff hashes (cutoff = depth - top_levels + 1), and so
+does an update, which recomputes one such subtree. Memory is the leaves plus 2^top_levels top nodes.
+
+Roots, leaves and proofs are identical to MerkleTree. Updates and appends
+only write the leaves and the resident levels; to_arrays() is not
+supported, since the lower levels exist only while they are read.
+"""
+
+from .merkle_tree import (
+    DIGEST_SIZE, DigestLevel, MerkleTree, hash_binary_level, hash_hex_level, timed,
+)
+
+
+# ---------------- VIRTUAL LEVEL ----------------
+class SubtreeLevel:
+    """Tree level `height`, recomputed from the leaves on every read."""
+
+    __slots__ = ("tree", "height")
+
+    def __init__(self, tree, height):
+        self.tree = tree
+        self.height = height
+
+    def __len__(self):
+        width = 1 << self.height
+        return (len(self.tree.levels[0]) + width - 1) // width
+
+    def __getitem__(self, index):
+        count = len(self)
+        if index < 0:
+            index += count
+        if index < 0 or index >= count:
+            raise IndexError("SubtreeLevel index out of range")
+        return self.tree._subtree_root(self.height, index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    # nothing to store: HybridMerkleTree only writes the leaves and the
+    # resident levels, so a write landing here is a bug, not a no-op
+    def __setitem__(self, index, node):
+        raise TypeError("SubtreeLevel is computed from the leaves and can't be written")
+
+    def append(self, node):
+        raise TypeError("SubtreeLevel is computed from the leaves and can't be written")
+
+
+# ---------------- HYBRID TREE ----------------
+class HybridMerkleTree(MerkleTree):
+    """
+    top_levels is the number of levels kept resident below and including
+    the root. Lower it to save memory, raise it for faster proofs. The
+    cutoff is fixed at build time, so appends past a power of two add a
+    resident level at the top instead of moving the cutoff.
+    """
+
+    def __init__(self, leaves, engine="hex", index_leaves=False, hash_name="sha256",
+                 sorted_pairs=False, top_levels=8, metrics=None):
+        if top_levels < 1:
+            raise ValueError("top_levels must keep at least the root level")
+        self.top_levels = top_levels
+        super().__init__(leaves, engine, index_leaves, 1, hash_name, sorted_pairs, metrics)
+
+    def _build_levels(self):
+        # level 0 is the leaf store itself (no second copy for the hex engine)
+        current = self.leaves
+        self.levels = [current]
+
+        depth = (len(current) - 1).bit_length()
+        self.cutoff = max(depth - self.top_levels + 1, 1)
+
+        hash_level = hash_binary_level if self.engine == "binary" else hash_hex_level
+        height = 0
+        while len(current) > 1:
+            current = hash_level(current, self.new, self.sorted_pairs)
+            height += 1
+            self.levels.append(current if height >= self.cutoff else SubtreeLevel(self, height))
+
+    def _subtree_root(self, height, index):
+        leaves = self.levels[0]
+        start = index << height
+        end = min(start + (1 << height), len(leaves))
+
+        if self.engine == "binary":
+            level = DigestLevel(leaves.view()[start * DIGEST_SIZE:end * DIGEST_SIZE])
+            hash_level = hash_binary_level
+        else:
+            level = leaves[start:end]
+            hash_level = hash_hex_level
+
+        for _ in range(height):
+            self.metrics.hash_operations += (len(level) + 1) // 2
+            level = hash_level(level, self.new, self.sorted_pairs)
+        return level[0]
+
+    def _level(self, height):
+        return SubtreeLevel(self, height) if height < self.cutoff else self._new_level()
+
+    def _rehash_resident(self, dirty):
+        """
+        Recompute the resident nodes above the level-`cutoff` indices in
+        `dirty`: those from their leaves, every level above from its
+        children. Nodes past the end of a level are appended.
+        """
+        for height in range(self.cutoff, len(self.levels)):
+            nodes = self.levels[height]
+            for index in sorted(dirty):
+                if height == self.cutoff:
+                    node = self._subtree_root(height, index)
+                else:
+                    below = self.levels[height - 1]
+                    left = below[2 * index]
+                    right = below[2 * index + 1] if 2 * index + 1 < len(below) else left
+                    node = self._hash_pair(left, right, self.metrics)
+
+                if index < len(nodes):
+                    nodes[index] = node
+                else:
+                    nodes.append(node)
+            dirty = {index // 2 for index in dirty}
+
+    def update_leaf(self, index, new_hash):
+        self.update_leaves({index: new_hash})
+
+    @timed("update")
+    def update_leaves(self, updates):
+        """Leaves are written in place; the levels below the cutoff follow by themselves."""
+        for index, new_hash in updates.items():
+            self._set_leaf(index, self._from_hex(new_hash))
+        self._rehash_resident({index >> self.cutoff for index in updates})
+
+    def _rehash_from(self, start):
+        # grow to the new depth (virtual levels below the cutoff, resident
+        # ones above), then redo every resident node right of `start`
+        count = len(self.levels[0])
+        while len(self.levels) < (count - 1).bit_length() + 1:
+            self.levels.append(self._level(len(self.levels)))
+
+        width = (count + (1 << self.cutoff) - 1) >> self.cutoff
+        self._rehash_resident(range(start >> self.cutoff, width))
+
+    def to_arrays(self):
+        raise NotImplementedError(
+            "HybridMerkleTree recomputes its lower levels; build a MerkleTree for NumPy arrays"
+        )
+
+    def resident_nodes(self):
+        """Nodes held in memory, leaves included."""
+        return sum(len(level) for level in self.levels if not isinstance(level, SubtreeLevel))
+
+    @timed("proof")
+    def get_proofs(self, indices):
+        # the vectorized path needs real arrays for every level
+        return [self._proof(index) for index in indices]
@@ -115,26 +115,198 @@
 #         self.metrics.stop()
 #         return self.metrics
 
+import bisect
+import functools
 import hashlib
+import threading
 import time
 
+from .hashes import get_hash, get_leaf_hash
+
+
+DIGEST_SIZE = 32
+ENGINES = ("hex", "binary")
+
+# raw leaf value that replaces a revoked credential in its slot
+REVOKED_LEAF = "REVOKED"
+
 
 # ---------------- METRICS ----------------
-class OperationMetrics:
+PHASES = ("leaf_hash", "build", "proof", "update", "verify")
+
+# upper bounds of the per-call latency histogram buckets, in ns (x4 steps
+# from 1 us to ~1 s); slower calls land in a final +Inf bucket
+HISTOGRAM_BOUNDS_NS = tuple(1000 * 4 ** i for i in range(11))
+
+
+class PhaseStats:
+    """Cumulative counters and latency histogram of one phase."""
+
+    __slots__ = ("calls", "total_ns", "max_ns", "hash_operations", "buckets")
+
     def __init__(self):
+        self.calls = 0
+        self.total_ns = 0
+        self.max_ns = 0
         self.hash_operations = 0
+        self.buckets = [0] * (len(HISTOGRAM_BOUNDS_NS) + 1)
+
+    def snapshot(self):
+        return {
+            "calls": self.calls,
+            "total_ms": self.total_ns / 1e6,
+            "mean_ms": self.total_ns / self.calls / 1e6 if self.calls else 0.0,
+            "max_ms": self.max_ns / 1e6,
+            "hash_operations": self.hash_operations,
+            # [upper bound in ms (None = +Inf), calls in that bucket]
+            "histogram": [
+                [bound / 1e6 if bound is not None else None, count]
+                for bound, count in zip(HISTOGRAM_BOUNDS_NS + (None,), self.buckets)
+            ],
+        }
+
+
+class _PhaseTimer:
+    __slots__ = ("metrics", "name", "hashes", "started", "hashes_before")
+
+    def __init__(self, metrics, name, hashes):
+        self.metrics = metrics
+        self.name = name
+        self.hashes = hashes
+
+    def __enter__(self):
+        self.hashes_before = self.metrics.hash_operations
+        self.started = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter_ns() - self.started
+        metrics = self.metrics
+        metrics.hash_operations += self.hashes
+        metrics.record(self.name, elapsed, metrics.hash_operations - self.hashes_before)
+        return False
+
+
+class OperationMetrics:
+    """
+    start() / stop() / duration_ms() and hash_operations measure one
+    experiment run, as before (start() resets the hash count).
+
+    phase(name) additionally times every call of a tree operation and
+    keeps per-phase cumulative counters and a latency histogram that
+    are never reset by start(); snapshot() exports them for /metrics
+    and the experiment scripts.
+
+    hash_operations is counted per thread, so request threads sharing
+    one metrics object (the registry's) never charge each other's
+    hashes to their phases.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
         self.start_time = 0
         self.end_time = 0
+        self.lock = threading.Lock()
+        self.phases = {name: PhaseStats() for name in PHASES}
+
+    @property
+    def hash_operations(self):
+        return getattr(self._local, "hash_operations", 0)
+
+    @hash_operations.setter
+    def hash_operations(self, value):
+        self._local.hash_operations = value
 
     def start(self):
         self.hash_operations = 0
-        self.start_time = time.time()
+        self.start_time = time.perf_counter_ns()
 
     def stop(self):
-        self.end_time = time.time()
+        self.end_time = time.perf_counter_ns()
 
     def duration_ms(self):
-        return (self.end_time - self.start_time) * 1000
+        return (self.end_time - self.start_time) / 1e6
+
+    # ---------- PHASES ----------
+    def phase(self, name, hashes=0):
+        """
+        Context manager timing one call of `name`. Hashes counted through
+        this object meanwhile are attributed to the phase; `hashes` adds
+        ones done without it (e.g. whole-level hashing in build_tree).
+        """
+        return _PhaseTimer(self, name, hashes)
+
+    def record(self, name, elapsed_ns, hash_operations=0):
+        index = bisect.bisect_left(HISTOGRAM_BOUNDS_NS, elapsed_ns)
+        with self.lock:
+            stats = self.phases.get(name)
+            if stats is None:
+                stats = self.phases[name] = PhaseStats()
+            stats.calls += 1
+            stats.total_ns += elapsed_ns
+            stats.max_ns = max(stats.max_ns, elapsed_ns)
+            stats.hash_operations += hash_operations
+            stats.buckets[index] += 1
+
+    def snapshot(self):
+        # the per-thread counters only mean something inside a phase;
+        # the exported total is what the phases recorded, across threads
+        with self.lock:
+            return {
+                "hash_operations": sum(stats.hash_operations for stats in self.phases.values()),
+                "phases": {name: stats.snapshot() for name, stats in self.phases.items()},
+            }
+
+    def reset(self):
+        with self.lock:
+            self.phases = {name: PhaseStats() for name in PHASES}
+
+
+def prometheus_text(snapshot):
+    """OperationMetrics.snapshot() in the Prometheus text exposition format."""
+    lines = [
+        '# TYPE merkle_phase_seconds histogram',
+        '# TYPE merkle_phase_hash_operations_total counter',
+    ]
+    for phase, stats in snapshot['phases'].items():
+        label = f'phase="{phase}"'
+        # Prometheus buckets are cumulative: calls at or below each bound
+        seen = 0
+        for bound_ms, count in stats['histogram']:
+            seen += count
+            le = '+Inf' if bound_ms is None else repr(bound_ms / 1000)
+            lines.append(f'merkle_phase_seconds_bucket{{{label},le="{le}"}} {seen}')
+        lines.append(f'merkle_phase_seconds_sum{{{label}}} {stats["total_ms"] / 1000}')
+        lines.append(f'merkle_phase_seconds_count{{{label}}} {stats["calls"]}')
+        lines.append(f'merkle_phase_hash_operations_total{{{label}}} {stats["hash_operations"]}')
+    return '\n'.join(lines) + '\n'
+
+
+def timed(name):
+    """Method decorator: time every call in self.metrics as phase `name`."""
+    def decorate(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.metrics.phase(name):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def timed_verify(metrics_position):
+    """Time a module-level checker as phase "verify" when it gets a metrics object."""
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            metrics = kwargs.get("metrics")
+            if metrics is None and len(args) > metrics_position:
+                metrics = args[metrics_position]
+            if metrics is None:
+                return function(*args, **kwargs)
+            with metrics.phase("verify"):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
 
 
 # ---------------- HASH ----------------
@@ -144,35 +316,324 @@ def sha256(data, metrics=None):
     return hashlib.sha256(data.encode()).hexdigest()
 
 
-# ---------------- MERKLE TREE ----------------
-class MerkleTree:
+def sha256_bytes(data, metrics=None):
+    if metrics:
+        metrics.hash_operations += 1
+    return hashlib.sha256(data).digest()
+
+
+# ---------------- BINARY LEVEL ----------------
+class DigestLevel:
+    """
+    One tree level stored as raw 32-byte digests in a single bytearray.
+    Indexing returns bytes, so the tree code can treat it like a list.
+    """
+
+    __slots__ = ("buf",)
+
+    def __init__(self, data=b""):
+        self.buf = bytearray(data)
+
+    def __len__(self):
+        return len(self.buf) // DIGEST_SIZE
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        offset = index * DIGEST_SIZE
+        if offset < 0 or offset >= len(self.buf):
+            raise IndexError("DigestLevel index out of range")
+        return bytes(self.buf[offset:offset + DIGEST_SIZE])
+
+    def __iter__(self):
+        view = memoryview(self.buf)
+        for offset in range(0, len(view), DIGEST_SIZE):
+            yield bytes(view[offset:offset + DIGEST_SIZE])
+
+    def __setitem__(self, index, digest):
+        if index < 0:
+            index += len(self)
+        offset = index * DIGEST_SIZE
+        self.buf[offset:offset + DIGEST_SIZE] = digest
+
+    def append(self, digest):
+        self.buf += digest
+
+    def copy(self):
+        return DigestLevel(self.buf)
+
+    def view(self):
+        return memoryview(self.buf)
+
+
+def node_hashers(engine="hex", hash_name="sha256"):
+    """
+    (hash_leaf(value), hash_pair(data, metrics=None)) for one engine and
+    hash backend, as used by the proof checkers and streaming builders.
+    """
+    if hash_name == "sha256":
+        if engine == "binary":
+            return (lambda value: sha256_bytes(value.encode())), sha256_bytes
+        return sha256, sha256
+
+    new = get_hash(hash_name)
+    new_leaf = get_leaf_hash(hash_name)
+
+    if engine == "binary":
+        def hash_pair(data, metrics=None):
+            if metrics:
+                metrics.hash_operations += 1
+            return new(data).digest()
+        return (lambda value: new_leaf(value.encode()).digest()), hash_pair
+
+    def hash_pair(data, metrics=None):
+        if metrics:
+            metrics.hash_operations += 1
+        return new(data.encode()).hexdigest()
+    return (lambda value: new_leaf(value.encode()).hexdigest()), hash_pair
+
+
+def sorted_pair(left, right):
+    """Concatenate two nodes smaller first (commutative / sorted-pair hashing)."""
+    return left + right if left <= right else right + left
+
+
+def hash_binary_level(level, new=hashlib.sha256, sorted_pairs=False):
+    # Hash one whole level in a tight loop over the buffer; pairs are
+    # sliced from a memoryview, so no intermediate bytes objects are built.
+    view = level.view()
+    size = len(view)
+    next_level = DigestLevel()
+    out = next_level.buf
+
+    pair_size = 2 * DIGEST_SIZE
+    even_end = size - (size % pair_size)
+    if sorted_pairs:
+        for offset in range(0, even_end, pair_size):
+            left = bytes(view[offset:offset + DIGEST_SIZE])
+            right = bytes(view[offset + DIGEST_SIZE:offset + pair_size])
+            out += new(sorted_pair(left, right)).digest()
+    else:
+        for offset in range(0, even_end, pair_size):
+            out += new(view[offset:offset + pair_size]).digest()
+
+    if even_end < size:
+        last = bytes(view[even_end:])
+        out += new(last + last).digest()
+
+    return next_level
+
+
+def hash_hex_level(level, new=hashlib.sha256, sorted_pairs=False):
+    next_level = []
+    for i in range(0, len(level), 2):
+        left = level[i]
+        right = level[i + 1] if i + 1 < len(level) else left
+        pair = sorted_pair(left, right) if sorted_pairs else left + right
+        next_level.append(new(pair.encode()).hexdigest())  # no metrics here
+    return next_level
 
-    def __init__(self, leaves):
-        self.metrics = OperationMetrics()
-        self.leaves = [sha256(x) for x in leaves]
-        self.levels = []
-        self.build_tree()
 
-    # Build initial tree (NOT counted in experiments)
+# ---------------- MERKLE TREE ----------------
+class MerkleTree:
+    """
+    engine="hex"    : nodes are 64-char hex strings, parents hash the
+                      concatenated hex text (original scheme, anchored roots).
+    engine="binary" : nodes are raw 32-byte digests kept in one bytearray
+                      per level, parents hash the 64 raw bytes.
+
+    Both engines take and return hex strings at the API boundary
+    (get_root, get_leaf, get_proof, update_leaf).
+
+    index_leaves=True keeps a leaf hash → position map, so index_of()
+    finds a leaf in O(1); appends and updates keep it current in O(1).
+
+    workers > 1 builds the tree in a process pool (see merkle.parallel),
+    capped at the CPUs available, so one core means a serial build; the
+    levels are identical to the serial build.
+
+    MerkleTree.open(path) maps a tree written by save(path) (see
+    merkle.store) instead of building it.
+
+    hash_name picks the hash backend (see merkle.hashes); "sha256" is the
+    anchored scheme. keccak256 with the binary engine hashes nodes exactly
+    like ZeroIDMerkle.sol (keccak256 over the two packed bytes32).
+
+    sorted_pairs=True hashes each pair smaller node first, so a parent
+    doesn't depend on which child is which: get_proof() returns a flat
+    list of sibling hashes, checked with verify_proof(..., sorted_pairs=True)
+    without any left/right bookkeeping.
+    """
+
+    def __init__(self, leaves, engine="hex", index_leaves=False, workers=1,
+                 hash_name="sha256", sorted_pairs=False, metrics=None):
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown Merkle engine: {engine}")
+
+        self.engine = engine
+        self.hash_name = hash_name
+        self.new = get_hash(hash_name)
+        self.new_leaf = get_leaf_hash(hash_name)
+        self.sorted_pairs = sorted_pairs
+        self.metrics = metrics if metrics is not None else OperationMetrics()
+        self.mapped = False
+
+        if workers > 1:
+            # more processes than cores only adds copying and scheduling
+            from .parallel import available_cpus
+            workers = min(workers, available_cpus())
+        if workers > 1:
+            from .parallel import build_levels_parallel
+            with self.metrics.phase("build") as timer:
+                self.levels = build_levels_parallel(leaves, engine, workers, hash_name, sorted_pairs)
+                timer.hashes = sum(len(level) for level in self.levels)
+            self.leaves = self.levels[0] if engine == "binary" else self.levels[0][:]
+        else:
+            with self.metrics.phase("leaf_hash") as timer:
+                if engine == "binary":
+                    self.leaves = DigestLevel()
+                    for x in leaves:
+                        self.leaves.append(self._hash_leaf(x))
+                else:
+                    new = self.new_leaf
+                    self.leaves = [new(x.encode()).hexdigest() for x in leaves]
+                timer.hashes = len(self.leaves)
+
+            self.levels = []
+            self.build_tree()
+
+        self.positions = None
+        if index_leaves:
+            self._build_positions()
+
+    @classmethod
+    def from_levels(cls, levels, engine="hex", hash_name="sha256", sorted_pairs=False, metrics=None):
+        """Wrap already computed levels (leaves first) without rehashing."""
+        tree = cls.__new__(cls)
+        tree.engine = engine
+        tree.hash_name = hash_name
+        tree.new = get_hash(hash_name)
+        tree.new_leaf = get_leaf_hash(hash_name)
+        tree.sorted_pairs = sorted_pairs
+        tree.metrics = metrics if metrics is not None else OperationMetrics()
+        tree.mapped = False
+        tree.levels = levels
+        tree.leaves = levels[0]
+        tree.positions = None
+        return tree
+
+    # ---------- DISK STORE ----------
+    @classmethod
+    def open(cls, path, verify=False):
+        from .store import open_tree
+        return open_tree(path, verify=verify)
+
+    def save(self, path, meta=None):
+        from .store import write_tree
+        write_tree(self, path, meta=meta)
+
+    def _materialize(self):
+        # a mapped tree is read-only: copy it into memory before mutating
+        indexed = self.positions is not None
+        self.levels = [level.to_memory() for level in self.levels]
+        self.leaves = self.levels[0] if self.engine == "binary" else self.levels[0][:]
+        self.mapped = False
+        self.positions = None
+        if indexed:
+            self._build_positions()
+
+    # ---------- ENGINE HELPERS ----------
+    def _hash(self, data, metrics=None):
+        if metrics:
+            metrics.hash_operations += 1
+        if self.engine == "binary":
+            return self.new(data).digest()
+        return self.new(data.encode()).hexdigest()
+
+    def _hash_pair(self, left, right, metrics=None):
+        if self.sorted_pairs:
+            return self._hash(sorted_pair(left, right), metrics)
+        return self._hash(left + right, metrics)
+
+    def _to_hex(self, node):
+        return node.hex() if self.engine == "binary" else node
+
+    def _from_hex(self, value):
+        if self.engine == "binary" and isinstance(value, str):
+            return bytes.fromhex(value)
+        return value
+
+    def _hash_leaf(self, value):
+        if self.engine == "binary":
+            return self.new_leaf(value.encode()).digest()
+        return self.new_leaf(value.encode()).hexdigest()
+
+    def leaf_hash(self, value):
+        """Hex leaf hash of a raw value under this tree's hash backend."""
+        return self._to_hex(self._hash_leaf(value))
+
+    def _new_level(self):
+        return DigestLevel() if self.engine == "binary" else []
+
+    # Build initial tree (NOT counted in experiments: start() resets the
+    # hash count, but the "build" phase records it)
     def build_tree(self):
+        with self.metrics.phase("build") as timer:
+            self._build_levels()
+            timer.hashes = sum(len(level) for level in self.levels[1:])
+
+    def _build_levels(self):
+        if self.engine == "binary":
+            # leaf level is shared with self.leaves, no second copy
+            current = self.leaves
+            self.levels = [current]
+            while len(current) > 1:
+                current = hash_binary_level(current, self.new, self.sorted_pairs)
+                self.levels.append(current)
+            return
+
         self.levels = [self.leaves[:]]
 
         current = self.leaves[:]
         while len(current) > 1:
-            next_level = []
-            for i in range(0, len(current), 2):
-                left = current[i]
-                right = current[i + 1] if i + 1 < len(current) else left
-                next_level.append(sha256(left + right))  # no metrics here
-            self.levels.append(next_level)
-            current = next_level
+            current = hash_hex_level(current, self.new, self.sorted_pairs)
+            self.levels.append(current)
 
     def get_root(self):
-        return self.levels[-1][0]
+        return self._to_hex(self.levels[-1][0])
+
+    def get_leaf(self, index):
+        return self._to_hex(self.levels[0][index])
+
+    # ---------- LEAF POSITION INDEX ----------
+    def _build_positions(self):
+        # first occurrence wins, like list.index(); revoked slots all share
+        # one sentinel hash and are never indexed
+        self.revoked_node = self._hash_leaf(REVOKED_LEAF)
+        self.positions = {}
+        for index, node in enumerate(self.levels[0]):
+            if node != self.revoked_node:
+                self.positions.setdefault(node, index)
+
+    def _set_leaf(self, index, node):
+        if self.positions is not None:
+            old = self.levels[0][index]
+            if self.positions.get(old) == index:
+                del self.positions[old]
+            if node != self.revoked_node:
+                self.positions.setdefault(node, index)
+        self.levels[0][index] = node
+
+    def index_of(self, leaf):
+        """Position of a raw leaf value (e.g. a CID), or None. Needs index_leaves=True."""
+        return self.positions.get(self._hash_leaf(leaf))
 
     # ---------- DELTA UPDATE ----------
+    @timed("update")
     def update_leaf(self, index, new_hash):
-        self.levels[0][index] = new_hash
+        if self.mapped:
+            self._materialize()
+        self._set_leaf(index, self._from_hex(new_hash))
         current_index = index
 
         for level in range(len(self.levels) - 1):
@@ -184,21 +645,108 @@ class MerkleTree:
             left = self.levels[level][left_index]
             right = self.levels[level][right_index] if right_index < len(self.levels[level]) else left
 
-            parent_hash = sha256(left + right, self.metrics)
+            parent_hash = self._hash_pair(left, right, self.metrics)
             self.levels[level + 1][parent_index] = parent_hash
 
             current_index = parent_index
 
+    # ---------- BATCH DELTA UPDATE ----------
+    @timed("update")
+    def update_leaves(self, updates):
+        """
+        Apply {index: new_hash} in one level-by-level pass. Dirty parents
+        are kept in a set, so an ancestor shared by several updated leaves
+        is hashed exactly once instead of once per leaf.
+        """
+        if self.mapped:
+            self._materialize()
+
+        dirty = set()
+        for index, new_hash in updates.items():
+            self._set_leaf(index, self._from_hex(new_hash))
+            dirty.add(index)
+
+        for level in range(len(self.levels) - 1):
+            nodes = self.levels[level]
+            parents = self.levels[level + 1]
+            dirty = {index // 2 for index in dirty}
+
+            for parent_index in sorted(dirty):
+                left_index = parent_index * 2
+                right_index = left_index + 1
+
+                left = nodes[left_index]
+                right = nodes[right_index] if right_index < len(nodes) else left
+
+                parents[parent_index] = self._hash_pair(left, right, self.metrics)
+
+    # ---------- INCREMENTAL APPEND ----------
+    def append_leaf(self, leaf):
+        return self.append_many([leaf])
+
+    @timed("update")
+    def append_many(self, leaves):
+        """
+        Append raw leaf values after the current last leaf and update only
+        the right edge of every level: O(log n) per leaf, O(k + log n) for
+        k leaves. Returns the index of the first appended leaf.
+        """
+        if self.mapped:
+            self._materialize()
+
+        start = len(self.levels[0])
+
+        for x in leaves:
+            leaf_hash = self._hash_leaf(x)
+            self.levels[0].append(leaf_hash)
+            if self.leaves is not self.levels[0]:
+                self.leaves.append(leaf_hash)
+            if self.positions is not None and leaf_hash != self.revoked_node:
+                self.positions.setdefault(leaf_hash, len(self.levels[0]) - 1)
+
+        if len(self.levels[0]) > start:
+            self._rehash_from(start)
+        return start
+
+    def _rehash_from(self, start):
+        # Recompute every parent from the first dirty index to the end of
+        # each level. Parents past the old end are appended, and the old
+        # last node (duplicated while it had no sibling) is redone too.
+        level = 0
+        while len(self.levels[level]) > 1:
+            if level + 1 == len(self.levels):
+                self.levels.append(self._new_level())
+
+            nodes = self.levels[level]
+            parents = self.levels[level + 1]
+            start //= 2
+
+            for parent_index in range(start, (len(nodes) + 1) // 2):
+                left = nodes[2 * parent_index]
+                right = nodes[2 * parent_index + 1] if 2 * parent_index + 1 < len(nodes) else left
+
+                parent_hash = self._hash_pair(left, right, self.metrics)
+                if parent_index < len(parents):
+                    parents[parent_index] = parent_hash
+                else:
+                    parents.append(parent_hash)
+
+            level += 1
+
     # public function for delta revocation experiment
     def delta_revoke(self, index):
-        revoked_hash = sha256("REVOKED")
+        revoked_hash = self.leaf_hash(REVOKED_LEAF)
         self.metrics.start()
         self.update_leaf(index, revoked_hash)
         self.metrics.stop()
         return self.metrics
 
-        # ---------- PROOF GENERATION ----------
+    # ---------- PROOF GENERATION ----------
+    @timed("proof")
     def get_proof(self, index):
+        return self._proof(index)
+
+    def _proof(self, index):
         proof = []
         current_index = index
 
@@ -212,23 +760,276 @@ class MerkleTree:
             else:
                 sibling_hash = level_nodes[current_index]
 
-            is_left = sibling_index < current_index
-            proof.append((sibling_hash, is_left))
+            if self.sorted_pairs:
+                proof.append(self._to_hex(sibling_hash))
+            else:
+                is_left = sibling_index < current_index
+                proof.append((self._to_hex(sibling_hash), is_left))
 
             current_index = current_index // 2
 
         return proof
+
+    @timed("proof")
+    def get_proofs(self, indices):
+        """
+        get_proof() for many leaves, e.g. a whole issuer export. With
+        numpy installed every level is one vectorized step over all
+        indices (see merkle.arrays); otherwise it falls back to a loop.
+        """
+        from .arrays import HAVE_NUMPY, bulk_proofs
+        if not HAVE_NUMPY:
+            return [self._proof(index) for index in indices]
+        return bulk_proofs(self, indices)
+
+    # ---------- NUMPY LEVELS ----------
+    def to_arrays(self):
+        """Levels as (n, 32) uint8 NumPy arrays (see merkle.arrays)."""
+        from .arrays import tree_arrays
+        return tree_arrays(self)
+
+    @classmethod
+    def from_arrays(cls, arrays, engine="hex", hash_name="sha256", sorted_pairs=False):
+        from .arrays import levels_from_arrays
+        return cls.from_levels(levels_from_arrays(arrays, engine), engine, hash_name, sorted_pairs)
+
+    # ---------- CONSISTENCY PROOF ----------
+    @timed("proof")
+    def get_consistency_proof(self, old_size, changes=None):
+        """Proof that this tree extends its state at old_size leaves (see merkle.consistency)."""
+        from .consistency import consistency_proof
+        return consistency_proof(self, old_size, changes)
+
+    # ---------- MULTIPROOF ----------
+    @timed("proof")
+    def get_multiproof(self, indices):
+        """
+        One proof for a set of leaves. Siblings that can be computed from
+        other proven leaves are left out, and each needed sibling appears
+        once, in the order verify_multiproof consumes them (level by level,
+        left to right).
+        """
+        known = sorted(set(indices))
+        siblings = []
+        multiproof = {
+            "indices": known,
+            "leaf_count": len(self.levels[0]),
+            "siblings": siblings,
+        }
+
+        for level in range(len(self.levels) - 1):
+            level_nodes = self.levels[level]
+            known_set = set(known)
+            parents = []
+
+            for index in known:
+                sibling_index = index ^ 1
+                if sibling_index < len(level_nodes) and sibling_index not in known_set:
+                    siblings.append(self._to_hex(level_nodes[sibling_index]))
+
+                parent_index = index // 2
+                if not parents or parents[-1] != parent_index:
+                    parents.append(parent_index)
+
+            known = parents
+
+        return multiproof
     
     
-def verify_proof(leaf_hash, proof, root):
+@timed_verify(metrics_position=6)
+def verify_proof(leaf_hash, proof, root, engine="hex", hash_name="sha256", sorted_pairs=False,
+                 metrics=None):
+    _, hash_pair = node_hashers(engine, hash_name)
+
+    if sorted_pairs:
+        # proof is a flat list of sibling hashes
+        decode = bytes.fromhex if engine == "binary" else (lambda value: value)
+        computed_hash = decode(leaf_hash)
+        for sibling_hash in proof:
+            computed_hash = hash_pair(sorted_pair(computed_hash, decode(sibling_hash)), metrics)
+        return (computed_hash.hex() if engine == "binary" else computed_hash) == root
+
+    if engine == "binary":
+        computed_hash = bytes.fromhex(leaf_hash)
+
+        for sibling_hash, is_left in proof:
+            sibling = bytes.fromhex(sibling_hash)
+            if is_left:
+                computed_hash = hash_pair(sibling + computed_hash, metrics)
+            else:
+                computed_hash = hash_pair(computed_hash + sibling, metrics)
+
+        return computed_hash.hex() == root
 
     computed_hash = leaf_hash
 
     for sibling_hash, is_left in proof:
         if is_left:
-            computed_hash = sha256(sibling_hash + computed_hash)
+            computed_hash = hash_pair(sibling_hash + computed_hash, metrics)
         else:
-            computed_hash = sha256(computed_hash + sibling_hash)
+            computed_hash = hash_pair(computed_hash + sibling_hash, metrics)
 
     return computed_hash == root
 
+
+@timed_verify(metrics_position=4)
+def verify_multiproof(leaf_hashes, multiproof, root, engine="hex", metrics=None,
+                      hash_name="sha256", sorted_pairs=False):
+    """
+    Check a get_multiproof() result. leaf_hashes must line up with
+    multiproof["indices"]. Every internal node on the union of paths is
+    hashed once, however many of the leaves share it.
+    """
+    indices = multiproof["indices"]
+    width = multiproof["leaf_count"]
+
+    if len(leaf_hashes) != len(indices) or not indices:
+        return False
+    if indices[0] < 0 or indices[-1] >= width or indices != sorted(set(indices)):
+        return False
+
+    _, hash_pair = node_hashers(engine, hash_name)
+    decode = bytes.fromhex if engine == "binary" else (lambda value: value)
+    siblings = iter(multiproof["siblings"])
+
+    try:
+        nodes = {index: decode(leaf) for index, leaf in zip(indices, leaf_hashes)}
+        while width > 1:
+            parents = {}
+            for index in sorted(nodes):
+                parent_index = index // 2
+                if parent_index in parents:
+                    continue
+
+                sibling_index = index ^ 1
+                if sibling_index >= width:
+                    sibling = nodes[index]
+                elif sibling_index in nodes:
+                    sibling = nodes[sibling_index]
+                else:
+                    sibling = decode(next(siblings))
+
+                if sorted_pairs:
+                    parents[parent_index] = hash_pair(sorted_pair(nodes[index], sibling), metrics)
+                elif index % 2 == 0:
+                    parents[parent_index] = hash_pair(nodes[index] + sibling, metrics)
+                else:
+                    parents[parent_index] = hash_pair(sibling + nodes[index], metrics)
+
+            nodes = parents
+            width = (width + 1) // 2
+    except (StopIteration, TypeError, ValueError):
+        return False
+
+    # all supplied siblings must have been used
+    if next(siblings, None) is not None:
+        return False
+
+    computed_root = nodes[0]
+    if engine == "binary":
+        computed_root = computed_root.hex()
+    return computed_root == root
+
+
+@timed_verify(metrics_position=3)
+def verify_many(items, root, engine="hex", metrics=None, hash_name="sha256",
+                sorted_pairs=False, verified=None):
+    """
+    Check many independent (leaf_hash, proof) pairs against one root, all
+    proofs climbing one level at a time. A pair that several proofs hash
+    (where their paths merge) is hashed once, and a proof stops as soon
+    as it reaches a node already known to lead to `root` through the same
+    remaining siblings, so every answer matches verify_proof().
+
+    `verified` is a set of such (node, remaining steps) pairs; pass the
+    same set to later calls with the same root to reuse them. Returns a
+    list of bools, in order.
+    """
+    _, hash_pair = node_hashers(engine, hash_name)
+    decode = bytes.fromhex if engine == "binary" else (lambda value: value)
+    root_node = decode(root)
+    good = verified if verified is not None else set()
+    memo = {}
+    results = [False] * len(items)
+
+    # (position, node, steps, path); path holds (node, steps still to apply)
+    pending = []
+    for position, (leaf_hash, proof) in enumerate(items):
+        try:
+            node = decode(leaf_hash)
+            if sorted_pairs:
+                steps = tuple((decode(sibling_hash), False) for sibling_hash in proof)
+            else:
+                steps = tuple((decode(sibling_hash), bool(is_left)) for sibling_hash, is_left in proof)
+        except (TypeError, ValueError):
+            continue
+        pending.append((position, node, steps, [(node, steps)]))
+
+    height = 0
+    finished = []
+    while pending:
+        climbing = []
+        for position, node, steps, path in pending:
+            if path[-1] in good or height == len(steps):
+                finished.append((position, node, path))
+                continue
+
+            sibling, is_left = steps[height]
+            if sorted_pairs:
+                data = sorted_pair(node, sibling)
+            elif is_left:
+                data = sibling + node
+            else:
+                data = node + sibling
+
+            parent = memo.get(data)
+            if parent is None:
+                parent = memo[data] = hash_pair(data, metrics)
+            path.append((parent, steps[height + 1:]))
+            climbing.append((position, parent, steps, path))
+
+        pending = climbing
+        height += 1
+
+    for position, node, path in finished:
+        top = path[-1]
+        if top in good or (not top[1] and node == root_node):
+            results[position] = True
+            good.update(path)
+
+    return results
+
+
+# ---------------- CONTRACT PARITY ----------------
+def contract_proof(proof):
+    """
+    (bytes32[] proof, index) arguments for ZeroIDMerkle.verifyProofAt from
+    a get_proof() result of a hash_name="keccak256", engine="binary" tree;
+    the leaf argument is tree.get_leaf(index), all as 0x-prefixed hex.
+
+    The older verifyProof(proof, leaf) takes the same list but ignores
+    sides, so it only accepts proofs whose index is 0.
+    """
+    siblings = ["0x" + sibling_hash for sibling_hash, _ in proof]
+    index = sum(1 << depth for depth, (_, is_left) in enumerate(proof) if is_left)
+    return siblings, index
+
+
+def verify_contract_proof(leaf_hash, siblings, root, index=None):
+    """
+    Python mirror of the contract: verifyProofAt when index is given,
+    verifyProof (always computed || sibling) when it is None.
+    """
+    _, hash_pair = node_hashers("binary", "keccak256")
+    computed_hash = bytes.fromhex(leaf_hash.removeprefix("0x"))
+
+    for sibling_hash in siblings:
+        sibling = bytes.fromhex(sibling_hash.removeprefix("0x"))
+        if index is not None and index & 1:
+            computed_hash = hash_pair(sibling + computed_hash)
+        else:
+            computed_hash = hash_pair(computed_hash + sibling)
+        if index is not None:
+            index >>= 1
+
+    return computed_hash.hex() == root.removeprefix("0x")
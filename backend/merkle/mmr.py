@@ -0,0 +1,241 @@
+"""
+Merkle Mountain Range: an append-only accumulator for the issuance log.
+
+Nodes are stored in append (post-order) order, 32 raw bytes each, either
+in memory or in an append-only file. Appending a leaf writes it plus one
+node per merge, O(log n) worst case and O(1) amortised, and never touches
+older nodes. Only the peaks (one per set bit of the leaf count) are kept
+in memory, so a file-backed range scales to tens of millions of leaves.
+
+The anchor root bags the peaks right to left,
+    root = H(peak_0 + H(peak_1 + ... H(peak_k-1 + peak_k)))
+and is a plain 32-byte digest, so it can go to send_root() as is.
+"""
+
+import os
+
+from .merkle_tree import DIGEST_SIZE, DigestLevel, OperationMetrics, node_hashers
+
+
+# ---------------- NODE STORES ----------------
+class FileNodes:
+    """Append-only node file; reads go through pread, nothing is cached."""
+
+    def __init__(self, path):
+        self.file = open(path, "ab+")
+        size = os.fstat(self.file.fileno()).st_size
+        self.count = size // DIGEST_SIZE
+        self.dirty = False
+        # a torn write leaves a partial node; appends must start aligned
+        if size % DIGEST_SIZE:
+            self.truncate(self.count)
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, pos):
+        if not 0 <= pos < self.count:
+            raise IndexError("MMR position out of range")
+        if self.dirty:
+            self.file.flush()
+            self.dirty = False
+        return os.pread(self.file.fileno(), DIGEST_SIZE, pos * DIGEST_SIZE)
+
+    def append(self, digest):
+        self.file.write(digest)
+        self.count += 1
+        self.dirty = True
+
+    def truncate(self, count):
+        self.file.flush()
+        self.file.truncate(count * DIGEST_SIZE)
+        self.count = count
+        self.dirty = False
+
+    def flush(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.dirty = False
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+
+def peaks_for_size(size):
+    """
+    [(height, position)] of the peaks of an MMR with `size` nodes, left to
+    right, or None if no valid MMR has that size (an unfinished append).
+    """
+    peaks = []
+    base = 0
+    height = size.bit_length()
+    while size:
+        while (1 << (height + 1)) - 1 > size:
+            height -= 1
+        if peaks and peaks[-1][0] == height:
+            return None
+        mountain = (1 << (height + 1)) - 1
+        peaks.append((height, base + mountain - 1))
+        base += mountain
+        size -= mountain
+    return peaks
+
+
+# ---------------- MOUNTAIN RANGE ----------------
+class MerkleMountainRange:
+    """
+    path=None keeps nodes in one bytearray (64 bytes per leaf); with a
+    path they live in an append-only file and reopening it only reads the
+    peaks back. hash_name picks the backend (see merkle.hashes).
+    """
+
+    def __init__(self, path=None, hash_name="sha256"):
+        self.hash_name = hash_name
+        self.hash_leaf, self.hash_pair = node_hashers("binary", hash_name)
+        self.metrics = OperationMetrics()
+        self.nodes = FileNodes(path) if path else DigestLevel()
+
+        # a crash between a leaf and its merges leaves an invalid size
+        size = len(self.nodes)
+        while peaks_for_size(size) is None:
+            size -= 1
+        if size != len(self.nodes):
+            self.nodes.truncate(size)
+
+        self.peaks = [(height, pos, self.nodes[pos]) for height, pos in peaks_for_size(size)]
+        self.leaf_count = sum(1 << height for height, _, _ in self.peaks)
+
+    # ---------- APPEND ----------
+    def append_leaf(self, leaf):
+        """Append a raw leaf value; returns its leaf index."""
+        return self.append_hash(self.hash_leaf(leaf))
+
+    def append_hash(self, leaf_hash):
+        if isinstance(leaf_hash, str):
+            leaf_hash = bytes.fromhex(leaf_hash)
+
+        index = self.leaf_count
+        height, node = 0, leaf_hash
+        self.nodes.append(node)
+
+        # merge equal-height peaks, like carrying in a binary counter
+        while self.peaks and self.peaks[-1][0] == height:
+            _, _, left = self.peaks.pop()
+            height, node = height + 1, self.hash_pair(left + node, self.metrics)
+            self.nodes.append(node)
+
+        self.peaks.append((height, len(self.nodes) - 1, node))
+        self.leaf_count += 1
+        return index
+
+    def append_many(self, leaves):
+        start = self.leaf_count
+        for leaf in leaves:
+            self.append_leaf(leaf)
+        return start
+
+    def flush(self):
+        if isinstance(self.nodes, FileNodes):
+            self.nodes.flush()
+
+    def close(self):
+        if isinstance(self.nodes, FileNodes):
+            self.nodes.close()
+
+    # ---------- ROOT ----------
+    def get_root(self):
+        """Bagged peaks as hex (the 32-byte anchor)."""
+        if not self.peaks:
+            raise ValueError("Cannot compute the root of an empty range")
+        return bag_peaks([node for _, _, node in self.peaks], self.hash_pair).hex()
+
+    # ---------- PROOFS ----------
+    @staticmethod
+    def leaf_position(index):
+        """MMR node position of leaf `index`."""
+        return 2 * index - bin(index).count("1")
+
+    def get_leaf(self, index):
+        if not 0 <= index < self.leaf_count:
+            raise IndexError("Leaf index out of range")
+        return self.nodes[self.leaf_position(index)].hex()
+
+    def get_proof(self, index):
+        """
+        {"leaf_index", "leaf_count", "siblings", "peaks"}: siblings climb
+        from the leaf to its peak (the side follows from the leaf index),
+        and every peak is included so the verifier can re-bag the root.
+        """
+        if not 0 <= index < self.leaf_count:
+            raise IndexError("Leaf index out of range")
+
+        # find the mountain holding the leaf
+        first_leaf = 0
+        for height, peak_pos, _ in self.peaks:
+            if index < first_leaf + (1 << height):
+                break
+            first_leaf += 1 << height
+
+        siblings = []
+        pos, offset = peak_pos, index - first_leaf
+        while height:
+            right_pos = pos - 1
+            left_pos = pos - (1 << height)
+            height -= 1
+            if offset >> height & 1:
+                siblings.append(self.nodes[left_pos].hex())
+                pos = right_pos
+            else:
+                siblings.append(self.nodes[right_pos].hex())
+                pos = left_pos
+
+        siblings.reverse()
+        return {
+            "leaf_index": index,
+            "leaf_count": self.leaf_count,
+            "siblings": siblings,
+            "peaks": [node.hex() for _, _, node in self.peaks],
+        }
+
+
+def bag_peaks(peaks, hash_pair):
+    root = peaks[-1]
+    for peak in reversed(peaks[:-1]):
+        root = hash_pair(peak + root)
+    return root
+
+
+def verify_mmr_proof(leaf_hash, proof, root, hash_name="sha256"):
+    _, hash_pair = node_hashers("binary", hash_name)
+    index, leaf_count = proof["leaf_index"], proof["leaf_count"]
+    if not 0 <= index < leaf_count:
+        return False
+
+    # mountains are the set bits of leaf_count, largest first
+    heights = [h for h in range(leaf_count.bit_length() - 1, -1, -1) if leaf_count >> h & 1]
+    if len(heights) != len(proof["peaks"]):
+        return False
+
+    first_leaf = 0
+    for peak_index, height in enumerate(heights):
+        if index < first_leaf + (1 << height):
+            break
+        first_leaf += 1 << height
+
+    if len(proof["siblings"]) != height:
+        return False
+
+    offset = index - first_leaf
+    node = bytes.fromhex(leaf_hash)
+    for level, sibling_hash in enumerate(proof["siblings"]):
+        sibling = bytes.fromhex(sibling_hash)
+        if offset >> level & 1:
+            node = hash_pair(sibling + node)
+        else:
+            node = hash_pair(node + sibling)
+
+    peaks = [bytes.fromhex(peak) for peak in proof["peaks"]]
+    if node != peaks[peak_index]:
+        return False
+    return bag_peaks(peaks, hash_pair).hex() == root
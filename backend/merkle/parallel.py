@@ -0,0 +1,159 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from .hashes import get_hash, get_leaf_hash
+from .merkle_tree import DIGEST_SIZE, DigestLevel, hash_binary_level, hash_hex_level
+
+
+# smallest subtree worth shipping to another process
+MIN_CHUNK_HEIGHT = 12
+
+# leaves of the build in progress; forked workers inherit them instead of
+# receiving a pickled copy of their block
+_LEAVES = None
+
+
+def available_cpus():
+    """CPUs this process may run on (its affinity mask where supported)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+# ---------------- WORKER ----------------
+def build_subtree(values, engine, height, hash_name="sha256", sorted_pairs=False):
+    """
+    Hash one aligned block of leaves and build exactly `height` levels
+    above it. A short last block keeps duplicating its last node, which
+    is what the serial build does at the right edge of the whole tree.
+    """
+    new = get_hash(hash_name)
+    new_leaf = get_leaf_hash(hash_name)
+
+    if engine == "binary":
+        level = DigestLevel()
+        for x in values:
+            level.append(new_leaf(x.encode()).digest())
+        levels = [level]
+        for _ in range(height):
+            level = hash_binary_level(level, new, sorted_pairs)
+            levels.append(level)
+        return [bytes(level.buf) for level in levels]
+
+    level = [new_leaf(x.encode()).hexdigest() for x in values]
+    levels = [level]
+    for _ in range(height):
+        level = hash_hex_level(level, new, sorted_pairs)
+        levels.append(level)
+    return levels
+
+
+def build_block(segment, offsets, start, end, engine, height, hash_name="sha256",
+                sorted_pairs=False, values=None):
+    """
+    Build the block of leaves [start, end) and write each of its levels
+    as raw digests at its place in the shared segment. Only the segment
+    name and the offsets cross the process boundary, never the nodes.
+    """
+    if values is None:
+        values = _LEAVES[start:end]
+    levels = build_subtree(values, engine, height, hash_name, sorted_pairs)
+
+    shm = shared_memory.SharedMemory(name=segment)
+    try:
+        for depth, level in enumerate(levels):
+            raw = level if engine == "binary" else bytes.fromhex("".join(level))
+            offset = offsets[depth] + (start >> depth) * DIGEST_SIZE
+            shm.buf[offset:offset + len(raw)] = raw
+    finally:
+        shm.close()
+
+
+# ---------------- PARALLEL BUILD ----------------
+def chunk_height(leaf_count, workers):
+    # aim for a few blocks per worker so a slow block doesn't stall the pool
+    target = max(1, leaf_count // (workers * 4))
+    return max(MIN_CHUNK_HEIGHT, target.bit_length() - 1)
+
+
+def _build_blocks(leaves, engine, workers, height, hash_name, sorted_pairs):
+    # the bottom height + 1 levels, every block written in place by the pool
+    global _LEAVES
+    size = 1 << height
+    counts = [(len(leaves) + (1 << depth) - 1) >> depth for depth in range(height + 1)]
+    offsets = []
+    total = 0
+    for count in counts:
+        offsets.append(total)
+        total += count * DIGEST_SIZE
+
+    fork = "fork" in multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("fork") if fork else None
+    shm = shared_memory.SharedMemory(create=True, size=total)
+    try:
+        _LEAVES = leaves if fork else None
+        try:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+                futures = [
+                    pool.submit(
+                        build_block, shm.name, offsets, start, min(start + size, len(leaves)),
+                        engine, height, hash_name, sorted_pairs,
+                        None if fork else leaves[start:start + size],
+                    )
+                    for start in range(0, len(leaves), size)
+                ]
+                for future in futures:
+                    future.result()
+        finally:
+            _LEAVES = None
+
+        levels = []
+        step = 2 * DIGEST_SIZE
+        for offset, count in zip(offsets, counts):
+            raw = bytes(shm.buf[offset:offset + count * DIGEST_SIZE])
+            if engine == "binary":
+                levels.append(DigestLevel(raw))
+            else:
+                text = raw.hex()
+                levels.append([text[i:i + step] for i in range(0, len(text), step)])
+        return levels
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def build_levels_parallel(leaves, engine="hex", workers=None, hash_name="sha256", sorted_pairs=False):
+    """
+    Split the leaves into blocks of 2^h, build each block's subtree in a
+    process pool, and finish the few levels above the block roots
+    serially. Blocks are aligned to 2^h, so the result is level-for-level
+    identical to MerkleTree.build_tree.
+
+    Workers write their levels straight into one shared-memory segment
+    and, where processes fork, read their leaves from the parent's list,
+    so nothing but block bounds is pickled either way.
+    """
+    leaves = list(leaves)
+    workers = workers or available_cpus()
+    height = chunk_height(len(leaves), workers)
+
+    if len(leaves) <= 1 << height:
+        level = build_subtree(leaves, engine, 0, hash_name, sorted_pairs)[0]
+        levels = [DigestLevel(level) if engine == "binary" else level]
+    else:
+        levels = _build_blocks(leaves, engine, workers, height, hash_name, sorted_pairs)
+
+    # ---- levels above the block roots ----
+    new = get_hash(hash_name)
+    current = levels[-1]
+    while len(current) > 1:
+        if engine == "binary":
+            current = hash_binary_level(current, new, sorted_pairs)
+        else:
+            current = hash_hex_level(current, new, sorted_pairs)
+        levels.append(current)
+
+    return levels
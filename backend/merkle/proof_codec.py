@@ -0,0 +1,90 @@
+"""
+Compact binary encoding of Merkle proofs.
+
+    version u8 | flags u8 | depth u8 | direction bitmask | depth x 32-byte sibling
+
+Bit i of the bitmask (big-endian, ceil(depth / 8) bytes) is set when the
+sibling at level i is on the left. With flags & FLAG_SORTED_PAIRS the
+proof is a flat sorted-pair proof and the bitmask is left out.
+
+A 20-level proof is 3 + 3 + 640 = 646 bytes, against about 1.5 KB as a
+JSON list of [hex, bool] pairs.
+"""
+
+import base64
+import struct
+
+from .merkle_tree import DIGEST_SIZE
+
+
+PROOF_VERSION = 1
+FLAG_SORTED_PAIRS = 0x01
+PROOF_HEADER = struct.Struct(">BBB")
+
+
+class ProofFormatError(ValueError):
+    pass
+
+
+def encode_proof(proof):
+    """Encode a get_proof() result, positional or sorted-pair (flat)."""
+    depth = len(proof)
+    if depth > 255:
+        raise ProofFormatError("Merkle proof is too deep to encode")
+
+    sorted_pairs = bool(proof) and isinstance(proof[0], str)
+    flags = FLAG_SORTED_PAIRS if sorted_pairs else 0
+
+    parts = [PROOF_HEADER.pack(PROOF_VERSION, flags, depth)]
+    if sorted_pairs:
+        siblings = proof
+    else:
+        siblings = [sibling_hash for sibling_hash, _ in proof]
+        mask = sum(1 << level for level, (_, is_left) in enumerate(proof) if is_left)
+        parts.append(mask.to_bytes((depth + 7) // 8, "big"))
+
+    parts.extend(bytes.fromhex(sibling_hash) for sibling_hash in siblings)
+    return b"".join(parts)
+
+
+def decode_proof(blob):
+    """Inverse of encode_proof: [(hex, is_left), ...] or a flat hex list."""
+    if len(blob) < PROOF_HEADER.size:
+        raise ProofFormatError("Merkle proof is truncated")
+
+    version, flags, depth = PROOF_HEADER.unpack_from(blob, 0)
+    if version != PROOF_VERSION:
+        raise ProofFormatError(f"Unsupported Merkle proof version: {version}")
+
+    offset = PROOF_HEADER.size
+    sorted_pairs = bool(flags & FLAG_SORTED_PAIRS)
+    if not sorted_pairs:
+        mask_size = (depth + 7) // 8
+        mask = int.from_bytes(blob[offset:offset + mask_size], "big")
+        offset += mask_size
+
+    if len(blob) != offset + depth * DIGEST_SIZE:
+        raise ProofFormatError("Merkle proof length does not match its depth")
+
+    siblings = [
+        bytes(blob[start:start + DIGEST_SIZE]).hex()
+        for start in range(offset, len(blob), DIGEST_SIZE)
+    ]
+    if sorted_pairs:
+        return siblings
+    return [(sibling_hash, bool(mask >> level & 1)) for level, sibling_hash in enumerate(siblings)]
+
+
+# ---------------- TEXT FORM ----------------
+def encode_proof_b64(proof):
+    """encode_proof() as unpadded base64url, for JSON fields and QR codes."""
+    return base64.urlsafe_b64encode(encode_proof(proof)).rstrip(b"=").decode()
+
+
+def decode_proof_b64(text):
+    padded = text + "=" * (-len(text) % 4)
+    try:
+        blob = base64.urlsafe_b64decode(padded)
+    except ValueError:
+        raise ProofFormatError("Merkle proof is not valid base64url")
+    return decode_proof(blob)
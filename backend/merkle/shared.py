@@ -0,0 +1,395 @@
+"""
+Merkle tree in POSIX shared memory: one writer, many lock-free readers.
+
+A small control segment (the configured name) points at the current
+data segment "<name>.<epoch>". The data segment holds a header with a
+generation counter, a JSON meta slot, a level table and every level
+preallocated to a fixed capacity, as raw 32-byte nodes.
+
+Updates follow a seqlock: the writer makes the generation odd, mutates
+nodes in place, then makes it even again. Readers copy what they need
+(a proof, the root ...) and retry if the generation moved meanwhile, so
+they never take a lock and never copy the tree. When appends outgrow the
+capacity the writer publishes a bigger segment under a new epoch and
+readers re-attach on their next read.
+"""
+
+import json
+import struct
+import time
+from multiprocessing import shared_memory
+
+from .hashes import HASH_CODES, SORTED_PAIRS_FLAG
+from .merkle_tree import DIGEST_SIZE, DigestLevel, MerkleTree
+
+
+CONTROL_MAGIC = b"ZIDSHMC1"
+DATA_MAGIC = b"ZIDSHMT1"
+VERSION = 1
+ENGINE_CODES = {"hex": 0, "binary": 1}
+
+CONTROL = struct.Struct(">8sQ64s")           # magic, epoch, data segment name
+HEADER = struct.Struct(">8sHBBQIQI")         # magic, version, engine, hash,
+                                             # generation, level_count, capacity, max_levels
+GENERATION_OFFSET = 12
+LEVEL_COUNT_OFFSET = 20
+META_SIZE = 256
+META_OFFSET = HEADER.size                    # meta_len u32 + META_SIZE bytes
+LEVEL_TABLE_OFFSET = META_OFFSET + 4 + META_SIZE
+LEVEL_ENTRY = struct.Struct(">QQ")           # node offset, node count
+
+
+class SharedCapacityError(ValueError):
+    pass
+
+
+class SharedTimeoutError(TimeoutError):
+    """The writer left the tree mid-update for longer than the reader's timeout."""
+
+
+def _attach(name):
+    # Readers must not let the resource tracker unlink the writer's segment
+    # when they exit (track=False exists from Python 3.13 on).
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        from multiprocessing import resource_tracker
+        shm = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+
+# ---------------- SHARED LEVEL ----------------
+class SharedLevel:
+    """One preallocated level; its node count lives in the level table."""
+
+    __slots__ = ("buf", "entry", "offset", "capacity", "engine")
+
+    def __init__(self, buf, entry, offset, capacity, engine):
+        self.buf = buf
+        self.entry = entry
+        self.offset = offset
+        self.capacity = capacity
+        self.engine = engine
+
+    def __len__(self):
+        return struct.unpack_from(">Q", self.buf, self.entry + 8)[0]
+
+    def _set_len(self, count):
+        struct.pack_into(">Q", self.buf, self.entry + 8, count)
+
+    def __getitem__(self, index):
+        count = len(self)
+        if index < 0:
+            index += count
+        if index < 0 or index >= count:
+            raise IndexError("SharedLevel index out of range")
+        start = self.offset + index * DIGEST_SIZE
+        node = bytes(self.buf[start:start + DIGEST_SIZE])
+        return node.hex() if self.engine == "hex" else node
+
+    def __setitem__(self, index, node):
+        if index < 0:
+            index += len(self)
+        start = self.offset + index * DIGEST_SIZE
+        self.buf[start:start + DIGEST_SIZE] = bytes.fromhex(node) if self.engine == "hex" else node
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def append(self, node):
+        count = len(self)
+        if count >= self.capacity:
+            raise SharedCapacityError("Shared Merkle level is full")
+        self._set_len(count + 1)
+        self[count] = node
+
+    def to_memory(self):
+        raw = bytes(self.buf[self.offset:self.offset + len(self) * DIGEST_SIZE])
+        if self.engine == "binary":
+            return DigestLevel(raw)
+        return [raw[i:i + DIGEST_SIZE].hex() for i in range(0, len(raw), DIGEST_SIZE)]
+
+
+def _levels(buf, engine, max_levels, capacity):
+    levels = []
+    for depth in range(max_levels):
+        entry = LEVEL_TABLE_OFFSET + depth * LEVEL_ENTRY.size
+        offset = LEVEL_ENTRY.unpack_from(buf, entry)[0]
+        levels.append(SharedLevel(buf, entry, offset, max(1, capacity >> depth), engine))
+    return levels
+
+
+class _WriterTree(MerkleTree):
+    # new levels come from the preallocated segment, not from the heap
+    def _new_level(self):
+        return self.shared_levels[len(self.levels)]
+
+
+# ---------------- WRITER ----------------
+class SharedMerkleWriter:
+    """Owns the shared tree. Only one process may hold a writer per name."""
+
+    def __init__(self, name, tree, capacity=None, meta=None):
+        self.name = name
+        self.epoch = 0
+        self.data = None
+
+        try:
+            self.control = shared_memory.SharedMemory(name=name, create=True, size=CONTROL.size)
+        except FileExistsError:
+            # left behind by a writer that died; take it over
+            self.control = shared_memory.SharedMemory(name=name)
+            self.epoch = CONTROL.unpack_from(self.control.buf, 0)[1]
+
+        self._publish(tree, capacity, meta or {})
+
+    def _publish(self, tree, capacity, meta):
+        leaf_count = len(tree.levels[0])
+        capacity = capacity or 1024
+        while capacity < leaf_count:
+            capacity *= 2
+        capacity = 1 << (capacity - 1).bit_length()
+        max_levels = capacity.bit_length()
+
+        size = LEVEL_TABLE_OFFSET + LEVEL_ENTRY.size * max_levels
+        node_offsets = []
+        for depth in range(max_levels):
+            node_offsets.append(size)
+            size += max(1, capacity >> depth) * DIGEST_SIZE
+
+        self.epoch += 1
+        data_name = f"{self.name}.{self.epoch}"
+        data = shared_memory.SharedMemory(name=data_name, create=True, size=size)
+        buf = data.buf
+
+        HEADER.pack_into(
+            buf, 0, DATA_MAGIC, VERSION, ENGINE_CODES[tree.engine],
+            HASH_CODES[tree.hash_name] | (SORTED_PAIRS_FLAG if tree.sorted_pairs else 0),
+            0, len(tree.levels), capacity, max_levels,
+        )
+        for depth, offset in enumerate(node_offsets):
+            count = len(tree.levels[depth]) if depth < len(tree.levels) else 0
+            LEVEL_ENTRY.pack_into(buf, LEVEL_TABLE_OFFSET + depth * LEVEL_ENTRY.size, offset, count)
+
+        shared_levels = _levels(buf, tree.engine, max_levels, capacity)
+        for depth, level in enumerate(tree.levels):
+            raw = b"".join(
+                bytes.fromhex(node) if tree.engine == "hex" else bytes(node) for node in level
+            )
+            start = shared_levels[depth].offset
+            buf[start:start + len(raw)] = raw
+
+        self.tree = _WriterTree.from_levels(
+            shared_levels[:len(tree.levels)], tree.engine, tree.hash_name, tree.sorted_pairs
+        )
+        self.tree.shared_levels = shared_levels
+        self.capacity = capacity
+        self._write_meta(buf, meta)
+
+        # switch readers over, then drop the old segment (mapped readers keep it)
+        CONTROL.pack_into(self.control.buf, 0, CONTROL_MAGIC, self.epoch, data_name.encode())
+        old, self.data = self.data, data
+        if old is not None:
+            old.close()
+            old.unlink()
+
+    @staticmethod
+    def _write_meta(buf, meta):
+        blob = json.dumps(meta).encode()
+        if len(blob) > META_SIZE:
+            raise ValueError("Shared Merkle meta is too large")
+        struct.pack_into(">I", buf, META_OFFSET, len(blob))
+        buf[META_OFFSET + 4:META_OFFSET + 4 + len(blob)] = blob
+
+    # ---------- seqlock ----------
+    def _bump(self):
+        buf = self.data.buf
+        generation = struct.unpack_from(">Q", buf, GENERATION_OFFSET)[0]
+        struct.pack_into(">Q", buf, GENERATION_OFFSET, generation + 1)
+
+    def _write(self, mutate, meta=None):
+        self._bump()   # odd: readers retry
+        try:
+            result = mutate(self.tree)
+            struct.pack_into(">I", self.data.buf, LEVEL_COUNT_OFFSET, len(self.tree.levels))
+            if meta is not None:
+                self._write_meta(self.data.buf, meta)
+        finally:
+            self._bump()   # even: consistent again
+        return result
+
+    # ---------- mutations ----------
+    def update_leaves(self, updates, meta=None):
+        return self._write(lambda tree: tree.update_leaves(updates), meta)
+
+    def append_many(self, leaves, meta=None):
+        leaves = list(leaves)
+        if len(self.tree.levels[0]) + len(leaves) <= self.capacity:
+            return self._write(lambda tree: tree.append_many(leaves), meta)
+
+        # outgrown: finish in memory and publish a bigger segment
+        grown = MerkleTree.from_levels(
+            [level.to_memory() for level in self.tree.levels],
+            self.tree.engine, self.tree.hash_name, self.tree.sorted_pairs,
+        )
+        start = grown.append_many(leaves)
+        self._publish(grown, self.capacity * 2, meta if meta is not None else self.meta())
+        return start
+
+    def replace(self, tree, meta=None):
+        """Publish a fully rebuilt tree under a new epoch."""
+        self._publish(tree, self.capacity, meta if meta is not None else self.meta())
+
+    def set_meta(self, meta):
+        self._write(lambda tree: None, meta)
+
+    def meta(self):
+        buf = self.data.buf
+        length = struct.unpack_from(">I", buf, META_OFFSET)[0]
+        return json.loads(bytes(buf[META_OFFSET + 4:META_OFFSET + 4 + length]) or b"{}")
+
+    def get_root(self):
+        return self.tree.get_root()
+
+    def close(self, unlink=True):
+        self.data.close()
+        self.control.close()
+        if unlink:
+            self.data.unlink()
+            self.control.unlink()
+
+
+# ---------------- READER ----------------
+class SharedTreeReader:
+    """
+    Read side for worker processes. Every read runs against the live
+    shared pages and is retried if the writer changed them meanwhile.
+
+    With `timeout` set, a read that cannot get a consistent view for that
+    many seconds (a writer killed mid-update leaves the generation odd)
+    raises SharedTimeoutError instead of spinning forever.
+    """
+
+    def __init__(self, name, spin_sleep=0.0005, timeout=None):
+        self.name = name
+        self.spin_sleep = spin_sleep
+        self.timeout = timeout
+        self.control = _attach(name)
+        self.epoch = None
+        self.data = None
+        self._follow()
+
+    def _follow(self):
+        magic, epoch, data_name = CONTROL.unpack_from(self.control.buf, 0)
+        if magic != CONTROL_MAGIC:
+            raise ValueError("Shared Merkle tree is not initialised")
+        if epoch == self.epoch:
+            return
+
+        data = _attach(data_name.rstrip(b"\0").decode())
+        magic, version, engine_code, hash_code, _, _, capacity, max_levels = HEADER.unpack_from(data.buf, 0)
+        if magic != DATA_MAGIC or version != VERSION:
+            raise ValueError("Unsupported shared Merkle segment")
+
+        if self.data is not None:
+            self.data.close()
+        self.data = data
+        self.epoch = epoch
+        self.engine = {code: name for name, code in ENGINE_CODES.items()}[engine_code]
+        self.hash_name = {code: name for name, code in HASH_CODES.items()}[hash_code & ~SORTED_PAIRS_FLAG]
+        self.sorted_pairs = bool(hash_code & SORTED_PAIRS_FLAG)
+        self.levels = _levels(data.buf, self.engine, max_levels, capacity)
+
+    def generation(self):
+        return struct.unpack_from(">Q", self.data.buf, GENERATION_OFFSET)[0]
+
+    def position(self):
+        """(epoch, generation) of the live segment, read without waiting."""
+        self._follow()
+        return self.epoch, self.generation()
+
+    def read(self, fn):
+        """Run fn(tree) on a consistent view of the shared tree."""
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        while True:
+            self._follow()
+            start = self.generation()
+            if start % 2 == 0:
+                try:
+                    level_count = struct.unpack_from(">I", self.data.buf, LEVEL_COUNT_OFFSET)[0]
+                    tree = MerkleTree.from_levels(
+                        self.levels[:level_count], self.engine, self.hash_name, self.sorted_pairs
+                    )
+                    result = fn(tree)
+                except (IndexError, ValueError):
+                    # torn read while the writer was mid-update
+                    if self.generation() == start:
+                        raise
+                else:
+                    if self.generation() == start:
+                        return result
+
+            if deadline is not None and time.monotonic() >= deadline:
+                raise SharedTimeoutError(f"Shared Merkle tree {self.name} stayed mid-update")
+            if start % 2:
+                time.sleep(self.spin_sleep)
+
+    # ---------- convenience reads ----------
+    def get_root(self):
+        return self.read(lambda tree: tree.get_root())
+
+    def get_leaf(self, index):
+        return self.read(lambda tree: tree.get_leaf(index))
+
+    def get_proof(self, index):
+        return self.read(lambda tree: tree.get_proof(index))
+
+    def proof_at(self, index, leaf):
+        """
+        (leaf_hash, proof, root) for raw leaf value `leaf` expected at slot
+        `index`, all from one consistent view; None if the slot holds
+        something else.
+        """
+        def read_proof(tree):
+            if not 0 <= index < len(tree.levels[0]):
+                return None
+            leaf_hash = tree.get_leaf(index)
+            if leaf_hash != tree.leaf_hash(leaf):
+                return None
+            return leaf_hash, tree.get_proof(index), tree.get_root()
+        return self.read(read_proof)
+
+    def multiproof_at(self, expected):
+        """
+        (leaf_hashes, multiproof, root) over the slots of {index: leaf}
+        that still hold their leaf, or None if none of them does.
+        """
+        def read_multiproof(tree):
+            count = len(tree.levels[0])
+            indices = {
+                index for index, leaf in expected.items()
+                if 0 <= index < count
+                and tree.get_leaf(index) == tree.leaf_hash(leaf)
+            }
+            if not indices:
+                return None
+            multiproof = tree.get_multiproof(indices)
+            leaf_hashes = [tree.get_leaf(index) for index in multiproof['indices']]
+            return leaf_hashes, multiproof, tree.get_root()
+        return self.read(read_multiproof)
+
+    def leaf_count(self):
+        return self.read(lambda tree: len(tree.levels[0]))
+
+    def meta(self):
+        def read_meta(tree):
+            buf = self.data.buf
+            length = struct.unpack_from(">I", buf, META_OFFSET)[0]
+            return json.loads(bytes(buf[META_OFFSET + 4:META_OFFSET + 4 + length]) or b"{}")
+        return self.read(read_meta)
+
+    def close(self):
+        self.data.close()
+        self.control.close()
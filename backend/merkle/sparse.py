@@ -0,0 +1,156 @@
+from .merkle_tree import OperationMetrics, REVOKED_LEAF, sha256
+
+
+SMT_DEPTH = 256
+
+# leaf value of a key that was never set
+EMPTY_LEAF = "0" * 64
+
+
+def default_hashes(depth=SMT_DEPTH):
+    """defaults[h] = root of an empty subtree of height h."""
+    defaults = [EMPTY_LEAF]
+    for _ in range(depth):
+        defaults.append(sha256(defaults[-1] + defaults[-1]))
+    return defaults
+
+
+DEFAULT_HASHES = default_hashes()
+
+
+def smt_key(certificate_id):
+    """Tree position of a certificate: sha256 of its id, as a 256-bit int."""
+    return int(sha256(str(certificate_id)), 16)
+
+
+# ---------------- SPARSE MERKLE TREE ----------------
+class SparseMerkleTree:
+    """
+    Merkle tree over all 2^256 keys sha256(certificate_id), almost all
+    of them empty.
+
+    Only non-empty nodes are stored, in a dict keyed by (height, prefix);
+    a missing node is the precomputed default hash for its height. Setting
+    or clearing a key rehashes its path only (depth hashes), and nothing
+    ever moves, so other proofs keep their shape.
+
+    A key whose leaf is EMPTY_LEAF is provably absent, so the same proof
+    shows membership ("this certificate is revoked") or non-membership.
+    """
+
+    def __init__(self, depth=SMT_DEPTH):
+        self.depth = depth
+        self.defaults = DEFAULT_HASHES if depth == SMT_DEPTH else default_hashes(depth)
+        self.nodes = {}
+        self.metrics = OperationMetrics()
+
+    def _key(self, certificate_id):
+        key = smt_key(certificate_id)
+        return key >> (SMT_DEPTH - self.depth) if self.depth < SMT_DEPTH else key
+
+    def _node(self, height, prefix):
+        return self.nodes.get((height, prefix), self.defaults[height])
+
+    def get_root(self):
+        return self._node(self.depth, 0)
+
+    def __len__(self):
+        return sum(1 for height, _ in self.nodes if height == 0)
+
+    # ---------- UPDATE ----------
+    def _set(self, key, leaf_hash):
+        node = leaf_hash
+        for height in range(self.depth):
+            prefix = key >> height
+            if node == self.defaults[height]:
+                self.nodes.pop((height, prefix), None)
+            else:
+                self.nodes[(height, prefix)] = node
+
+            sibling = self._node(height, prefix ^ 1)
+            if prefix & 1:
+                node = sha256(sibling + node, self.metrics)
+            else:
+                node = sha256(node + sibling, self.metrics)
+
+        if node == self.defaults[self.depth]:
+            self.nodes.pop((self.depth, 0), None)
+        else:
+            self.nodes[(self.depth, 0)] = node
+        return node
+
+    def set(self, certificate_id, value):
+        """Store sha256(value) at the certificate's key. Returns the new root."""
+        return self._set(self._key(certificate_id), sha256(value))
+
+    def revoke(self, certificate_id):
+        return self.set(certificate_id, REVOKED_LEAF)
+
+    def delete(self, certificate_id):
+        """Reset the certificate's key to empty. Returns the new root."""
+        return self._set(self._key(certificate_id), EMPTY_LEAF)
+
+    def get(self, certificate_id):
+        """Leaf hash stored for the certificate, or None if its key is empty."""
+        leaf = self._node(0, self._key(certificate_id))
+        return None if leaf == EMPTY_LEAF else leaf
+
+    # ---------- PROOFS ----------
+    def get_proof(self, certificate_id):
+        """
+        Compressed proof for the certificate's key, leaf upwards:
+        bit h of `bitmap` is set when the sibling at height h is not the
+        default hash, and only those siblings are listed. With n keys set,
+        a proof carries about log2(n) hashes instead of 256.
+        """
+        key = self._key(certificate_id)
+        bitmap = 0
+        siblings = []
+
+        for height in range(self.depth):
+            sibling = self._node(height, (key >> height) ^ 1)
+            if sibling != self.defaults[height]:
+                bitmap |= 1 << height
+                siblings.append(sibling)
+
+        return {
+            "leaf": self._node(0, key),
+            "bitmap": format(bitmap, "x"),
+            "siblings": siblings,
+        }
+
+
+# ---------------- VERIFY ----------------
+def compute_sparse_root(certificate_id, leaf_hash, proof, depth=SMT_DEPTH):
+    defaults = DEFAULT_HASHES if depth == SMT_DEPTH else default_hashes(depth)
+    key = smt_key(certificate_id)
+    if depth < SMT_DEPTH:
+        key >>= SMT_DEPTH - depth
+
+    bitmap = int(proof["bitmap"], 16)
+    siblings = iter(proof["siblings"])
+    node = leaf_hash
+
+    for height in range(depth):
+        sibling = next(siblings) if bitmap >> height & 1 else defaults[height]
+        if key >> height & 1:
+            node = sha256(sibling + node)
+        else:
+            node = sha256(node + sibling)
+
+    if next(siblings, None) is not None:
+        raise ValueError("Sparse proof has more siblings than its bitmap")
+    return node
+
+
+def verify_sparse_proof(certificate_id, value, proof, root, depth=SMT_DEPTH):
+    """
+    Check that the certificate's key holds sha256(value) under `root`,
+    or, with value=None, that the key is empty (non-membership).
+    """
+    leaf_hash = EMPTY_LEAF if value is None else sha256(value)
+    try:
+        return compute_sparse_root(certificate_id, leaf_hash, proof, depth) == root
+    except (StopIteration, KeyError, TypeError, ValueError):
+        # malformed client input is a failed check, not an error
+        return False
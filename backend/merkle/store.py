@@ -0,0 +1,261 @@
+"""
+On-disk Merkle tree format, opened through mmap.
+
+    HEADER     magic "ZIDMRKL1" | version u16 | engine u8 | hash u8 (bit 7: sorted pairs) |
+               leaf_count u64 | level_count u32 | positions_offset u64 |
+               positions_count u64 | meta_len u32            (big-endian)
+    LEVELS     level_count x (offset u64, node_count u64)
+    META       meta_len bytes of JSON (caller data, e.g. a DB fingerprint)
+    NODES      every level, leaves first, as raw 32-byte digests
+    POSITIONS  positions_count x (leaf hash 32B, index u64), sorted by hash
+    CHECKSUM   sha256 of everything above (32 bytes)
+
+Hex-engine trees are stored as raw digests too and turned back into hex
+strings on read, so one file holds either engine at 32 bytes per node.
+"""
+
+import bisect
+import hashlib
+import json
+import mmap
+import os
+import struct
+
+from .hashes import HASH_CODES, SORTED_PAIRS_FLAG
+from .merkle_tree import DIGEST_SIZE, DigestLevel, MerkleTree
+
+
+MAGIC = b"ZIDMRKL1"
+VERSION = 1
+ENGINE_CODES = {"hex": 0, "binary": 1}
+HEADER = struct.Struct(">8sHBBQIQQI")
+LEVEL_ENTRY = struct.Struct(">QQ")
+POSITION_ENTRY = struct.Struct(">32sQ")
+
+
+class StoreError(ValueError):
+    pass
+
+
+# ---------------- MAPPED VIEWS ----------------
+class MappedLevel:
+    """Read-only tree level backed by the mapped file."""
+
+    __slots__ = ("mm", "offset", "count", "engine")
+
+    def __init__(self, mm, offset, count, engine):
+        self.mm = mm
+        self.offset = offset
+        self.count = count
+        self.engine = engine
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.count
+        if index < 0 or index >= self.count:
+            raise IndexError("MappedLevel index out of range")
+        start = self.offset + index * DIGEST_SIZE
+        node = self.mm[start:start + DIGEST_SIZE]
+        return node.hex() if self.engine == "hex" else node
+
+    def __iter__(self):
+        for index in range(self.count):
+            yield self[index]
+
+    def to_memory(self):
+        raw = self.mm[self.offset:self.offset + self.count * DIGEST_SIZE]
+        if self.engine == "binary":
+            return DigestLevel(raw)
+        return [raw[i:i + DIGEST_SIZE].hex() for i in range(0, len(raw), DIGEST_SIZE)]
+
+
+class MappedPositions:
+    """Leaf hash → index lookups by binary search over the sorted section."""
+
+    def __init__(self, mm, offset, count, engine):
+        self.mm = mm
+        self.offset = offset
+        self.count = count
+        self.engine = engine
+
+    def _key(self, i):
+        start = self.offset + i * POSITION_ENTRY.size
+        return self.mm[start:start + DIGEST_SIZE]
+
+    def get(self, node, default=None):
+        key = bytes.fromhex(node) if self.engine == "hex" else bytes(node)
+        keys = _KeyView(self)
+        i = bisect.bisect_left(keys, key)
+        if i < self.count and keys[i] == key:
+            start = self.offset + i * POSITION_ENTRY.size
+            return POSITION_ENTRY.unpack_from(self.mm, start)[1]
+        return default
+
+    def items(self):
+        for i in range(self.count):
+            key, index = POSITION_ENTRY.unpack_from(self.mm, self.offset + i * POSITION_ENTRY.size)
+            yield (key.hex() if self.engine == "hex" else key), index
+
+
+class _KeyView:
+    # sequence adaptor so bisect can search the mapped keys in place
+    def __init__(self, positions):
+        self.positions = positions
+
+    def __len__(self):
+        return self.positions.count
+
+    def __getitem__(self, i):
+        return self.positions._key(i)
+
+
+# ---------------- WRITE ----------------
+def _raw(node, engine):
+    return bytes.fromhex(node) if engine == "hex" else bytes(node)
+
+
+def write_tree(tree, path, meta=None):
+    """
+    Write tree to path atomically (temp file + rename), so workers that
+    still have the previous file mapped keep reading a consistent copy.
+    """
+    engine = tree.engine
+    meta_blob = json.dumps(meta or {}).encode()
+
+    positions = []
+    if tree.positions is not None:
+        positions = sorted((_raw(node, engine), index) for node, index in tree.positions.items())
+
+    level_table = []
+    offset = HEADER.size + LEVEL_ENTRY.size * len(tree.levels) + len(meta_blob)
+    for level in tree.levels:
+        level_table.append((offset, len(level)))
+        offset += len(level) * DIGEST_SIZE
+    positions_offset = offset
+
+    header = HEADER.pack(
+        MAGIC, VERSION, ENGINE_CODES[engine],
+        HASH_CODES[tree.hash_name] | (SORTED_PAIRS_FLAG if tree.sorted_pairs else 0),
+        len(tree.levels[0]), len(tree.levels),
+        positions_offset, len(positions), len(meta_blob),
+    )
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    checksum = hashlib.sha256()
+
+    with open(tmp_path, "wb") as f:
+        def emit(data):
+            checksum.update(data)
+            f.write(data)
+
+        emit(header)
+        for entry in level_table:
+            emit(LEVEL_ENTRY.pack(*entry))
+        emit(meta_blob)
+
+        for level in tree.levels:
+            if isinstance(level, DigestLevel):
+                emit(bytes(level.buf))
+            elif isinstance(level, MappedLevel):
+                emit(level.mm[level.offset:level.offset + level.count * DIGEST_SIZE])
+            else:
+                emit(b"".join(_raw(node, engine) for node in level))
+
+        for key, index in positions:
+            emit(POSITION_ENTRY.pack(key, index))
+
+        f.write(checksum.digest())
+        f.flush()
+        os.fsync(f.fileno())
+
+    os.replace(tmp_path, path)
+
+
+# ---------------- OPEN ----------------
+def _verify_checksum(mm):
+    body_end = len(mm) - DIGEST_SIZE
+    checksum = hashlib.sha256()
+    for start in range(0, body_end, 1 << 20):
+        checksum.update(mm[start:min(start + (1 << 20), body_end)])
+    if checksum.digest() != mm[body_end:]:
+        raise StoreError("Merkle store checksum mismatch")
+
+
+def _check_layout(size, leaf_count, level_table, meta_end, positions_offset, positions_count):
+    # every section must lie inside the body and the levels must have a
+    # tree's shape, so a truncated or corrupt header is rejected up front
+    body_end = size - DIGEST_SIZE
+    if not level_table or level_table[0][1] != leaf_count or level_table[-1][1] != 1:
+        raise StoreError("Merkle store level table does not describe a tree")
+
+    expected = leaf_count
+    for offset, count in level_table:
+        if count != expected:
+            raise StoreError("Merkle store level table does not describe a tree")
+        if offset < meta_end or offset + count * DIGEST_SIZE > body_end:
+            raise StoreError("Merkle store level points past the end of the file")
+        expected = (count + 1) // 2
+
+    if positions_offset < meta_end or positions_offset + positions_count * POSITION_ENTRY.size > body_end:
+        raise StoreError("Merkle store positions point past the end of the file")
+    if positions_count > leaf_count:
+        raise StoreError("Merkle store has more positions than leaves")
+
+
+def open_tree(path, verify=False):
+    """
+    Map a stored tree read-only. Proofs read sibling nodes straight from
+    the page cache; the first update or append copies it into memory.
+    The header is always bounds-checked against the file size;
+    verify=True also re-hashes the whole file against its checksum.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size < HEADER.size + DIGEST_SIZE:
+            raise StoreError("Merkle store is truncated")
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    (magic, version, engine_code, hash_code, leaf_count, level_count,
+     positions_offset, positions_count, meta_len) = HEADER.unpack_from(mm, 0)
+
+    if magic != MAGIC:
+        raise StoreError("Not a Merkle store file")
+    if version != VERSION:
+        raise StoreError(f"Unsupported Merkle store version: {version}")
+    if verify:
+        _verify_checksum(mm)
+
+    engine = {code: name for name, code in ENGINE_CODES.items()}.get(engine_code)
+    hash_name = {code: name for name, code in HASH_CODES.items()}.get(hash_code & ~SORTED_PAIRS_FLAG)
+    if engine is None or hash_name is None:
+        raise StoreError(f"Unknown Merkle store engine/hash code: {engine_code}/{hash_code}")
+    sorted_pairs = bool(hash_code & SORTED_PAIRS_FLAG)
+
+    meta_start = HEADER.size + level_count * LEVEL_ENTRY.size
+    if meta_start + meta_len > len(mm) - DIGEST_SIZE:
+        raise StoreError("Merkle store header points past the end of the file")
+    level_table = [
+        LEVEL_ENTRY.unpack_from(mm, HEADER.size + i * LEVEL_ENTRY.size) for i in range(level_count)
+    ]
+    _check_layout(len(mm), leaf_count, level_table, meta_start + meta_len,
+                  positions_offset, positions_count)
+
+    try:
+        meta = json.loads(mm[meta_start:meta_start + meta_len] or b"{}")
+    except ValueError:
+        raise StoreError("Merkle store meta is not valid JSON")
+
+    levels = [MappedLevel(mm, offset, count, engine) for offset, count in level_table]
+
+    tree = MerkleTree.from_levels(levels, engine, hash_name, sorted_pairs)
+    # every tree is opened indexed: a store with no live leaf (all revoked)
+    # has an empty position section, not a missing one
+    if positions_count:
+        tree.positions = MappedPositions(mm, positions_offset, positions_count, engine)
+    else:
+        tree.positions = {}
+    tree.mapped = True
+    tree.meta = meta
+    return tree
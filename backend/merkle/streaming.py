@@ -0,0 +1,46 @@
+from .merkle_tree import ENGINES, node_hashers, sorted_pair
+
+
+# ---------------- STREAMING ROOT ----------------
+def stream_root(leaves, engine="hex", hash_name="sha256", sorted_pairs=False):
+    """
+    Merkle root of any iterable of raw leaf values (a queryset .iterator(),
+    a csv reader, a generator ...) without materialising the tree.
+
+    Only a stack of (height, node) pairs is kept: one entry per set bit
+    of the leaf count, so O(log n) memory. The right edge is finished with
+    the same duplicate-last-node rule as MerkleTree, so the result equals
+    MerkleTree(leaves, engine, hash_name=hash_name,
+    sorted_pairs=sorted_pairs).get_root().
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown Merkle engine: {engine}")
+
+    hash_leaf, hash_pair = node_hashers(engine, hash_name)
+    join = sorted_pair if sorted_pairs else (lambda left, right: left + right)
+
+    stack = []
+    for value in leaves:
+        height, node = 0, hash_leaf(value)
+
+        # merge equal-height subtrees, like carrying in a binary counter
+        while stack and stack[-1][0] == height:
+            _, left = stack.pop()
+            height, node = height + 1, hash_pair(join(left, node))
+
+        stack.append((height, node))
+
+    if not stack:
+        raise ValueError("Cannot compute the root of an empty leaf set")
+
+    # Right edge: the smallest pending subtree is the last node of every
+    # level up to the next subtree's height, so it is paired with itself
+    # until the heights match, then merged as the right child.
+    height, node = stack.pop()
+    while stack:
+        left_height, left = stack.pop()
+        while height < left_height:
+            height, node = height + 1, hash_pair(node + node)
+        height, node = height + 1, hash_pair(join(left, node))
+
+    return node.hex() if engine == "binary" else node
@@ -0,0 +1,43 @@
+from backend.merkle.compaction import compact_tree
+from backend.merkle.consistency import verify_consistency
+from backend.merkle.merkle_tree import MerkleTree, REVOKED_LEAF, verify_proof
+
+for engine in ("hex", "binary"):
+    for sorted_pairs in (False, True):
+        options = dict(engine=engine, sorted_pairs=sorted_pairs)
+        leaves = [f"cid_{i}" for i in range(37)]
+        tree = MerkleTree(leaves, index_leaves=True, **options)
+        revoked = tree.leaf_hash(REVOKED_LEAF)
+        dead = {0, 1, 5, 16, 17, 18, 30, 36}
+        tree.update_leaves({index: revoked for index in dead})
+        anchored_root, anchored_size = tree.get_root(), len(tree.levels[0])
+
+        compacted, remap = compact_tree(tree)
+
+        # the remap keeps the live leaves in order and drops every revoked slot
+        live = [index for index in range(37) if index not in dead]
+        assert remap == {old: new for new, old in enumerate(live)}
+        assert compacted.get_root() == MerkleTree([leaves[i] for i in live], **options).get_root()
+        assert len(compacted.levels) < len(tree.levels)
+
+        # proofs after compaction: every live leaf at its new slot, no revoked one
+        root = compacted.get_root()
+        for old, new in remap.items():
+            assert compacted.get_leaf(new) == tree.get_leaf(old)
+            assert verify_proof(compacted.get_leaf(new), compacted.get_proof(new), root, **options)
+        assert revoked not in {compacted.get_leaf(i) for i in range(len(remap))}
+
+        # a root anchored before the compaction can't be linked to the new one:
+        # slots moved, so no consistency proof from it may verify
+        assert not verify_consistency(anchored_root, root, compacted.get_consistency_proof(len(remap)), **options)
+        try:
+            compacted.get_consistency_proof(anchored_size)
+            raise AssertionError("consistency proof from a size the compacted tree doesn't have")
+        except ValueError:
+            pass
+
+        # compacting again is a no-op, and a fully revoked tree has nothing to anchor
+        again, identity = compact_tree(compacted)
+        assert again.get_root() == root and identity == {i: i for i in range(len(remap))}
+        assert compact_tree(MerkleTree([REVOKED_LEAF] * 4, **options)) == (None, {})
+        print(f"Compaction engine={engine} sorted_pairs={sorted_pairs}: OK")
@@ -0,0 +1,56 @@
+from backend.merkle.consistency import verify_consistency
+from backend.merkle.merkle_tree import MerkleTree, REVOKED_LEAF
+
+for engine in ("hex", "binary"):
+    for sorted_pairs in (False, True):
+        options = dict(engine=engine, sorted_pairs=sorted_pairs)
+        tree = MerkleTree([f"cid_{i}" for i in range(13)], **options)
+
+        # append-only growth, for every old size
+        roots = {}
+        for size in range(1, 14):
+            roots[size] = MerkleTree([f"cid_{i}" for i in range(size)], **options).get_root()
+        tree.append_many([f"cid_{i}" for i in range(13, 21)])
+        new_root = tree.get_root()
+        for size, old_root in roots.items():
+            proof = tree.get_consistency_proof(size)
+            assert verify_consistency(old_root, new_root, proof, **options)
+
+        # revocations inside the old range
+        old_root = roots[13]
+        changes = {index: tree.get_leaf(index) for index in (2, 3, 9)}
+        revoked = tree.leaf_hash(REVOKED_LEAF)
+        tree.update_leaves({index: revoked for index in changes})
+        new_root = tree.get_root()
+        proof = tree.get_consistency_proof(13, changes)
+        assert verify_consistency(old_root, new_root, proof, **options)
+        print(f"Consistency engine={engine} sorted_pairs={sorted_pairs}: OK")
+
+        # tampering
+        assert not verify_consistency(roots[12], new_root, proof, **options)
+        assert not verify_consistency(old_root, roots[13], proof, **options)
+        assert not verify_consistency(old_root, new_root, tree.get_consistency_proof(13), **options)
+
+        swapped = tree.leaf_hash("cid_attacker")
+        forged = dict(proof, changes=[[2, changes[2], swapped]] + proof["changes"][1:])
+        assert not verify_consistency(old_root, new_root, forged, **options)
+        outside = dict(proof, changes=proof["changes"] + [[15, tree.get_leaf(15), revoked]])
+        assert not verify_consistency(old_root, new_root, outside, **options)
+        twice = dict(proof, changes=proof["changes"] + [proof["changes"][0]])
+        assert not verify_consistency(old_root, new_root, twice, **options)
+        unrevoked = dict(proof, changes=[[2, revoked, revoked]] + proof["changes"][1:])
+        assert not verify_consistency(old_root, new_root, unrevoked, **options)
+
+        right = dict(proof, right=["0" * 64] + proof["right"][1:])
+        assert not verify_consistency(old_root, new_root, right, **options)
+        short = dict(proof, right=proof["right"][:-1])
+        assert not verify_consistency(old_root, new_root, short, **options)
+        extra = dict(proof, change_siblings=proof["change_siblings"] + ["0" * 64])
+        assert not verify_consistency(old_root, new_root, extra, **options)
+        peaks = dict(proof, peaks=proof["peaks"][::-1])
+        assert not verify_consistency(old_root, new_root, peaks, **options)
+        for new_size in (12, 16, 40):
+            resized = dict(proof, new_size=new_size)
+            assert not verify_consistency(old_root, new_root, resized, **options)
+
+print("Consistency tamper checks OK")
@@ -0,0 +1,51 @@
+from backend.merkle.forest import MerkleForest, verify_forest_multiproof
+from backend.merkle.merkle_tree import verify_proof
+
+for engine in ("hex", "binary"):
+    for sorted_pairs in (False, True):
+        options = dict(engine=engine, sorted_pairs=sorted_pairs)
+        shards = {f"issuer_{s}": [f"cid_{s}_{i}" for i in range(3 + 4 * s)] for s in range(5)}
+        forest = MerkleForest(shards, **options)
+
+        def check_all():
+            root = forest.get_root()
+            for key in forest.keys:
+                for index in range(len(forest.shard(key).levels[0])):
+                    proof = forest.get_proof(key, index)
+                    assert verify_proof(forest.get_leaf(key, index), proof, root, **options)
+
+        # proofs follow appends, revocations, new, rebuilt and removed shards
+        check_all()
+        forest.append_many("issuer_1", ["cid_1_new_0", "cid_1_new_1"])
+        forest.revoke("issuer_3", 4)
+        forest.append_leaf("issuer_9", "cid_9_0")
+        forest.set_shard("issuer_2", ["cid_2_rebuilt"])
+        forest.set_shard("issuer_0", [])
+        assert "issuer_0" not in forest.keys and forest.index_of("issuer_1", "cid_1_new_1") == 8
+        check_all()
+        print(f"Forest engine={engine} sorted_pairs={sorted_pairs}: OK")
+
+        # tampering
+        root = forest.get_root()
+        proof = forest.get_proof("issuer_4", 6)
+        leaf = forest.get_leaf("issuer_4", 6)
+        assert not verify_proof(forest.get_leaf("issuer_4", 7), proof, root, **options)
+        assert not verify_proof(leaf, forest.get_proof("issuer_3", 6), root, **options)
+        assert not verify_proof(leaf, proof[:-1], root, **options)
+        assert not verify_proof(leaf, proof, forest.shard_root("issuer_4"), **options)
+
+        # batch verification over several shards
+        picks = [("issuer_1", 0), ("issuer_1", 8), ("issuer_3", 4), ("issuer_4", 6), ("issuer_9", 0)]
+        leaves = [forest.get_leaf(key, index) for key, index in picks]
+        multiproof = {"indices": picks, "proofs": [forest.get_proof(key, index) for key, index in picks]}
+        assert verify_forest_multiproof(leaves, multiproof, root, **options)
+
+        swapped = leaves[:1] + [leaves[2], leaves[1]] + leaves[3:]
+        assert not verify_forest_multiproof(swapped, multiproof, root, **options)
+        assert not verify_forest_multiproof(leaves[:-1], multiproof, root, **options)
+        assert not verify_forest_multiproof([], {"indices": [], "proofs": []}, root, **options)
+        cut = dict(multiproof, proofs=multiproof["proofs"][:-1] + [multiproof["proofs"][-1][1:]])
+        assert not verify_forest_multiproof(leaves, cut, root, **options)
+        assert not verify_forest_multiproof(leaves, multiproof, forest.shard_root("issuer_1"), **options)
+
+print("Forest tamper checks OK")
@@ -0,0 +1,58 @@
+import hashlib
+
+from backend.merkle.hashes import HASH_CODES, HASHES, LEAF_PREFIX, NODE_PREFIX, get_hash, get_leaf_hash
+from backend.merkle.merkle_tree import MerkleTree, contract_proof, verify_contract_proof, verify_proof
+
+# published digests of b"abc"
+VECTORS = {
+    "sha256": "ba7816bf8f01cfea414140de5dae2223b00361a396177a9cb410ff61f20015ad",
+    "blake2b": "bddd813c634239723171ef3fee98579b94964e3bb1cb3e427262c8c068d52319",
+    "keccak256": "4e03657aea45a94fc7d47ba826c8d667c0d1e6e33a64a036ec44f58fa12d6c45",
+}
+
+for name, expected in VECTORS.items():
+    new = get_hash(name)
+    assert new(b"abc").hexdigest() == expected, name
+    assert new(b"abc").digest() == bytes.fromhex(expected)
+    assert get_leaf_hash(name)(b"abc").hexdigest() == expected
+
+    # -ds: leaves take a 0x00 prefix, nodes 0x01, and the seed is never consumed
+    ds_leaf, ds_node = get_leaf_hash(name + "-ds"), get_hash(name + "-ds")
+    for data in (b"abc", b"", b"abc", bytes(64)):
+        assert ds_leaf(data).hexdigest() == new(LEAF_PREFIX + data).hexdigest()
+        assert ds_node(data).digest() == new(NODE_PREFIX + data).digest()
+    print(f"{name} / {name}-ds vectors OK")
+
+assert hashlib.sha256(b"abc").hexdigest() == VECTORS["sha256"]
+assert sorted(HASH_CODES) == sorted(HASHES) and len(set(HASH_CODES.values())) == len(HASHES)
+try:
+    get_hash("md5")
+except ValueError:
+    print("Unknown hash rejected")
+else:
+    raise AssertionError("get_hash accepted md5")
+
+# keccak256 binary trees hash like ZeroIDMerkle.sol: verifyProofAt accepts
+# every leaf at its index and nothing at a wrong one
+keccak = get_hash("keccak256")
+pair = MerkleTree(["a", "b"], engine="binary", hash_name="keccak256")
+assert pair.get_root() == keccak(bytes.fromhex(pair.get_leaf(0) + pair.get_leaf(1))).hexdigest()
+
+for size in (1, 2, 5, 8, 13):
+    tree = MerkleTree([f"cid_{i}" for i in range(size)], engine="binary", hash_name="keccak256")
+    root = "0x" + tree.get_root()
+    for index in range(size):
+        proof = tree.get_proof(index)
+        siblings, at = contract_proof(proof)
+        leaf = "0x" + tree.get_leaf(index)
+        assert at == index
+        assert verify_contract_proof(leaf, siblings, root, at)
+        assert verify_proof(tree.get_leaf(index), proof, tree.get_root(), engine="binary", hash_name="keccak256")
+        # a duplicated right-edge node is its own sibling, so its side can't matter
+        if siblings and siblings[0] != leaf:
+            assert not verify_contract_proof(leaf, siblings, root, at ^ 1)
+    # the old verifyProof ignores sides: index 0 passes, a right child doesn't
+    assert verify_contract_proof("0x" + tree.get_leaf(0), contract_proof(tree.get_proof(0))[0], root)
+    if size > 1:
+        assert not verify_contract_proof("0x" + tree.get_leaf(1), contract_proof(tree.get_proof(1))[0], root)
+print("verifyProofAt parity OK")
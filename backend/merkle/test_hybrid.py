@@ -0,0 +1,53 @@
+from backend.merkle.hybrid import HybridMerkleTree, SubtreeLevel
+from backend.merkle.merkle_tree import MerkleTree, REVOKED_LEAF
+
+
+def same(hybrid, tree):
+    assert hybrid.get_root() == tree.get_root()
+    assert len(hybrid.levels) == len(tree.levels)
+    count = len(tree.levels[0])
+    for index in range(count):
+        assert hybrid.get_proof(index) == tree.get_proof(index)
+    picks = list(range(0, count, 3))
+    assert hybrid.get_proofs(picks) == [tree.get_proof(index) for index in picks]
+    assert hybrid.get_multiproof(picks) == tree.get_multiproof(picks)
+
+
+for engine in ("hex", "binary"):
+    for sorted_pairs in (False, True):
+        for top_levels in (1, 2, 4):
+            options = dict(engine=engine, sorted_pairs=sorted_pairs)
+            for size in (1, 2, 7, 33):
+                leaves = [f"cid_{i}" for i in range(size)]
+                hybrid = HybridMerkleTree(leaves, index_leaves=True, top_levels=top_levels, **options)
+                tree = MerkleTree(leaves, index_leaves=True, **options)
+                same(hybrid, tree)
+
+                # updates, revocations and appends past powers of two
+                revoked = tree.leaf_hash(REVOKED_LEAF)
+                for target in (hybrid, tree):
+                    target.update_leaf(0, target.leaf_hash("cid_swapped"))
+                    target.update_leaves({size - 1: revoked, size // 2: revoked})
+                    target.append_many([f"cid_new_{i}" for i in range(size + 3)])
+                    target.append_leaf("cid_last")
+                    target.delta_revoke(size + 1)
+                same(hybrid, tree)
+                assert hybrid.index_of("cid_last") == tree.index_of("cid_last")
+            print(f"Hybrid engine={engine} sorted_pairs={sorted_pairs} top_levels={top_levels}: OK")
+
+# the lower levels are virtual: they can't be written or exported
+hybrid = HybridMerkleTree([f"cid_{i}" for i in range(64)], top_levels=2)
+assert hybrid.resident_nodes() < sum(len(level) for level in MerkleTree([f"cid_{i}" for i in range(64)]).levels)
+virtual = next(level for level in hybrid.levels if isinstance(level, SubtreeLevel))
+for write in (lambda: virtual.__setitem__(0, hybrid.get_leaf(0)), lambda: virtual.append(hybrid.get_leaf(0))):
+    try:
+        write()
+        raise AssertionError("write to a SubtreeLevel was accepted")
+    except TypeError:
+        pass
+try:
+    hybrid.to_arrays()
+    raise AssertionError("to_arrays on a hybrid tree returned")
+except NotImplementedError:
+    pass
+print("Hybrid virtual level checks OK")
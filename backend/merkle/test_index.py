@@ -0,0 +1,49 @@
+import random
+
+from backend.merkle.merkle_tree import MerkleTree, REVOKED_LEAF
+
+rng = random.Random(7)
+
+for engine in ("hex", "binary"):
+    cids = [f"cid_{i}" for i in range(50)]
+    tree = MerkleTree(cids, engine=engine, index_leaves=True)
+    revoked = tree.leaf_hash(REVOKED_LEAF)
+
+    def expected(cid):
+        return cids.index(cid) if cid in cids else None
+
+    assert all(tree.index_of(cid) == i for i, cid in enumerate(cids))
+    assert tree.index_of("missing") is None
+
+    # appends land at the end of the index
+    start = tree.append_many([f"cid_{i}" for i in range(50, 60)])
+    cids += [f"cid_{i}" for i in range(50, 60)]
+    assert start == 50 and tree.index_of("cid_55") == 55
+
+    # revoking drops the leaf, and the shared revoked hash is never indexed
+    for index in rng.sample(range(60), 12):
+        tree.update_leaf(index, revoked)
+        cids[index] = REVOKED_LEAF
+    tree.update_leaves({3: revoked, 4: revoked})
+    cids[3] = cids[4] = REVOKED_LEAF
+    tree.append_leaf(REVOKED_LEAF)
+    cids.append(REVOKED_LEAF)
+    assert tree.index_of(REVOKED_LEAF) is None
+
+    # replacing a leaf moves its value to the new slot
+    tree.update_leaves({10: tree.leaf_hash("renamed")})
+    cids[10] = "renamed"
+
+    for cid in set(cids) - {REVOKED_LEAF}:
+        assert tree.index_of(cid) == expected(cid), cid
+
+    # a duplicate keeps pointing at its first occurrence
+    tree.append_many(["renamed", "dup", "dup"])
+    assert tree.index_of("renamed") == 10
+    assert tree.index_of("dup") == len(cids) + 1
+
+    # rebuilding the index from scratch gives the same map
+    incremental = dict(tree.positions)
+    tree._build_positions()
+    assert tree.positions == incremental
+    print(f"Leaf index engine={engine} OK")
@@ -0,0 +1,67 @@
+import threading
+
+from backend.merkle.merkle_tree import MerkleTree, OperationMetrics, prometheus_text, verify_proof
+
+metrics = OperationMetrics()
+tree = MerkleTree([f"cid_{i}" for i in range(8)], metrics=metrics)
+for index in (0, 3, 7):
+    tree.get_proof(index)
+tree.update_leaf(2, tree.leaf_hash("REVOKED"))
+assert verify_proof(tree.get_leaf(5), tree.get_proof(5), tree.get_root(), metrics=metrics)
+
+# calls and hashes land in the phase that did them
+phases = metrics.snapshot()["phases"]
+expected = {
+    "leaf_hash": (1, 8),   # one pass over 8 leaves
+    "build": (1, 7),       # 4 + 2 + 1 parents
+    "proof": (4, 0),
+    "update": (1, 3),      # one parent per level
+    "verify": (1, 3),
+}
+for name, (calls, hashes) in expected.items():
+    assert (phases[name]["calls"], phases[name]["hash_operations"]) == (calls, hashes), name
+    assert sum(count for _, count in phases[name]["histogram"]) == calls
+assert metrics.snapshot()["hash_operations"] == 21
+print("Metrics phase counts OK")
+
+# threads sharing one metrics object only charge their own hashes
+shared = OperationMetrics()
+trees = [MerkleTree([f"cid_{t}_{i}" for i in range(1024)], metrics=shared) for t in range(4)]
+start = threading.Barrier(len(trees))
+
+
+def churn(tree):
+    start.wait()
+    for index in range(200):
+        tree.update_leaf(index, tree.leaf_hash(f"new_{index}"))
+
+
+before = shared.hash_operations
+threads = [threading.Thread(target=churn, args=(tree,)) for tree in trees]
+for thread in threads:
+    thread.start()
+for thread in threads:
+    thread.join()
+update = shared.snapshot()["phases"]["update"]
+assert update["calls"] == 800 and update["hash_operations"] == 800 * 10
+assert shared.hash_operations == before    # this thread did none of them
+print("Metrics per-thread counts OK")
+
+# Prometheus text: cumulative buckets ending in +Inf == count, one series per phase
+text = prometheus_text(metrics.snapshot())
+samples = {}
+for line in text.splitlines():
+    if not line.startswith("#"):
+        name, value = line.rsplit(" ", 1)
+        samples[name] = float(value)
+
+assert text.startswith("# TYPE merkle_phase_seconds histogram\n") and text.endswith("\n")
+for name, (calls, hashes) in expected.items():
+    label = f'phase="{name}"'
+    buckets = [value for key, value in samples.items() if key.startswith(f"merkle_phase_seconds_bucket{{{label},")]
+    assert buckets == sorted(buckets) and buckets[-1] == calls
+    assert samples[f'merkle_phase_seconds_bucket{{{label},le="+Inf"}}'] == calls
+    assert samples[f"merkle_phase_seconds_count{{{label}}}"] == calls
+    assert samples[f"merkle_phase_hash_operations_total{{{label}}}"] == hashes
+    assert samples[f"merkle_phase_seconds_sum{{{label}}}"] >= 0
+print("Metrics Prometheus text OK")
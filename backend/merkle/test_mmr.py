@@ -0,0 +1,64 @@
+import os
+import tempfile
+
+from backend.merkle.mmr import MerkleMountainRange, verify_mmr_proof
+
+path = os.path.join(tempfile.mkdtemp(), "issuance.mmr")
+
+mmr = MerkleMountainRange(path)
+for i in range(11):
+    mmr.append_leaf(f"cid_{i}")
+root = mmr.get_root()
+
+# every leaf proves against the bagged root, in memory and on disk
+memory = MerkleMountainRange()
+memory.append_many(f"cid_{i}" for i in range(11))
+assert memory.get_root() == root
+for index in range(11):
+    assert verify_mmr_proof(mmr.get_leaf(index), mmr.get_proof(index), root)
+mmr.close()
+print("MMR proofs OK")
+
+# reopening reads the peaks back and keeps appending where it stopped
+mmr = MerkleMountainRange(path)
+assert mmr.leaf_count == 11 and mmr.get_root() == root
+index = mmr.append_leaf("cid_11")
+memory.append_leaf("cid_11")
+assert index == 11 and mmr.get_root() == memory.get_root()
+mmr.close()
+print("MMR reopen OK")
+
+# a torn write (partial node) and an unfinished merge are both cut off
+size = os.path.getsize(path)
+with open(path, "ab") as f:
+    f.write(b"\x01" * 10)
+mmr = MerkleMountainRange(path)
+assert os.path.getsize(path) == size and mmr.get_root() == memory.get_root()
+
+mmr.nodes.append(mmr.hash_leaf("cid_12"))   # leaf written, merges never were
+mmr.nodes.append(mmr.hash_leaf("cid_13"))
+mmr.close()
+mmr = MerkleMountainRange(path)
+memory.append_leaf("cid_12")                 # leaf 12 needs no merge, so it survives
+assert mmr.leaf_count == 13 and mmr.get_root() == memory.get_root()
+
+index = mmr.append_leaf("cid_13")
+memory.append_leaf("cid_13")
+assert mmr.get_root() == memory.get_root()
+assert verify_mmr_proof(mmr.get_leaf(index), mmr.get_proof(index), mmr.get_root())
+mmr.close()
+print("MMR crash recovery OK")
+
+# tampering
+mmr = MerkleMountainRange(path)
+root = mmr.get_root()
+proof = mmr.get_proof(5)
+leaf = mmr.get_leaf(5)
+assert not verify_mmr_proof(mmr.get_leaf(6), proof, root)
+assert not verify_mmr_proof(leaf, dict(proof, leaf_index=6), root)
+assert not verify_mmr_proof(leaf, dict(proof, leaf_count=proof["leaf_count"] + 1), root)
+assert not verify_mmr_proof(leaf, dict(proof, siblings=proof["siblings"][:-1]), root)
+assert not verify_mmr_proof(leaf, dict(proof, peaks=proof["peaks"][::-1]), root)
+assert not verify_mmr_proof(leaf, dict(proof, peaks=proof["peaks"][:-1] + ["00" * 32]), root)
+mmr.close()
+print("MMR tamper checks OK")
@@ -0,0 +1,49 @@
+from backend.merkle.merkle_tree import MerkleTree, verify_multiproof
+
+leaves = [f"cert_{i}" for i in range(13)]
+
+for engine in ("hex", "binary"):
+    for sorted_pairs in (False, True):
+        tree = MerkleTree(leaves, engine=engine, sorted_pairs=sorted_pairs)
+        root = tree.get_root()
+
+        def check(indices, tamper=None):
+            multiproof = tree.get_multiproof(indices)
+            leaf_hashes = [tree.get_leaf(i) for i in multiproof["indices"]]
+            if tamper:
+                tamper(leaf_hashes, multiproof)
+            return verify_multiproof(leaf_hashes, multiproof, root, engine=engine, sorted_pairs=sorted_pairs)
+
+        # round trip: single leaf, neighbours, the odd last leaf, everything
+        for indices in ([0], [5], [12], [2, 3], [0, 7, 12], list(range(13))):
+            assert check(indices), (engine, sorted_pairs, indices)
+
+        # tampering: swapped leaf, missing / extra sibling, wrong shape
+        def swap_leaf(hashes, proof):
+            hashes[0] = tree.leaf_hash("forged")
+
+        def drop_sibling(hashes, proof):
+            proof["siblings"].pop()
+
+        def extra_sibling(hashes, proof):
+            proof["siblings"].append(proof["siblings"][0])
+
+        def other_index(hashes, proof):
+            proof["indices"] = [proof["indices"][0] + 1] + proof["indices"][1:]
+
+        def negative_index(hashes, proof):
+            proof["indices"][0] = -1
+
+        def grow_tree(hashes, proof):
+            proof["leaf_count"] += 4
+
+        def bad_hex(hashes, proof):
+            hashes[0] = "zz" * 32
+
+        for tamper in (swap_leaf, drop_sibling, extra_sibling, grow_tree, bad_hex):
+            assert not check([0, 7], tamper), (engine, sorted_pairs, tamper.__name__)
+        assert not check([4], negative_index), (engine, sorted_pairs, "negative_index")
+        if not sorted_pairs:
+            assert not check([4], other_index), (engine, "other_index")
+
+        print(f"Multiproof {engine:<6} sorted_pairs={sorted_pairs}: round trip + tamper checks OK")
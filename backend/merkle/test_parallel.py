@@ -0,0 +1,22 @@
+from backend.merkle.merkle_tree import MerkleTree
+from backend.merkle.parallel import MIN_CHUNK_HEIGHT, available_cpus, build_levels_parallel
+
+block = 1 << MIN_CHUNK_HEIGHT
+
+for engine in ("hex", "binary"):
+    for sorted_pairs in (False, True):
+        # one block (no pool), exact blocks, and a short last block
+        for size in (block - 1, 4 * block, 3 * block + 77):
+            leaves = [f"cid_{i}" for i in range(size)]
+            serial = MerkleTree(leaves, engine=engine, sorted_pairs=sorted_pairs)
+            levels = build_levels_parallel(leaves, engine, 2, sorted_pairs=sorted_pairs)
+            assert len(levels) == len(serial.levels)
+            for depth, level in enumerate(levels):
+                assert list(level) == list(serial.levels[depth])
+
+            parallel = MerkleTree(leaves, engine=engine, workers=2, sorted_pairs=sorted_pairs)
+            assert parallel.get_root() == serial.get_root()
+            assert parallel.get_proof(size - 1) == serial.get_proof(size - 1)
+        print(f"Parallel build engine={engine} sorted_pairs={sorted_pairs}: same levels as serial")
+
+print(f"CPUs available: {available_cpus()}")
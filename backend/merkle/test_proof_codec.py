@@ -0,0 +1,58 @@
+from backend.merkle.merkle_tree import MerkleTree, verify_proof
+from backend.merkle.proof_codec import (
+    ProofFormatError, decode_proof, decode_proof_b64, encode_proof, encode_proof_b64,
+)
+
+leaves = [f"cid_{i}" for i in range(37)]
+
+for sorted_pairs in (False, True):
+    tree = MerkleTree(leaves, engine="binary", sorted_pairs=sorted_pairs)
+    root = tree.get_root()
+
+    for index in (0, 17, 36):
+        proof = tree.get_proof(index)
+        blob = encode_proof(proof)
+        assert decode_proof(blob) == proof
+        assert decode_proof_b64(encode_proof_b64(proof)) == proof
+        assert verify_proof(tree.get_leaf(index), decode_proof(blob), root,
+                            engine="binary", sorted_pairs=sorted_pairs)
+
+    # a flipped sibling byte decodes fine but no longer verifies
+    blob = bytearray(encode_proof(tree.get_proof(17)))
+    blob[-1] ^= 0x01
+    assert not verify_proof(tree.get_leaf(17), decode_proof(bytes(blob)), root,
+                            engine="binary", sorted_pairs=sorted_pairs)
+    print(f"Proof codec sorted_pairs={sorted_pairs}: round trip OK")
+
+# a flipped direction bit moves the leaf to another position
+tree = MerkleTree(leaves, engine="binary")
+blob = bytearray(encode_proof(tree.get_proof(17)))
+blob[3] ^= 0x01
+assert not verify_proof(tree.get_leaf(17), decode_proof(bytes(blob)), tree.get_root(), engine="binary")
+
+# empty proof (single-leaf tree)
+assert decode_proof(encode_proof([])) == []
+
+# malformed input is always a ProofFormatError
+good = encode_proof(tree.get_proof(17))
+malformed = [
+    b"",
+    good[:2],
+    good[:-1],
+    good + b"\x00",
+    bytes([2]) + good[1:],
+]
+for blob in malformed:
+    try:
+        decode_proof(blob)
+    except ProofFormatError:
+        continue
+    raise AssertionError(f"accepted malformed proof {blob[:8]!r}")
+
+for text in ("***", "A"):
+    try:
+        decode_proof_b64(text)
+    except ProofFormatError:
+        continue
+    raise AssertionError(f"accepted malformed base64 {text!r}")
+print("Proof codec tamper checks OK")
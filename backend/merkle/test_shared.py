@@ -0,0 +1,66 @@
+import os
+import subprocess
+import sys
+import time
+
+from backend.merkle.merkle_tree import MerkleTree
+from backend.merkle.shared import SharedMerkleWriter, SharedTimeoutError, SharedTreeReader
+
+
+def expected_tree():
+    tree = MerkleTree([f"cid_{i}" for i in range(40)], engine="binary")
+    tree.update_leaves({3: tree.leaf_hash("REVOKED")})
+    return tree
+
+
+def check_reads(name):
+    expected = expected_tree()
+    reader = SharedTreeReader(name, timeout=0.2)
+    assert reader.get_root() == expected.get_root() and reader.leaf_count() == 40
+    assert reader.meta()["fingerprint"] == [39, 39, 0]
+    assert reader.proof_at(5, "cid_5") == (expected.get_leaf(5), expected.get_proof(5), expected.get_root())
+    assert reader.proof_at(3, "cid_3") is None
+    reader.close()
+
+
+def check_stuck(name):
+    reader = SharedTreeReader(name, timeout=0.2)
+    started = time.monotonic()
+    try:
+        reader.get_root()
+        raise AssertionError("read of a stuck shared tree returned")
+    except SharedTimeoutError:
+        pass
+    assert 0.2 <= time.monotonic() - started < 2
+    epoch, generation = reader.position()
+    assert generation % 2 and reader.position() == (epoch, generation)
+    reader.close()
+
+
+def in_worker(check, name):
+    # readers run in their own process, like request workers
+    subprocess.run([sys.executable, __file__, check, name], check=True)
+
+
+if len(sys.argv) == 3:
+    {"reads": check_reads, "stuck": check_stuck}[sys.argv[1]](sys.argv[2])
+    sys.exit()
+
+name = f"zid_test_{os.getpid()}"
+tree = MerkleTree([f"cid_{i}" for i in range(10)], engine="binary")
+writer = SharedMerkleWriter(name, tree, capacity=16, meta={"fingerprint": [9, 10, 0]})
+
+# reads match the writer, across appends, updates and a grown segment
+writer.append_many([f"cid_{i}" for i in range(10, 40)], meta={"fingerprint": [39, 40, 0]})
+writer.update_leaves({3: tree.leaf_hash("REVOKED")}, meta={"fingerprint": [39, 39, 0]})
+in_worker("reads", name)
+print("Shared tree reads OK")
+
+# a writer killed mid-update leaves the generation odd: reads give up
+writer._bump()
+in_worker("stuck", name)
+writer._bump()
+in_worker("reads", name)
+print("Shared tree stuck writer: OK")
+
+writer.close()
@@ -0,0 +1,67 @@
+# Needs Django and the backend settings; run from the project root:
+#     python backend/merkle/test_slots.py
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+import django
+
+django.setup()
+
+from django.db import connection, connections
+from django.test.utils import setup_test_environment
+
+from certificates.merkle_registry import MerkleRegistry
+from certificates.models import Certificate, MerkleState, User
+
+setup_test_environment()
+test_db = connection.creation.create_test_db(verbosity=0)
+try:
+    issuer = User.objects.create(username="issuer", role="issuer")
+
+    def issue(n):
+        return Certificate.objects.create(
+            title=f"cert {n}", holder_name="holder", issuer=issuer,
+            ipfs_cid=f"cid_{n}", certificate_file="certificates/x.pdf",
+        )
+
+    registry = MerkleRegistry()
+
+    # one worker: slots are handed out in order, starting at 0
+    for n in range(5):
+        registry._assign_leaf_index(issue(n))
+    assert sorted(Certificate.objects.values_list("leaf_index", flat=True)) == list(range(5))
+    assert MerkleState.objects.get(pk=1).next_leaf_index == 5
+    print("Sequential slot allocation OK")
+
+    # several workers at once: the locked state row keeps every slot unique
+    if connection.features.has_select_for_update:
+        certificates = [issue(n) for n in range(5, 45)]
+        errors = []
+
+        def worker(batch):
+            try:
+                for certificate in batch:
+                    MerkleRegistry()._assign_leaf_index(certificate)
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=worker, args=(certificates[i::8],)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert not errors, errors
+        assert sorted(Certificate.objects.values_list("leaf_index", flat=True)) == list(range(45))
+        assert MerkleState.objects.get(pk=1).next_leaf_index == 45
+        print("Concurrent slot allocation OK")
+    else:
+        print(f"{connection.vendor} has no row locks, concurrent allocation skipped")
+finally:
+    connection.creation.destroy_test_db(test_db, verbosity=0)
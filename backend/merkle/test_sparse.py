@@ -0,0 +1,46 @@
+from backend.merkle.sparse import SparseMerkleTree, verify_sparse_proof
+
+tree = SparseMerkleTree()
+issued = [f"CERT-{i:04d}" for i in range(40)]
+for certificate_id in issued:
+    tree.set(certificate_id, f"cid-{certificate_id}")
+tree.revoke("CERT-0007")
+root = tree.get_root()
+
+# membership, revocation and non-membership all verify
+assert verify_sparse_proof("CERT-0003", "cid-CERT-0003", tree.get_proof("CERT-0003"), root)
+assert verify_sparse_proof("CERT-0007", "REVOKED", tree.get_proof("CERT-0007"), root)
+assert verify_sparse_proof("CERT-9999", None, tree.get_proof("CERT-9999"), root)
+print("Sparse membership / revocation / non-membership: OK")
+
+# deleting a key makes it provably absent again
+tree.delete("CERT-0011")
+assert verify_sparse_proof("CERT-0011", None, tree.get_proof("CERT-0011"), tree.get_root())
+assert not verify_sparse_proof("CERT-0011", "cid-CERT-0011", tree.get_proof("CERT-0011"), tree.get_root())
+print("Sparse delete: OK")
+
+# tampering
+proof = tree.get_proof("CERT-0003")
+root = tree.get_root()
+assert not verify_sparse_proof("CERT-0003", "cid-forged", proof, root)
+assert not verify_sparse_proof("CERT-0003", None, proof, root)            # present key claimed absent
+assert not verify_sparse_proof("CERT-0004", "cid-CERT-0003", proof, root)  # proof moved to another key
+
+absent = tree.get_proof("CERT-9999")
+assert not verify_sparse_proof("CERT-9999", "cid-forged", absent, root)   # absent key claimed present
+
+dropped = dict(proof, siblings=proof["siblings"][:-1])
+extra = dict(proof, siblings=proof["siblings"] + [proof["siblings"][0]])
+flipped = dict(proof, bitmap=format(int(proof["bitmap"], 16) ^ 1, "x"))
+forged = dict(proof, siblings=["0" * 63 + "1"] + proof["siblings"][1:])
+for bad in (dropped, extra, flipped, forged):
+    assert not verify_sparse_proof("CERT-0003", "cid-CERT-0003", bad, root)
+
+# malformed proofs are rejected, never raised
+no_bitmap = {"siblings": proof["siblings"]}
+no_siblings = {"bitmap": proof["bitmap"]}
+bad_bitmap = dict(proof, bitmap="not hex")
+bad_sibling = dict(proof, siblings=[7] + proof["siblings"][1:])
+for bad in (no_bitmap, no_siblings, bad_bitmap, bad_sibling, dict(proof, bitmap=None), [], None):
+    assert not verify_sparse_proof("CERT-0003", "cid-CERT-0003", bad, root)
+print("Sparse tamper checks OK")
@@ -0,0 +1,84 @@
+import os
+import struct
+import tempfile
+
+from backend.merkle.merkle_tree import MerkleTree, REVOKED_LEAF, verify_proof
+from backend.merkle.store import StoreError
+
+leaves = [f"cid_{i}" for i in range(21)]
+workdir = tempfile.mkdtemp()
+
+for engine in ("hex", "binary"):
+    path = os.path.join(workdir, f"tree_{engine}.zmt")
+    tree = MerkleTree(leaves, engine=engine, index_leaves=True, sorted_pairs=engine == "binary")
+    tree.save(path, meta={"fingerprint": [20, 21, 0]})
+
+    # reopen: same root, proofs, positions and meta, read from the mapping
+    stored = MerkleTree.open(path, verify=True)
+    assert stored.mapped and stored.meta == {"fingerprint": [20, 21, 0]}
+    assert stored.get_root() == tree.get_root()
+    for index in (0, 10, 20):
+        assert stored.index_of(leaves[index]) == index
+        assert verify_proof(stored.get_leaf(index), stored.get_proof(index), stored.get_root(),
+                            engine=engine, sorted_pairs=stored.sorted_pairs)
+    assert stored.index_of("never issued") is None
+
+    # the first update copies the mapping into memory
+    stored.update_leaf(3, stored.leaf_hash(REVOKED_LEAF))
+    tree.update_leaf(3, tree.leaf_hash(REVOKED_LEAF))
+    assert not stored.mapped and stored.get_root() == tree.get_root()
+    assert stored.index_of(leaves[3]) is None
+    print(f"Store {engine}: reopen round trip OK")
+
+# every leaf revoked: no positions section, but the tree is still indexed
+path = os.path.join(workdir, "revoked.zmt")
+MerkleTree([REVOKED_LEAF] * 4, index_leaves=True).save(path)
+stored = MerkleTree.open(path)
+assert stored.index_of("cid_0") is None
+stored.append_leaf("cid_new")
+assert stored.index_of("cid_new") == 4
+print("Store all-revoked: reopen OK")
+
+# damaged files are StoreErrors, never other exceptions
+raw = open(os.path.join(workdir, "tree_hex.zmt"), "rb").read()
+
+
+def reopen(data, verify=False):
+    damaged = os.path.join(workdir, "damaged.zmt")
+    with open(damaged, "wb") as f:
+        f.write(data)
+    try:
+        MerkleTree.open(damaged, verify=verify)
+    except StoreError as e:
+        return str(e)
+    return None
+
+
+flipped = bytearray(raw)
+flipped[len(raw) // 2] ^= 0xFF
+unknown_hash = bytearray(raw)
+unknown_hash[11] = 0x7F
+
+
+
+def patched(fmt, offset, value):
+    data = bytearray(raw)
+    struct.pack_into(fmt, data, offset, value)
+    return bytes(data)
+
+
+assert reopen(b"") is not None
+assert reopen(raw[:20]) is not None
+assert reopen(b"NOTATREE" + raw[8:]) is not None
+assert reopen(bytes(flipped), verify=True) is not None
+assert reopen(bytes(unknown_hash)) is not None
+
+# header damage is caught without verify=True: nothing maps past the end
+assert reopen(raw[:len(raw) // 2]) is not None                      # truncated
+assert reopen(patched(">Q", 12, 22)) is not None                     # leaf_count
+assert reopen(patched(">I", 20, 40)) is not None                     # level_count
+assert reopen(patched(">Q", 32, 1 << 40)) is not None                # positions_count
+assert reopen(patched(">I", 40, 1 << 20)) is not None                # meta_len
+assert reopen(patched(">Q", 44, len(raw))) is not None               # leaf level offset
+assert reopen(patched(">Q", 52, 40)) is not None                     # leaf level count
+print("Store tamper checks OK")
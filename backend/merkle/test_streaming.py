@@ -0,0 +1,25 @@
+from backend.merkle.merkle_tree import MerkleTree
+from backend.merkle.streaming import stream_root
+
+sizes = list(range(1, 70)) + [127, 128, 129, 1000, 1025]
+
+for hash_name in ("sha256", "sha256-ds"):
+    for engine in ("hex", "binary"):
+        for sorted_pairs in (False, True):
+            options = dict(engine=engine, hash_name=hash_name, sorted_pairs=sorted_pairs)
+            for size in sizes:
+                leaves = [f"cid_{i}" for i in range(size)]
+                # a generator, so nothing can be read twice
+                streamed = stream_root((leaf for leaf in leaves), **options)
+                assert streamed == MerkleTree(leaves, **options).get_root(), (options, size)
+            print(f"stream_root {hash_name} engine={engine} sorted_pairs={sorted_pairs}: "
+                  f"matches the full build for {len(sizes)} sizes")
+
+for bad in (dict(leaves=[]), dict(leaves=["cid_0"], engine="octal")):
+    try:
+        stream_root(**bad)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError(f"stream_root accepted {bad}")
+print("Empty input and unknown engine rejected")
@@ -0,0 +1,46 @@
+import random
+
+from backend.merkle.batch_revocation import BatchRevocation
+from backend.merkle.merkle_tree import MerkleTree, REVOKED_LEAF
+
+rng = random.Random(4)
+
+for engine in ("hex", "binary"):
+    for sorted_pairs in (False, True):
+        options = dict(engine=engine, sorted_pairs=sorted_pairs)
+        for size in (1, 2, 13, 64, 100):
+            leaves = [f"cid_{i}" for i in range(size)]
+            for count in (1, 3, size):
+                indices = rng.sample(range(size), min(count, size))
+                updates = {index: MerkleTree([f"new_{index}"], **options).get_leaf(0) for index in indices}
+
+                one_by_one = MerkleTree(leaves, index_leaves=True, **options)
+                one_by_one.metrics.start()
+                for index, new_hash in updates.items():
+                    one_by_one.update_leaf(index, new_hash)
+                loop_hashes = one_by_one.metrics.hash_operations
+
+                batched = MerkleTree(leaves, index_leaves=True, **options)
+                batched.metrics.start()
+                batched.update_leaves(updates)
+
+                # same levels, and each shared ancestor hashed once
+                assert [list(level) for level in batched.levels] == [list(level) for level in one_by_one.levels]
+                ancestors = sum(len({index >> depth for index in indices}) for depth in range(1, len(batched.levels)))
+                assert batched.metrics.hash_operations == ancestors <= loop_hashes
+                assert batched.index_of(f"new_{indices[0]}") == indices[0]
+        print(f"update_leaves engine={engine} sorted_pairs={sorted_pairs}: matches update_leaf")
+
+# batch revocation queues, dedupes and applies in one pass
+tree = MerkleTree([f"cid_{i}" for i in range(16)])
+expected = MerkleTree([f"cid_{i}" for i in range(16)])
+batch = BatchRevocation(tree)
+assert batch.process_batch() == (tree.get_root(), None)
+for index in (1, 3, 3, 9):
+    batch.add_to_batch(index)
+root, metrics = batch.process_batch()
+for index in (1, 3, 9):
+    expected.update_leaf(index, expected.leaf_hash(REVOKED_LEAF))
+assert root == expected.get_root() and metrics.hash_operations == 3 + 2 + 2 + 1
+assert batch.revocation_queue == []
+print("Batch revocation OK")
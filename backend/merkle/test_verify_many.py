@@ -0,0 +1,31 @@
+from backend.merkle.merkle_tree import MerkleTree, verify_many, verify_proof
+
+for engine in ("hex", "binary"):
+    for sorted_pairs in (False, True):
+        options = dict(engine=engine, sorted_pairs=sorted_pairs)
+        tree = MerkleTree([f"cid_{i}" for i in range(23)], **options)
+        root = tree.get_root()
+        items = [(tree.get_leaf(i), tree.get_proof(i)) for i in range(23)]
+
+        # same answers as verify_proof, with each shared node hashed once
+        assert verify_many(items, root, **options) == [True] * 23
+        assert all(verify_proof(leaf, proof, root, **options) for leaf, proof in items)
+
+        # tampered items fail alone, their neighbours still pass
+        forged = list(items)
+        forged[3] = (tree.get_leaf(4), items[3][1])                    # wrong leaf
+        forged[7] = (items[7][0], items[7][1][:-1])                    # dropped sibling
+        forged[11] = (items[11][0], items[11][1] + items[11][1][-1:])  # extra sibling
+        forged[15] = ("zz" * 32, items[15][1])                         # not hex
+        forged[19] = (items[19][0], items[20][1])                      # another leaf's path
+        expected = [i not in (3, 7, 11, 15, 19) for i in range(23)]
+        assert verify_many(forged, root, **options) == expected
+        assert not any(verify_proof(*forged[i], root, **options) for i in (3, 7, 11, 19))
+        assert verify_many(items, "00" * 32, **options) == [False] * 23
+
+        # a verified set carries over to later calls, but never past a bad proof
+        verified = set()
+        assert verify_many(items[:12], root, verified=verified, **options) == [True] * 12
+        assert verify_many(items[12:], root, verified=verified, **options) == [True] * 11
+        assert verify_many(forged, root, verified=verified, **options) == expected
+        print(f"verify_many engine={engine} sorted_pairs={sorted_pairs}: OK")
@@ -0,0 +1,67 @@
+from backend.merkle.merkle_tree import DigestLevel, MerkleTree, REVOKED_LEAF
+from backend.merkle.versioned import VersionedMerkleTree
+
+
+def fresh(leaf_hashes, engine, sorted_pairs):
+    # MerkleTree built from scratch over the same leaf hashes
+    level = DigestLevel() if engine == "binary" else []
+    for leaf_hash in leaf_hashes:
+        level.append(bytes.fromhex(leaf_hash) if engine == "binary" else leaf_hash)
+    tree = MerkleTree.from_levels([level], engine, sorted_pairs=sorted_pairs)
+    tree.build_tree()
+    return tree
+
+
+for engine in ("hex", "binary"):
+    for sorted_pairs in (False, True):
+        options = dict(engine=engine, sorted_pairs=sorted_pairs)
+        versioned = VersionedMerkleTree([f"cid_{i}" for i in range(5)], max_versions=8, **options)
+        reference = MerkleTree([f"cid_{i}" for i in range(5)], **options)
+        revoked = reference.leaf_hash(REVOKED_LEAF)
+
+        # appends across powers of two, single and batched updates
+        leaf_hashes = [reference.leaf_hash(f"cid_{i}") for i in range(5)]
+        history = [(versioned.get_root(), list(leaf_hashes))]
+        steps = [
+            ("append", ["cid_5"]),
+            ("update", {2: revoked}),
+            ("append", [f"cid_{i}" for i in range(6, 17)]),
+            ("update", {0: revoked, 9: revoked, 16: revoked}),
+            ("append", ["cid_17"]),
+        ]
+        for kind, change in steps:
+            if kind == "append":
+                versioned.append_many(change)
+                leaf_hashes += [reference.leaf_hash(value) for value in change]
+            else:
+                versioned.update_leaves(change)
+                for index, leaf_hash in change.items():
+                    leaf_hashes[index] = leaf_hash
+            history.append((versioned.get_root(), list(leaf_hashes)))
+
+        # every version matches a fresh build, including after later updates
+        for root, leaf_hashes in history:
+            expected = fresh(leaf_hashes, **options)
+            assert root == expected.get_root() and versioned.leaf_count(root) == len(leaf_hashes)
+            for index in range(len(leaf_hashes)):
+                assert versioned.get_leaf(index, root) == leaf_hashes[index]
+                assert versioned.get_proof(index, root) == expected.get_proof(index)
+        assert versioned.roots() == [root for root, _ in history]
+        print(f"Versioned engine={engine} sorted_pairs={sorted_pairs}: history OK")
+
+        # the oldest versions drop out once max_versions is reached
+        for i in range(18, 21):
+            versioned.append_leaf(f"cid_{i}")
+        assert len(versioned.roots()) == 8 and history[0][0] not in versioned.roots()
+        try:
+            versioned.get_proof(0, history[0][0])
+            raise AssertionError("evicted version still answered")
+        except KeyError:
+            pass
+        try:
+            versioned.get_proof(20, history[-1][0])
+            raise AssertionError("proof for a leaf the version doesn't have")
+        except IndexError:
+            pass
+
+print("Versioned eviction checks OK")
@@ -0,0 +1,216 @@
+from collections import OrderedDict
+
+from .merkle_tree import ENGINES, OperationMetrics, node_hashers, sorted_pair
+
+
+# ---------------- NODES ----------------
+class Node:
+    """
+    Immutable tree node. A missing right child means the level had an odd
+    count here, so the left child is paired with itself (same rule as
+    MerkleTree). Nodes are shared between versions and never modified.
+    """
+
+    __slots__ = ("hash", "left", "right")
+
+    def __init__(self, hash, left=None, right=None):
+        self.hash = hash
+        self.left = left
+        self.right = right
+
+
+class Version:
+    __slots__ = ("root", "leaf_count", "height")
+
+    def __init__(self, root, leaf_count, height):
+        self.root = root
+        self.leaf_count = leaf_count
+        self.height = height
+
+
+# ---------------- VERSIONED TREE ----------------
+class VersionedMerkleTree:
+    """
+    Persistent (copy-on-write) Merkle tree: every update or append makes a
+    new version that shares all untouched nodes with the previous ones.
+
+    A version costs only the nodes on the changed paths, O(k log n) for k
+    changed leaves, so the last `max_versions` roots can be kept around and
+    proofs generated against any of them, e.g. for a verifier still holding
+    a root from within the anchoring grace window.
+
+    Roots, leaves and proofs are identical to MerkleTree with the same
+    engine / hash_name / sorted_pairs.
+    """
+
+    def __init__(self, leaves, engine="hex", hash_name="sha256", sorted_pairs=False, max_versions=64):
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown Merkle engine: {engine}")
+
+        self.engine = engine
+        self.hash_name = hash_name
+        self.sorted_pairs = sorted_pairs
+        self.max_versions = max_versions
+        self.metrics = OperationMetrics()
+        self._hash_leaf, self._hash_pair = node_hashers(engine, hash_name)
+        self.versions = OrderedDict()
+
+        level = [Node(self._hash_leaf(x)) for x in leaves]
+        if not level:
+            raise ValueError("Cannot build a Merkle tree without leaves")
+
+        leaf_count, height = len(level), 0
+        while len(level) > 1:
+            parents = []
+            for i in range(0, len(level), 2):
+                left = level[i]
+                right = level[i + 1] if i + 1 < len(level) else None
+                parents.append(self._parent(left, right, count=False))
+            level = parents
+            height += 1
+
+        self._publish(Version(level[0], leaf_count, height))
+
+    # ---------- HELPERS ----------
+    def _to_hex(self, node_hash):
+        return node_hash.hex() if self.engine == "binary" else node_hash
+
+    def _from_hex(self, value):
+        if self.engine == "binary" and isinstance(value, str):
+            return bytes.fromhex(value)
+        return value
+
+    def _parent(self, left, right, count=True):
+        right_hash = right.hash if right is not None else left.hash
+        if self.sorted_pairs:
+            data = sorted_pair(left.hash, right_hash)
+        else:
+            data = left.hash + right_hash
+        return Node(self._hash_pair(data, self.metrics if count else None), left, right)
+
+    def _publish(self, version):
+        root = self._to_hex(version.root.hash)
+        self.versions.pop(root, None)
+        self.versions[root] = version
+        while len(self.versions) > self.max_versions:
+            self.versions.popitem(last=False)
+        self.current = version
+        return root
+
+    def _version(self, root):
+        if root is None:
+            return self.current
+        try:
+            return self.versions[root]
+        except KeyError:
+            raise KeyError(f"Merkle root {root} is not a retained version")
+
+    # ---------- READS ----------
+    def get_root(self):
+        return self._to_hex(self.current.root.hash)
+
+    def roots(self):
+        """Retained roots, oldest first."""
+        return list(self.versions)
+
+    def leaf_count(self, root=None):
+        return self._version(root).leaf_count
+
+    def _path(self, version, index):
+        # nodes from the root down to the leaf, with the side taken at each step
+        if not 0 <= index < version.leaf_count:
+            raise IndexError("Leaf index out of range")
+
+        path = []
+        node = version.root
+        for height in range(version.height, 0, -1):
+            go_right = index >> (height - 1) & 1
+            path.append((node, go_right))
+            node = node.right if go_right else node.left
+        return path, node
+
+    def get_leaf(self, index, root=None):
+        _, leaf = self._path(self._version(root), index)
+        return self._to_hex(leaf.hash)
+
+    def get_proof(self, index, root=None):
+        """Proof for leaf `index` against `root` (default: the latest version)."""
+        path, _ = self._path(self._version(root), index)
+        proof = []
+
+        for node, go_right in reversed(path):
+            if go_right:
+                sibling, is_left = node.left, True
+            else:
+                sibling, is_left = (node.right or node.left), False
+
+            if self.sorted_pairs:
+                proof.append(self._to_hex(sibling.hash))
+            else:
+                proof.append((self._to_hex(sibling.hash), is_left))
+
+        return proof
+
+    # ---------- COPY-ON-WRITE UPDATES ----------
+    def _rebuild(self, node, height, items):
+        """
+        New subtree with `items` ([(offset, leaf_hash)], sorted, offsets
+        relative to this subtree) applied. Untouched children are reused.
+        """
+        if height == 0:
+            return Node(items[-1][1])
+
+        half = 1 << (height - 1)
+        split = 0
+        while split < len(items) and items[split][0] < half:
+            split += 1
+
+        left = node.left if node is not None else None
+        right = node.right if node is not None else None
+
+        if split:
+            left = self._rebuild(left, height - 1, items[:split])
+        if split < len(items):
+            right = self._rebuild(
+                right, height - 1, [(offset - half, leaf) for offset, leaf in items[split:]]
+            )
+
+        return self._parent(left, right)
+
+    def _commit(self, items, leaf_count):
+        version = self.current
+        root, height = version.root, version.height
+
+        # grow: the old root becomes the left child of a new top node
+        while leaf_count > 1 << height:
+            root = Node(None, root, None)
+            height += 1
+
+        root = self._rebuild(root, height, sorted(items))
+        return self._publish(Version(root, leaf_count, height))
+
+    def update_leaves(self, updates):
+        """Apply {index: new_hash} as one new version. Returns the new root."""
+        count = self.current.leaf_count
+        items = []
+        for index, new_hash in updates.items():
+            if not 0 <= index < count:
+                raise IndexError("Leaf index out of range")
+            items.append((index, self._from_hex(new_hash)))
+        if not items:
+            return self.get_root()
+        return self._commit(items, count)
+
+    def update_leaf(self, index, new_hash):
+        return self.update_leaves({index: new_hash})
+
+    def append_many(self, leaves):
+        """Append raw leaf values as one new version. Returns the first new index."""
+        start = self.current.leaf_count
+        items = [(start + i, self._hash_leaf(x)) for i, x in enumerate(leaves)]
+        if items:
+            self._commit(items, start + len(items))
+        return start
+
+    def append_leaf(self, leaf):
+        return self.append_many([leaf])
@@ -206,7 +206,63 @@ class ZeroIDVerifier:
         Returns:
             dict with keys: valid, hash_match, not_revoked, merkle_valid, details
         """
-        from backend.merkle.merkle_tree import verify_proof, sha256
+        from backend.merkle.merkle_tree import verify_proof
+
+        leaf_hash, details = self._check_credential(vc)
+
+        # ── 3. Merkle proof check ─────────────────────────────────────────────
+        merkle_valid = False
+        if leaf_hash and merkle_proof and on_chain_root:
+            merkle_valid = verify_proof(leaf_hash, merkle_proof, on_chain_root)
+
+        return self._decide(details, merkle_valid, on_chain_root)
+
+    def verify_many(self, items: list, on_chain_root: str) -> dict:
+        """
+        Verify a batch of (vc, merkle_proof) pairs against one on-chain root.
+
+        Same checks as verify_vc, but the Merkle proofs go through
+        merkle_tree.verify_many, so path nodes shared by several proofs are
+        hashed once.
+
+        Returns:
+            dict with keys: results (one verify_vc dict per item, in order),
+            hash_operations, naive_hash_operations
+        """
+        from backend.merkle.merkle_tree import OperationMetrics, verify_many
+
+        checked = [self._check_credential(vc) for vc, _ in items]
+
+        # only well-formed items go to the batch; the rest fail like verify_vc
+        batch = [
+            (position, leaf_hash, merkle_proof)
+            for position, ((leaf_hash, _), (_, merkle_proof)) in enumerate(zip(checked, items))
+            if leaf_hash and merkle_proof and on_chain_root
+        ]
+
+        metrics = OperationMetrics()
+        merkle_valid = [False] * len(items)
+        outcomes = verify_many(
+            [(leaf_hash, merkle_proof) for _, leaf_hash, merkle_proof in batch],
+            on_chain_root,
+            metrics=metrics,
+        )
+        for (position, _, _), valid in zip(batch, outcomes):
+            merkle_valid[position] = valid
+
+        return {
+            "results": [
+                self._decide(details, valid, on_chain_root)
+                for (_, details), valid in zip(checked, merkle_valid)
+            ],
+            "hash_operations":       metrics.hash_operations,
+            "naive_hash_operations": sum(len(merkle_proof) for _, _, merkle_proof in batch),
+        }
+
+    @staticmethod
+    def _check_credential(vc: dict) -> tuple:
+        # integrity + revocation checks; returns (leaf_hash, details)
+        from backend.merkle.merkle_tree import sha256
 
         details = {}
 
@@ -224,14 +280,16 @@ class ZeroIDVerifier:
         details["status"]      = status
         details["not_revoked"] = not_revoked
 
-        # ── 3. Merkle proof check ─────────────────────────────────────────────
-        merkle_valid = False
-        if leaf_hash and merkle_proof and on_chain_root:
-            merkle_valid = verify_proof(leaf_hash, merkle_proof, on_chain_root)
+        return leaf_hash, details
+
+    def _decide(self, details: dict, merkle_valid: bool, on_chain_root: str) -> dict:
+        details = dict(details)
         details["merkle_valid"]  = merkle_valid
         details["on_chain_root"] = on_chain_root
 
         # ── 4. Final decision ─────────────────────────────────────────────────
+        hash_match  = details["hash_match"]
+        not_revoked = details["not_revoked"]
         valid = hash_match and not_revoked and merkle_valid
         details["valid"] = valid
 
@@ -40,6 +40,33 @@ contract ZeroIDMerkle {
         return computedHash == merkleRoot;
     }
 
+    // verifyProof always hashes (computed, proof[i]), so it only accepts
+    // leaves that are a left child at every level. The bits of `index`
+    // (the leaf position) say which side each sibling is on.
+    function verifyProofAt(
+        bytes32[] calldata proof,
+        bytes32 leaf,
+        uint256 index
+    ) external view returns (bool) {
+
+        bytes32 computedHash = leaf;
+
+        for (uint256 i = 0; i < proof.length; i++) {
+            if ((index & 1) == 0) {
+                computedHash = keccak256(
+                    abi.encodePacked(computedHash, proof[i])
+                );
+            } else {
+                computedHash = keccak256(
+                    abi.encodePacked(proof[i], computedHash)
+                );
+            }
+            index >>= 1;
+        }
+
+        return computedHash == merkleRoot;
+    }
+
     function transferAdmin(address newAdmin) external onlyAdmin {
         require(newAdmin != address(0), "Invalid address");
         admin = newAdmin;